@@ -7,11 +7,16 @@ from flask import jsonify
 from flask import make_response
 from flask import current_app
 from backend.db_connection import db
+from backend.db_connection.slow_queries import slow_query_log
+from backend.utils.cache import response_cache
+from backend.utils.conditional import conditional
+from backend.utils import write_hooks
 
 admin_route = Blueprint('admin_route', __name__)
 
 # Gets all user data
 @admin_route.route('/users', methods=['GET'])
+@conditional('User')
 def get_user_info():
     cursor = db.get_db().cursor()
     the_query = '''
@@ -27,6 +32,7 @@ def get_user_info():
 
 # Gets all the food items stored in the predefined food list
 @admin_route.route('/food_list', methods=['GET'])
+@conditional('Food')
 def get_food_list():
     cursor = db.get_db().cursor()
     the_query = '''
@@ -42,6 +48,7 @@ def get_food_list():
 
 # Gets all the support tickets that are open
 @admin_route.route('/support_tix', methods=['GET'])
+@conditional('SupportTicket')
 def get_support_tickets():
     cursor = db.get_db().cursor()
     the_query = '''
@@ -58,6 +65,7 @@ def get_support_tickets():
 
 # Gets all the employee tickets given by supervisors to assign work to employees
 @admin_route.route('/employee_tix', methods=['GET'])
+@conditional('TicketEmployee', 'SupportTicket')
 def get_employee_tickets():
     cursor = db.get_db().cursor()
     the_query = '''
@@ -98,6 +106,7 @@ def add_food_item():
 
     cursor = db.get_db().cursor()
     cursor.execute(query)
+    write_hooks.after_table_write(['Food'])
     db.get_db().commit()
 
     response = make_response("Successfully added food")
@@ -124,6 +133,8 @@ def remove_user():
 
     cursor = db.get_db().cursor()
     cursor.execute(query)
+    # the user's logs went with them (ON DELETE CASCADE)
+    write_hooks.after_table_write(['User'], everything=True)
     db.get_db().commit()
 
     response = make_response(f"Successfully removed user with email '{email}'")
@@ -155,6 +166,7 @@ def update_user():
 
         cursor = db.get_db().cursor()
         cursor.execute(query)
+        write_hooks.after_table_write(['User'])
         db.get_db().commit()
 
         response_message += f"Successfully updated email '{email}' to '{new_email}'\n"
@@ -170,6 +182,7 @@ def update_user():
 
         cursor = db.get_db().cursor()
         cursor.execute(query)
+        write_hooks.after_table_write(['User'])
         db.get_db().commit()
 
         response_message += f"Successfully updated name '{name}' to '{new_name}'\n"
@@ -196,6 +209,7 @@ def update_support_ticket():
 
     cursor = db.get_db().cursor()
     cursor.execute(query)
+    write_hooks.after_table_write(['SupportTicket'])
     db.get_db().commit()
 
     response = make_response('Successfully updated support ticket.')
@@ -219,8 +233,45 @@ def assign_employee_ticket():
 
     cursor = db.get_db().cursor()
     cursor.execute(query)
+    write_hooks.after_table_write(['TicketEmployee'])
     db.get_db().commit()
 
     response = make_response('Successfully assigned work')
     response.status_code = 200
-    return response
\ No newline at end of file
+    return response
+
+# Gets the database connection pool statistics
+@admin_route.route('/db_pool', methods=['GET'])
+def get_db_pool_stats():
+    the_response = make_response(jsonify(db.stats()))
+    the_response.status_code = 200
+    the_response.mimetype='application/json'
+    return the_response
+
+
+# Gets the response cache statistics
+@admin_route.route('/cache', methods=['GET'])
+def get_cache_stats():
+    the_response = make_response(jsonify(response_cache.stats()))
+    the_response.status_code = 200
+    the_response.mimetype='application/json'
+    return the_response
+
+
+# Gets the slow-query log: one entry per query fingerprint, worst
+# total time first, each with its captured EXPLAIN plan
+@admin_route.route('/slow_queries', methods=['GET'])
+def get_slow_queries():
+    the_response = make_response(jsonify(slow_query_log.entries()))
+    the_response.status_code = 200
+    the_response.mimetype='application/json'
+    return the_response
+
+
+# Clears the slow-query log
+@admin_route.route('/slow_queries', methods=['DELETE'])
+def clear_slow_queries():
+    slow_query_log.clear()
+    the_response = make_response(jsonify({'message': 'Slow-query log cleared'}))
+    the_response.status_code = 200
+    return the_response
@@ -1,10 +1,14 @@
 #------------------------------------------------------------
 # This file creates a shared DB connection resource
 #------------------------------------------------------------
-from flaskext.mysql import MySQL
-from pymysql import cursors
+from backend.db_connection.instrumented import InstrumentedDictCursor, InstrumentedSSDictCursor
+from backend.db_connection.pool import PooledMySQL
 
 
 # the parameter instructs the connection to return data 
-# as a dictionary object. 
-db = MySQL(cursorclass=cursors.DictCursor)
\ No newline at end of file
+# as a dictionary object. Connections come out of a bounded
+# pool (see pool.py) rather than being opened per request.
+# stream_cursorclass is the unbuffered variant used for exports.
+# Both are timed per request (see instrumented.py).
+db = PooledMySQL(cursorclass=InstrumentedDictCursor,
+                 stream_cursorclass=InstrumentedSSDictCursor)
@@ -0,0 +1,106 @@
+#------------------------------------------------------------
+# Cursor classes that time every statement.
+#
+# Each execute() and fetch*() call adds to per-request counters
+# kept on flask.g: the number of statements, the seconds spent in
+# MySQL (including reading rows off an unbuffered cursor) and the
+# rows handed back to the route. backend/utils/metrics.py turns
+# those into the /metrics histograms and the Server-Timing header.
+# Statements over the slow-query threshold also go to the
+# slow-query log (see slow_queries.py).
+#------------------------------------------------------------
+import time
+
+from flask import g, has_app_context
+from pymysql import cursors
+
+from backend.db_connection.slow_queries import slow_query_log
+
+
+class QueryStats:
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.rows = 0
+
+
+# the counters for the current request (or CLI command), None
+# outside of an app context
+def query_stats():
+    if not has_app_context():
+        return None
+    stats = g.get('_query_stats')
+    if stats is None:
+        stats = g._query_stats = QueryStats()
+    return stats
+
+
+def _record(started, queries=0, rows=0):
+    seconds = time.perf_counter() - started
+    stats = query_stats()
+    if stats is not None:
+        stats.queries += queries
+        stats.db_seconds += seconds
+        stats.rows += rows
+    return seconds
+
+
+class InstrumentedCursorMixin:
+
+    # executemany() goes through execute() for every statement it
+    # sends, so it is counted there
+    def execute(self, query, args=None):
+        started = time.perf_counter()
+        try:
+            result = super().execute(query, args)
+        finally:
+            seconds = _record(started, queries=1)
+        if slow_query_log.is_slow(seconds):
+            self._log_slow(query, args, seconds)
+        return result
+
+    def _log_slow(self, query, args, seconds):
+        key = slow_query_log.record(query, args, seconds)
+        if key is None:
+            return
+        statement = self.mogrify(query, args)
+        if isinstance(self, cursors.SSCursor):
+            # the connection is busy until the rows have been read
+            self._pending_explain = (key, statement)
+        else:
+            slow_query_log.capture_explain(key, self.connection, statement)
+
+    def close(self):
+        pending = getattr(self, '_pending_explain', None)
+        conn = self.connection
+        super().close()
+        if pending is not None and conn is not None:
+            self._pending_explain = None
+            slow_query_log.capture_explain(pending[0], conn, pending[1])
+
+    def fetchone(self):
+        started = time.perf_counter()
+        row = super().fetchone()
+        _record(started, rows=1 if row is not None else 0)
+        return row
+
+    def fetchmany(self, size=None):
+        started = time.perf_counter()
+        rows = super().fetchmany(size)
+        _record(started, rows=len(rows))
+        return rows
+
+    def fetchall(self):
+        started = time.perf_counter()
+        rows = super().fetchall()
+        _record(started, rows=len(rows))
+        return rows
+
+
+class InstrumentedDictCursor(InstrumentedCursorMixin, cursors.DictCursor):
+    pass
+
+
+class InstrumentedSSDictCursor(InstrumentedCursorMixin, cursors.SSDictCursor):
+    pass
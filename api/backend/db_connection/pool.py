@@ -0,0 +1,277 @@
+#------------------------------------------------------------
+# A small bounded connection pool for PyMySQL.
+#
+# Opening a MySQL connection costs a TCP handshake plus an auth
+# round trip, which is more than most of our queries take. The
+# pool keeps up to max_size connections open and hands them out
+# one request at a time. Connections older than `recycle`
+# seconds are closed on checkout, idle connections above
+# min_size are closed after `idle_timeout` seconds, and a
+# connection that has sat idle for `ping_after` seconds is
+# pinged before it is handed out again.
+#------------------------------------------------------------
+import threading
+import time
+from collections import deque
+
+import pymysql
+from flask import g
+
+from backend.db_connection.slow_queries import slow_query_log
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class ConnectionPool:
+
+    def __init__(self, connect, min_size=1, max_size=10, recycle=3600,
+                 idle_timeout=300, timeout=10, ping_after=10):
+        if max_size < 1 or min_size < 0 or min_size > max_size:
+            raise ValueError('pool sizes must satisfy 0 <= min_size <= max_size, max_size >= 1')
+
+        self._connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.recycle = recycle
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self.ping_after = ping_after
+
+        self._lock = threading.Condition()
+        # idle connections as (connection, returned_at); the right end
+        # is the most recently used one
+        self._idle = deque()
+        # id(connection) -> time the connection was opened
+        self._opened_at = {}
+        # every live connection, idle, checked out or being opened
+        self._size = 0
+        self._in_use = 0
+        self._warmed = False
+
+        self._counters = {
+            'connections_opened': 0,
+            'connections_closed': 0,
+            'checkouts': 0,
+            'waits': 0,
+            'wait_seconds': 0.0,
+            'timeouts': 0,
+            'recycled': 0,
+            'health_check_failures': 0,
+        }
+
+    #------------------------------------------------------------
+    # checkout / checkin
+    def acquire(self):
+        if not self._warmed:
+            self._warm()
+
+        deadline = time.monotonic() + self.timeout
+        while True:
+            conn, returned_at = self._reserve(deadline)
+
+            if conn is None:
+                # _reserve() made room for a brand new connection
+                try:
+                    conn = self._open()
+                except Exception:
+                    with self._lock:
+                        self._size -= 1
+                        self._lock.notify()
+                    raise
+            elif not self._healthy(conn, returned_at):
+                self._discard(conn)
+                continue
+
+            with self._lock:
+                self._in_use += 1
+                self._counters['checkouts'] += 1
+            return conn
+
+    def release(self, conn):
+        with self._lock:
+            self._in_use -= 1
+
+        # never hand the next request an open transaction or a
+        # stale REPEATABLE READ snapshot
+        try:
+            conn.rollback()
+        except pymysql.Error:
+            self._discard(conn)
+            return
+
+        if not conn.open:
+            self._discard(conn)
+            return
+
+        with self._lock:
+            self._idle.append((conn, time.monotonic()))
+            self._lock.notify()
+        self._prune_idle()
+
+    #------------------------------------------------------------
+    # pool maintenance
+    def _reserve(self, deadline):
+        with self._lock:
+            waited_from = None
+            while True:
+                if self._idle:
+                    conn, returned_at = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    conn, returned_at = None, None
+                    break
+
+                if waited_from is None:
+                    waited_from = time.monotonic()
+                    self._counters['waits'] += 1
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._counters['timeouts'] += 1
+                    self._counters['wait_seconds'] += time.monotonic() - waited_from
+                    raise PoolTimeout(
+                        f'no database connection free after {self.timeout}s '
+                        f'(max_size={self.max_size})')
+                self._lock.wait(remaining)
+
+            if waited_from is not None:
+                self._counters['wait_seconds'] += time.monotonic() - waited_from
+            return conn, returned_at
+
+    def _healthy(self, conn, returned_at):
+        now = time.monotonic()
+        if self.recycle and now - self._opened_at.get(id(conn), now) >= self.recycle:
+            with self._lock:
+                self._counters['recycled'] += 1
+            return False
+
+        if now - returned_at >= self.ping_after:
+            try:
+                conn.ping(reconnect=False)
+            except pymysql.Error:
+                with self._lock:
+                    self._counters['health_check_failures'] += 1
+                return False
+        return True
+
+    def _open(self):
+        conn = self._connect()
+        with self._lock:
+            self._opened_at[id(conn)] = time.monotonic()
+            self._counters['connections_opened'] += 1
+        return conn
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except pymysql.Error:
+            pass
+        with self._lock:
+            self._opened_at.pop(id(conn), None)
+            self._size -= 1
+            self._counters['connections_closed'] += 1
+            self._lock.notify()
+
+    def _prune_idle(self):
+        # the left end of the deque holds the connections that have
+        # been idle the longest
+        expired = []
+        with self._lock:
+            now = time.monotonic()
+            while (self._idle and self._size - len(expired) > self.min_size
+                   and now - self._idle[0][1] >= self.idle_timeout):
+                expired.append(self._idle.popleft()[0])
+        for conn in expired:
+            self._discard(conn)
+
+    def _warm(self):
+        # open min_size connections up front, best effort: the
+        # database may not be up yet when the first request arrives
+        self._warmed = True
+        while True:
+            with self._lock:
+                if self._size >= self.min_size:
+                    return
+                self._size += 1
+            try:
+                conn = self._open()
+            except Exception:
+                with self._lock:
+                    self._size -= 1
+                return
+            with self._lock:
+                self._idle.appendleft((conn, time.monotonic()))
+                self._lock.notify()
+
+    def close(self):
+        with self._lock:
+            idle = [conn for conn, _ in self._idle]
+            self._idle.clear()
+        for conn in idle:
+            self._discard(conn)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+            stats.update({
+                'size': self._size,
+                'idle': len(self._idle),
+                'in_use': self._in_use,
+                'min_size': self.min_size,
+                'max_size': self.max_size,
+            })
+        stats['wait_seconds'] = round(stats['wait_seconds'], 6)
+        return stats
+
+
+#------------------------------------------------------------
+# Flask glue. Keeps the get_db() interface of flaskext.mysql so
+# the blueprints do not change: the first get_db() call in a
+# request checks a connection out of the pool and the app context
+# teardown hands it back.
+class PooledMySQL:
+
+    def __init__(self, cursorclass=pymysql.cursors.DictCursor,
+                 stream_cursorclass=pymysql.cursors.SSDictCursor):
+        self.cursorclass = cursorclass
+        self.stream_cursorclass = stream_cursorclass
+        self.pool = None
+
+    def init_app(self, app):
+        config = app.config
+        connect_args = {
+            'host': config.get('MYSQL_DATABASE_HOST', 'localhost'),
+            'port': config.get('MYSQL_DATABASE_PORT', 3306),
+            'user': config.get('MYSQL_DATABASE_USER'),
+            'password': config.get('MYSQL_DATABASE_PASSWORD'),
+            'db': config.get('MYSQL_DATABASE_DB'),
+            'charset': config.get('MYSQL_DATABASE_CHARSET', 'utf8'),
+            'cursorclass': self.cursorclass,
+        }
+
+        self.pool = ConnectionPool(
+            lambda: pymysql.connect(**connect_args),
+            min_size=config.get('DB_POOL_MIN_SIZE', 1),
+            max_size=config.get('DB_POOL_MAX_SIZE', 10),
+            recycle=config.get('DB_POOL_RECYCLE', 3600),
+            idle_timeout=config.get('DB_POOL_IDLE_TIMEOUT', 300),
+            timeout=config.get('DB_POOL_TIMEOUT', 10),
+            ping_after=config.get('DB_POOL_PING_AFTER', 10),
+        )
+        app.teardown_appcontext(self.teardown)
+        slow_query_log.init_app(app)
+
+    def get_db(self):
+        if '_pooled_db' not in g:
+            g._pooled_db = self.pool.acquire()
+        return g._pooled_db
+
+    def teardown(self, exception):
+        conn = g.pop('_pooled_db', None)
+        if conn is not None:
+            self.pool.release(conn)
+
+    def stats(self):
+        return self.pool.stats()
@@ -0,0 +1,166 @@
+#------------------------------------------------------------
+# Slow-query log.
+#
+# Any statement that takes DB_SLOW_QUERY_MS or longer is logged as
+# a warning. The entry holds the duration, the route that ran the
+# statement and the statement with every literal and parameter
+# replaced by ?, so no user data reaches the log. Statements that
+# normalize to the same text share a fingerprint.
+#
+# The first time a fingerprint is seen, its statement is
+# EXPLAINed on the same connection: straight away for buffered
+# cursors, or once the result has been read for the unbuffered
+# export cursor. The plans and per-fingerprint counts are served
+# at GET /admin/slow_queries.
+#------------------------------------------------------------
+import datetime
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+
+import pymysql
+from flask import current_app, has_app_context, has_request_context, request
+
+EXPLAINABLE = ('SELECT', 'INSERT', 'UPDATE', 'DELETE', 'REPLACE', 'WITH')
+
+_STRING = re.compile(r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.|\"\")*\"")
+_NUMBER = re.compile(r'(?<![\w.])-?\d+(?:\.\d+)?(?![\w.])')
+_PLACEHOLDER = re.compile(r'%(?:\(\w+\))?s')
+_SPACE = re.compile(r'\s+')
+# (?, ?, ?) lists and multi-row VALUES collapse to one form, so
+# IN lists and batch inserts of any size share a fingerprint
+_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+_ROWS = re.compile(r'\(\?\+\)(?:\s*,\s*\(\?\+\))+')
+
+
+def normalize(query):
+    if isinstance(query, bytes):
+        query = query.decode(errors='replace')
+    query = _STRING.sub('?', query)
+    query = _PLACEHOLDER.sub('?', query)
+    query = _NUMBER.sub('?', query)
+    query = _SPACE.sub(' ', query).strip().rstrip(';').strip()
+    query = _LIST.sub('(?+)', query)
+    return _ROWS.sub('(?+)', query)
+
+
+def fingerprint(normalized):
+    return hashlib.sha1(normalized.encode()).hexdigest()[:16]
+
+
+# only the type (and length of strings) of each parameter
+def redact(args):
+    if args is None:
+        return []
+    if isinstance(args, dict):
+        return {key: redact([value])[0] for key, value in args.items()}
+    if not isinstance(args, (list, tuple)):
+        args = [args]
+    redacted = []
+    for value in args:
+        if isinstance(value, (str, bytes)):
+            redacted.append(f'<{type(value).__name__}:{len(value)}>')
+        elif isinstance(value, (list, tuple)):
+            redacted.append(f'<{len(value)} values>')
+        else:
+            redacted.append(f'<{type(value).__name__}>')
+    return redacted
+
+
+def calling_route():
+    if has_request_context():
+        rule = request.url_rule.rule if request.url_rule is not None else request.path
+        return f'{request.method} {rule}'
+    return 'cli'
+
+
+class SlowQueryLog:
+
+    def __init__(self):
+        self.threshold = None
+        self.explain = True
+        self.max_fingerprints = 500
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def init_app(self, app):
+        config = app.config
+        threshold_ms = config.get('DB_SLOW_QUERY_MS', 200)
+        # a negative threshold turns the log off
+        self.threshold = threshold_ms / 1000 if threshold_ms is not None and threshold_ms >= 0 else None
+        self.explain = config.get('DB_SLOW_QUERY_EXPLAIN', True)
+        self.max_fingerprints = config.get('DB_SLOW_QUERY_MAX_FINGERPRINTS', 500)
+
+    def is_slow(self, seconds):
+        return self.threshold is not None and seconds >= self.threshold
+
+    #------------------------------------------------------------
+    # Records one slow statement. Returns its fingerprint when the
+    # caller should capture an EXPLAIN for it (the first time the
+    # fingerprint is seen), None otherwise.
+    def record(self, query, args, seconds):
+        normalized = normalize(query)
+        key = fingerprint(normalized)
+        route = calling_route()
+
+        if has_app_context():
+            current_app.logger.warning(
+                f'slow query {seconds * 1000:.1f} ms [{route}] fp={key}: {normalized} '
+                f'params={redact(args)}')
+
+        now = datetime.datetime.utcnow().replace(microsecond=0)
+        with self._lock:
+            entry = self._entries.get(key)
+            first = entry is None
+            if first:
+                entry = self._entries[key] = {
+                    'fingerprint': key,
+                    'query': normalized,
+                    'routes': [],
+                    'count': 0,
+                    'total_ms': 0.0,
+                    'max_ms': 0.0,
+                    'first_seen': now.isoformat(),
+                    'explain': None,
+                }
+                while len(self._entries) > self.max_fingerprints:
+                    self._entries.popitem(last=False)
+            self._entries.move_to_end(key)
+            entry['count'] += 1
+            entry['total_ms'] = round(entry['total_ms'] + seconds * 1000, 3)
+            entry['max_ms'] = round(max(entry['max_ms'], seconds * 1000), 3)
+            entry['last_seen'] = now.isoformat()
+            if route not in entry['routes']:
+                entry['routes'].append(route)
+
+        if not first or not self.explain:
+            return None
+        if not normalized.upper().startswith(EXPLAINABLE):
+            return None
+        return key
+
+    # runs EXPLAIN for a fingerprint returned by record() on a
+    # connection that has no unread result pending
+    def capture_explain(self, key, connection, statement):
+        try:
+            with connection.cursor(pymysql.cursors.DictCursor) as cursor:
+                cursor.execute('EXPLAIN ' + statement)
+                plan = cursor.fetchall()
+        except pymysql.Error as e:
+            plan = {'error': str(e)}
+        with self._lock:
+            if key in self._entries:
+                self._entries[key]['explain'] = plan
+
+    def entries(self):
+        with self._lock:
+            entries = [dict(entry, routes=list(entry['routes'])) for entry in self._entries.values()]
+        return sorted(entries, key=lambda entry: entry['total_ms'], reverse=True)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+slow_query_log = SlowQueryLog()
@@ -4,43 +4,44 @@ from flask import jsonify
 from flask import make_response
 from flask import current_app
 from backend.db_connection import db
+from backend.utils.cache import cached
+from backend.utils.conditional import conditional
+from backend.utils import batch
+from backend.utils import multiget
+from backend.utils import pagination
+from backend.utils import write_hooks
 
 foodlog_route = Blueprint('foodlog_route', __name__)
 
+FOODLOG_COLUMNS = 'LogID, UserID, Date, FoodID, Calories, MealType'
+
+# fields accepted by POST /foodlog/batch
+FOODLOG_FIELDS = [
+    batch.Field('LogID', batch.to_int, True),
+    batch.Field('UserID', batch.to_int, True),
+    batch.Field('Date', batch.to_date, True),
+    batch.Field('MealType', batch.to_text, False),
+    batch.Field('FoodID', batch.to_int, False),
+    batch.Field('Calories', batch.to_int, False),
+    batch.Field('Protein', batch.to_decimal, False),
+    batch.Field('Carbs', batch.to_decimal, False),
+    batch.Field('Fats', batch.to_decimal, False),
+]
+
 #------------------------------------------------------------
 # Get all food logs (optionally filtered by user_id)
 @foodlog_route.route('/', methods=['GET'])
+@conditional('FoodLog')
+@cached('FoodLog')
 def get_food_logs():
     current_app.logger.info('GET /foodlog route')
-    user_id = request.args.get('user_id')
-
-    cursor = db.get_db().cursor()
-
-    if user_id:
-        query = '''
-            SELECT LogID, UserID, Date, FoodID, Calories, MealType
-            FROM FoodLog
-            WHERE UserID = %s
-            ORDER BY Date DESC
-        '''
-        cursor.execute(query, (user_id,))
-    else:
-        query = '''
-            SELECT LogID, UserID, Date, FoodID, Calories, MealType
-            FROM FoodLog
-            ORDER BY Date DESC
-        '''
-        cursor.execute(query)
-
-    theData = cursor.fetchall()
-
-    the_response = make_response(jsonify(theData))
-    the_response.status_code = 200
-    return the_response
+    return pagination.list_response('FoodLog', FOODLOG_COLUMNS)
 
 #------------------------------------------------------------
 # Get details for a single food log by FoodLogID
 @foodlog_route.route('/<foodLogID>', methods=['GET'])
+@conditional('FoodLog')
+@cached('FoodLog')
 def get_food_log(foodLogID):
     current_app.logger.info(f'GET /foodlog/{foodLogID} route')
 
@@ -58,6 +59,35 @@ def get_food_log(foodLogID):
     the_response.status_code = 200
     return the_response
 
+#------------------------------------------------------------
+# Get several food logs by (UserID, LogID) in one request, in the
+# order asked for (see utils/multiget.py)
+@foodlog_route.route('/lookup', methods=['GET'])
+@conditional('FoodLog')
+@cached('FoodLog')
+def lookup_food_logs():
+    current_app.logger.info('GET /foodlog/lookup route')
+
+    try:
+        keys = multiget.keys_from_args(request.args)
+    except multiget.BadLookup as e:
+        return multiget.error_response(e)
+
+    return multiget.lookup_response('FoodLog', FOODLOG_COLUMNS, keys)
+
+#------------------------------------------------------------
+# Same as above with the keys in the body, for long lists
+@foodlog_route.route('/lookup', methods=['POST'])
+def lookup_food_logs_post():
+    current_app.logger.info('POST /foodlog/lookup route')
+
+    try:
+        keys = multiget.keys_from_body()
+    except multiget.BadLookup as e:
+        return multiget.error_response(e)
+
+    return multiget.lookup_response('FoodLog', FOODLOG_COLUMNS, keys)
+
 #------------------------------------------------------------
 # Inserts food and its data to the food log
 @foodlog_route.route('/', methods=['POST'])
@@ -81,12 +111,32 @@ def add_food_log():
         data["MealType"]
     ))
 
+    write_hooks.after_log_write('FoodLog', [(data["UserID"], data["Date"])])
     db.get_db().commit()
 
     the_response = make_response(jsonify({"message": "Food log added"}))
     the_response.status_code = 201
     return the_response
 
+#------------------------------------------------------------
+# Add many food logs at once (JSON array or NDJSON body)
+@foodlog_route.route('/batch', methods=['POST'])
+def add_food_logs_batch():
+    current_app.logger.info('POST /foodlog/batch route')
+
+    try:
+        rows = batch.read_rows()
+    except batch.BatchError as e:
+        return batch.error_response(e)
+
+    valid, errors = batch.validate_rows(rows, FOODLOG_FIELDS)
+    inserted, failed = batch.insert_rows('FoodLog', FOODLOG_FIELDS, valid)
+    inserted_rows = batch.as_dicts(FOODLOG_FIELDS, inserted)
+    write_hooks.after_log_write('FoodLog', [(row['UserID'], row['Date']) for row in inserted_rows])
+    db.get_db().commit()
+
+    return batch.batch_response(len(rows), inserted, errors + failed)
+
 #------------------------------------------------------------
 # Update food log info for customer with particular userID
 @foodlog_route.route('/', methods=['PUT'])
@@ -106,8 +156,10 @@ def update_foodlog():
         data['Fats'], data['LogID']
     )
 
+    old_days = write_hooks.days_for_log('FoodLog', data['LogID'])
     cursor = db.get_db().cursor()
     cursor.execute(query, values)
+    write_hooks.after_log_write('FoodLog', old_days + [(data['UserID'], data['Date'])])
     db.get_db().commit()
 
     return jsonify({'message': 'Food log updated!'}), 200
@@ -0,0 +1,40 @@
+########################################################
+# Liveness / readiness endpoints for the process manager,
+# the Docker health check and load balancers
+########################################################
+from flask import Blueprint
+from flask import jsonify
+from flask import make_response
+from flask import current_app
+import pymysql
+from backend.db_connection import db
+from backend.db_connection.pool import PoolTimeout
+
+health_route = Blueprint('health_route', __name__)
+
+#------------------------------------------------------------
+# the process is up and answering requests
+@health_route.route('/live', methods=['GET'])
+def live():
+    the_response = make_response(jsonify({'status': 'ok'}))
+    the_response.status_code = 200
+    return the_response
+
+#------------------------------------------------------------
+# the process can serve traffic, i.e. it can get a database
+# connection from its pool and run a query on it
+@health_route.route('/ready', methods=['GET'])
+def ready():
+    try:
+        cursor = db.get_db().cursor()
+        cursor.execute('SELECT 1')
+        cursor.fetchall()
+    except (pymysql.Error, PoolTimeout) as e:
+        current_app.logger.warning(f'readiness check failed: {e}')
+        the_response = make_response(jsonify({'status': 'unavailable', 'error': str(e)}))
+        the_response.status_code = 503
+        return the_response
+
+    the_response = make_response(jsonify({'status': 'ready'}))
+    the_response.status_code = 200
+    return the_response
@@ -0,0 +1,242 @@
+#------------------------------------------------------------
+# Heart rate analytics for one user over a date range:
+#
+#   - time in each heart rate zone, with the zones taken as shares
+#     of the age-predicted maximum (220 - Age)
+#   - resting heart rate per day and its trend in BPM per week
+#   - 7 and 28 day rolling averages of the logged daily average
+#   - anomaly flags for days far from the preceding 28 days
+#
+# The database does the per-row work: the minute tier is read as
+# a (day, BPM) -> minutes histogram and the daily log as one value
+# per day. Everything after that is array arithmetic over a grid
+# with one slot per calendar day (NaN where nothing was logged),
+# so the cost grows with the number of days, not of samples.
+#------------------------------------------------------------
+import datetime
+
+import numpy as np
+
+from backend.db_connection import db
+
+MAX_DAYS = 3660
+ROLLING_WINDOWS = (7, 28)
+# days before ?from= that are read so the first rolling averages
+# and anomaly baselines are complete
+BASELINE_DAYS = 28
+# a day needs this many logged days in its baseline to be flagged
+MIN_BASELINE_DAYS = 7
+ANOMALY_Z = 3.0
+# floor for the baseline standard deviation (BPM), so that a very
+# steady user is not flagged for a change of a beat or two
+MIN_STD = 3.0
+# resting heart rate is the BPM below which this share of the
+# day's sampled minutes fall
+RESTING_PERCENTILE = 0.05
+# lower bound of zones 1-5 as a share of the maximum heart rate
+ZONE_SHARES = [0.5, 0.6, 0.7, 0.8, 0.9]
+
+
+class AnalyticsError(ValueError):
+    pass
+
+
+#------------------------------------------------------------
+# array helpers
+def _window_sums(values, window):
+    # sum of the trailing `window` entries ending at each index
+    totals = np.concatenate(([0.0], np.cumsum(values)))
+    ends = np.arange(1, len(values) + 1)
+    return totals[ends] - totals[np.maximum(ends - window, 0)]
+
+
+def _ratio(numerator, denominator):
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(denominator > 0, numerator / denominator, np.nan)
+
+
+def daily_means(day_index, values, days):
+    sums = np.bincount(day_index, weights=values, minlength=days)
+    counts = np.bincount(day_index, minlength=days)
+    return _ratio(sums, counts)
+
+
+def rolling_mean(series, window):
+    valid = ~np.isnan(series)
+    return _ratio(_window_sums(np.where(valid, series, 0.0), window),
+                  _window_sums(valid.astype(float), window))
+
+
+# z-score of each day against the BASELINE_DAYS before it
+def anomaly_scores(series):
+    valid = ~np.isnan(series)
+    values = np.where(valid, series, 0.0)
+    window = BASELINE_DAYS + 1
+    # the trailing window includes the day itself, so take it out
+    counts = _window_sums(valid.astype(float), window) - valid
+    sums = _window_sums(values, window) - values
+    squares = _window_sums(values ** 2, window) - values ** 2
+
+    mean = _ratio(sums, counts)
+    variance = np.maximum(_ratio(squares, counts) - mean ** 2, 0.0)
+    std = np.maximum(np.sqrt(variance), MIN_STD)
+    scores = (series - mean) / std
+    flagged = valid & (counts >= MIN_BASELINE_DAYS) & (np.abs(scores) >= ANOMALY_Z)
+    return np.where(counts >= MIN_BASELINE_DAYS, scores, np.nan), flagged
+
+
+# rows sorted by (day, BPM): per day, the BPM at RESTING_PERCENTILE
+# of its minutes
+def resting_rates(day_index, bpm, minutes, days):
+    totals = np.bincount(day_index, weights=minutes, minlength=days)
+    cumulative = np.cumsum(minutes)
+    day_start = (np.cumsum(totals) - totals)[day_index]
+    reached = np.flatnonzero(cumulative - day_start >= RESTING_PERCENTILE * totals[day_index])
+    # the first row of each day that reaches the percentile
+    resting_days, first = np.unique(day_index[reached], return_index=True)
+    resting = np.full(days, np.nan)
+    resting[resting_days] = bpm[reached[first]]
+    return resting
+
+
+def trend_per_week(series):
+    valid = ~np.isnan(series)
+    if valid.sum() < 2:
+        return None
+    slope = np.polyfit(np.flatnonzero(valid), series[valid], 1)[0]
+    return round(float(slope * 7), 2) + 0.0
+
+
+def zone_bounds(age):
+    return np.round(np.array(ZONE_SHARES) * (220 - age)).astype(int)
+
+
+def time_in_zones(bpm, minutes, bounds):
+    # zone 0 is below zone 1
+    zones = np.searchsorted(bounds, bpm, side='right')
+    return np.bincount(zones, weights=minutes, minlength=len(bounds) + 1)
+
+
+#------------------------------------------------------------
+# reading
+def _day_offsets(values, first):
+    return (np.array(values, dtype='datetime64[D]') - np.datetime64(first, 'D')).astype(int)
+
+
+def _read_daily(user_id, start, end):
+    filters, params = [], [user_id]
+    if start:
+        filters.append('AND Date >= %s')
+        params.append(start)
+    if end:
+        filters.append('AND Date <= %s')
+        params.append(end)
+    cursor = db.get_db().cursor()
+    cursor.execute(f'''
+        SELECT Date, AvgHeartRate
+        FROM HeartRateLog
+        WHERE UserID = %s {' '.join(filters)} AND AvgHeartRate IS NOT NULL
+    ''', params)
+    rows = cursor.fetchall()
+    return [row['Date'] for row in rows], np.array([row['AvgHeartRate'] for row in rows], dtype=float)
+
+
+def _read_minutes(user_id, start, end):
+    filters, params = [], [user_id]
+    if start:
+        filters.append('AND BucketStart >= %s')
+        params.append(start)
+    if end:
+        filters.append('AND BucketStart < %s')
+        params.append(end + datetime.timedelta(days=1))
+    cursor = db.get_db().cursor()
+    cursor.execute(f'''
+        SELECT DATE(BucketStart) AS Day, ROUND(SumBPM / SampleCount) AS BPM, COUNT(*) AS Minutes
+        FROM HeartRateTier
+        WHERE UserID = %s AND Tier = 'minute' {' '.join(filters)}
+        GROUP BY Day, BPM
+        ORDER BY Day, BPM
+    ''', params)
+    rows = cursor.fetchall()
+    return ([row['Day'] for row in rows],
+            np.array([row['BPM'] for row in rows], dtype=float),
+            np.array([row['Minutes'] for row in rows], dtype=float))
+
+
+def _as_list(values):
+    return [None if value != value else value for value in np.round(values, 1).tolist()]
+
+
+#------------------------------------------------------------
+# start / end are dates or None (the extent of the data); age may
+# be None, in which case no zones are computed
+def analyze(user_id, age, start, end):
+    if start and end and (end - start).days >= MAX_DAYS:
+        raise AnalyticsError(f'at most {MAX_DAYS} days per request')
+
+    read_from = start - datetime.timedelta(days=BASELINE_DAYS) if start else None
+    daily_dates, daily_values = _read_daily(user_id, read_from, end)
+    minute_days, minute_bpm, minute_counts = _read_minutes(user_id, read_from, end)
+
+    observed = daily_dates + minute_days
+    result = {
+        'UserID': int(user_id),
+        'Age': age,
+        'MaxHeartRate': 220 - age if age is not None else None,
+        'from': start,
+        'to': end,
+        'zones': None,
+        'resting': {'TrendBPMPerWeek': None, 'Source': None},
+        'daily': [],
+    }
+    if not observed and not (start and end):
+        return result
+
+    first = read_from or min(observed)
+    last = end or max(observed)
+    shown_from = start or min(observed)
+    days = (last - first).days + 1
+    shown = slice((shown_from - first).days, days)
+    result['from'], result['to'] = shown_from, last
+
+    daily = daily_means(_day_offsets(daily_dates, first), daily_values, days)
+    minute_index = _day_offsets(minute_days, first)
+    resting = resting_rates(minute_index, minute_bpm, minute_counts, days)
+    rolling = {window: rolling_mean(daily, window) for window in ROLLING_WINDOWS}
+    scores, flagged = anomaly_scores(daily)
+
+    # resting heart rate comes from the samples where there are any,
+    # otherwise the trend falls back to the logged daily averages
+    if not np.isnan(resting[shown]).all():
+        result['resting'] = {'TrendBPMPerWeek': trend_per_week(resting[shown]), 'Source': 'samples'}
+    elif not np.isnan(daily[shown]).all():
+        result['resting'] = {'TrendBPMPerWeek': trend_per_week(daily[shown]), 'Source': 'daily'}
+
+    if age is not None:
+        in_range = minute_index >= shown.start
+        bounds = zone_bounds(age)
+        minutes = time_in_zones(minute_bpm[in_range], minute_counts[in_range], bounds)
+        total = minutes.sum()
+        edges = [0] + bounds.tolist() + [None]
+        result['zones'] = [{
+            'Zone': zone,
+            'FromBPM': edges[zone],
+            'ToBPM': edges[zone + 1],
+            'Minutes': int(minutes[zone]),
+            'Share': round(float(minutes[zone] / total), 3) if total else 0.0,
+        } for zone in range(len(minutes))]
+
+    dates = np.arange(np.datetime64(shown_from, 'D'), np.datetime64(last, 'D') + 1).astype(object)
+    columns = zip(dates.tolist(), _as_list(daily[shown]), _as_list(resting[shown]),
+                  *[_as_list(rolling[window][shown]) for window in ROLLING_WINDOWS],
+                  _as_list(scores[shown]), flagged[shown].tolist())
+    result['daily'] = [{
+        'Date': date,
+        'AvgHeartRate': average,
+        'RestingHeartRate': rest,
+        'Rolling7': week,
+        'Rolling28': month,
+        'ZScore': score,
+        'Anomaly': anomaly,
+    } for date, average, rest, week, month, score, anomaly in columns]
+    return result
@@ -4,43 +4,47 @@ from flask import jsonify
 from flask import make_response
 from flask import current_app
 from backend.db_connection import db
+from backend.utils.cache import cached
+from backend.utils.conditional import conditional
+from backend.utils import batch
+from backend.utils import multiget
+from backend.utils import pagination
+from backend.utils import dates
+from backend.utils import write_hooks
+from backend.heartratelog import analytics
+from backend.heartratelog import samples
+import math
 
 heartratelog_route = Blueprint('heartratelog_route', __name__)
 
+HEARTRATELOG_COLUMNS = 'LogID, UserID, Date, AvgHeartRate'
+
+# points returned by GET /heartratelog/<userID>/samples
+DEFAULT_MAX_POINTS = 1000
+MAX_POINTS = 10000
+
+# fields accepted by POST /heartratelog/batch
+HEARTRATELOG_FIELDS = [
+    batch.Field('LogID', batch.to_int, True),
+    batch.Field('UserID', batch.to_int, True),
+    batch.Field('Date', batch.to_date, True),
+    batch.Field('AvgHeartRate', batch.to_int, True),
+]
+
 #------------------------------------------------------------
 # Get all heart rate logs (optionally filtered by user_id)
 @heartratelog_route.route('/', methods=['GET'])
+@conditional('HeartRateLog')
+@cached('HeartRateLog')
 def get_heartrate_logs():
     current_app.logger.info('GET /heartratelog route')
-    user_id = request.args.get('user_id')
-
-    cursor = db.get_db().cursor()
-
-    if user_id:
-        query = '''
-            SELECT LogID, UserID, Date, AvgHeartRate
-            FROM HeartRateLog
-            WHERE UserID = %s
-            ORDER BY Date DESC
-        '''
-        cursor.execute(query, (user_id,))
-    else:
-        query = '''
-            SELECT LogID, UserID, Date, AvgHeartRate
-            FROM HeartRateLog
-            ORDER BY Date DESC
-        '''
-        cursor.execute(query)
-
-    theData = cursor.fetchall()
-
-    the_response = make_response(jsonify(theData))
-    the_response.status_code = 200
-    return the_response
+    return pagination.list_response('HeartRateLog', HEARTRATELOG_COLUMNS)
 
 #------------------------------------------------------------
 # Get details for a single heart rate log by HeartRateLogID
 @heartratelog_route.route('/<heartRateLogID>', methods=['GET'])
+@conditional('HeartRateLog')
+@cached('HeartRateLog')
 def get_heartrate_log(heartRateLogID):
     current_app.logger.info(f'GET /heartratelog/{heartRateLogID} route')
 
@@ -56,4 +60,171 @@ def get_heartrate_log(heartRateLogID):
 
     the_response = make_response(jsonify(theData))
     the_response.status_code = 200
-    return the_response
\ No newline at end of file
+    return the_response
+
+#------------------------------------------------------------
+# Get several heart rate logs by (UserID, LogID) in one request, in the
+# order asked for (see utils/multiget.py)
+@heartratelog_route.route('/lookup', methods=['GET'])
+@conditional('HeartRateLog')
+@cached('HeartRateLog')
+def lookup_heartrate_logs():
+    current_app.logger.info('GET /heartratelog/lookup route')
+
+    try:
+        keys = multiget.keys_from_args(request.args)
+    except multiget.BadLookup as e:
+        return multiget.error_response(e)
+
+    return multiget.lookup_response('HeartRateLog', HEARTRATELOG_COLUMNS, keys)
+
+#------------------------------------------------------------
+# Same as above with the keys in the body, for long lists
+@heartratelog_route.route('/lookup', methods=['POST'])
+def lookup_heartrate_logs_post():
+    current_app.logger.info('POST /heartratelog/lookup route')
+
+    try:
+        keys = multiget.keys_from_body()
+    except multiget.BadLookup as e:
+        return multiget.error_response(e)
+
+    return multiget.lookup_response('HeartRateLog', HEARTRATELOG_COLUMNS, keys)
+
+#------------------------------------------------------------
+# Add many heart rate logs at once (JSON array or NDJSON body)
+@heartratelog_route.route('/batch', methods=['POST'])
+def add_heartrate_logs_batch():
+    current_app.logger.info('POST /heartratelog/batch route')
+
+    try:
+        rows = batch.read_rows()
+    except batch.BatchError as e:
+        return batch.error_response(e)
+
+    valid, errors = batch.validate_rows(rows, HEARTRATELOG_FIELDS)
+    inserted, failed = batch.insert_rows('HeartRateLog', HEARTRATELOG_FIELDS, valid)
+    inserted_rows = batch.as_dicts(HEARTRATELOG_FIELDS, inserted)
+    write_hooks.after_log_write('HeartRateLog', [(row['UserID'], row['Date']) for row in inserted_rows])
+    db.get_db().commit()
+
+    return batch.batch_response(len(rows), inserted, errors + failed)
+
+#------------------------------------------------------------
+# Upload raw wearable samples for one user (see samples.py for
+# the body format); the minute / hour / day tiers are updated in
+# the same transaction
+@heartratelog_route.route('/<int:userID>/samples', methods=['POST'])
+def add_heartrate_samples(userID):
+    current_app.logger.info(f'POST /heartratelog/{userID}/samples route')
+
+    try:
+        parsed = samples.parse_samples(request.get_json(silent=True))
+    except samples.SampleError as e:
+        the_response = make_response(jsonify({'error': str(e)}))
+        the_response.status_code = 400
+        return the_response
+
+    cursor = db.get_db().cursor()
+    cursor.execute('SELECT UserID FROM User WHERE UserID = %s', (userID,))
+    if not cursor.fetchall():
+        the_response = make_response(jsonify({'error': f'no user {userID}'}))
+        the_response.status_code = 404
+        return the_response
+
+    inserted = samples.store(cursor, userID, parsed)
+    write_hooks.after_table_write(['HeartRateSample'], [userID])
+    db.get_db().commit()
+
+    the_response = make_response(jsonify({
+        'received': len(parsed),
+        'inserted': inserted,
+        'from': parsed[0][0],
+        'to': parsed[-1][0],
+    }))
+    the_response.status_code = 201
+    return the_response
+
+#------------------------------------------------------------
+# Heart rate between ?from= and ?to= (ISO 8601, UTC) as min / max /
+# mean / count points. ?resolution= is the point width in seconds
+# (or minute, hour, day); without it the width is chosen so that
+# at most ?max_points= points (default 1000) come back.
+@heartratelog_route.route('/<int:userID>/samples', methods=['GET'])
+@conditional('HeartRateSample', user_arg='userID')
+@cached('HeartRateSample', user_arg='userID')
+def get_heartrate_samples(userID):
+    current_app.logger.info(f'GET /heartratelog/{userID}/samples route')
+
+    try:
+        if not request.args.get('from') or not request.args.get('to'):
+            raise samples.SampleError('from and to are required')
+        start = samples.parse_time(request.args['from'])
+        end = samples.parse_time(request.args['to'])
+        if start >= end:
+            raise samples.SampleError('from must be before to')
+        span = (end - start).total_seconds()
+
+        resolution = request.args.get('resolution')
+        if resolution in samples.TIER_SECONDS:
+            resolution = samples.TIER_SECONDS[resolution]
+        elif resolution:
+            resolution = int(resolution)
+        else:
+            max_points = int(request.args.get('max_points', DEFAULT_MAX_POINTS))
+            if not 1 <= max_points <= MAX_POINTS:
+                raise samples.SampleError(f'max_points must be between 1 and {MAX_POINTS}')
+            resolution = math.ceil(span / max_points)
+        if resolution < 1:
+            raise samples.SampleError('resolution must be at least 1 second')
+        if span / resolution > MAX_POINTS:
+            raise samples.SampleError(f'at most {MAX_POINTS} points per request, use a coarser resolution')
+    except (samples.SampleError, ValueError) as e:
+        message = str(e) if isinstance(e, samples.SampleError) else 'resolution and max_points must be integers'
+        the_response = make_response(jsonify({'error': message}))
+        the_response.status_code = 400
+        return the_response
+
+    tier, points = samples.read(userID, start, end, resolution)
+
+    the_response = make_response(jsonify({
+        'UserID': userID,
+        'from': start,
+        'to': end,
+        'resolution': resolution,
+        'tier': tier,
+        'points': points,
+    }))
+    the_response.status_code = 200
+    return the_response
+
+#------------------------------------------------------------
+# Time in heart rate zones, resting heart rate trend, rolling
+# averages and anomalous days for one user, optionally limited
+# to ?from=YYYY-MM-DD and/or ?to=YYYY-MM-DD (see analytics.py)
+@heartratelog_route.route('/<userID>/analytics', methods=['GET'])
+@conditional('HeartRateLog', 'HeartRateSample', user_arg='userID')
+@cached('HeartRateLog', 'HeartRateSample', user_arg='userID')
+def get_heartrate_analytics(userID):
+    current_app.logger.info(f'GET /heartratelog/{userID}/analytics route')
+
+    cursor = db.get_db().cursor()
+    cursor.execute('SELECT Age FROM User WHERE UserID = %s', (userID,))
+    user = cursor.fetchone()
+    if user is None:
+        the_response = make_response(jsonify({'error': f'no user {userID}'}))
+        the_response.status_code = 404
+        return the_response
+
+    try:
+        start, end = dates.parse_range(request.args)
+        result = analytics.analyze(userID, user['Age'], start, end)
+    except (dates.BadDateRange, analytics.AnalyticsError) as e:
+        the_response = make_response(jsonify({'error': str(e)}))
+        the_response.status_code = 400
+        return the_response
+
+    the_response = make_response(jsonify(result))
+    the_response.status_code = 200
+    return the_response
+
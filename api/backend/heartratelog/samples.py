@@ -0,0 +1,224 @@
+#------------------------------------------------------------
+# Raw heart rate samples and their minute / hour / day tiers.
+#
+# Uploads are compact: one start time plus either a fixed
+# interval or per-sample offsets, and a list of BPM values:
+#
+#   {"start": "2024-05-01T10:00:00Z", "interval_ms": 1000, "bpm": [72, 73, 75]}
+#   {"start": 1714557600000, "offsets_ms": [0, 480, 1010], "bpm": [72, 73, 75]}
+#
+# The samples are appended to HeartRateSample. Within the same
+# transaction, every minute bucket the upload touches is then
+# recomputed from the raw rows, every touched hour from its
+# minutes, and every touched day from its hours. Because the
+# tiers are recomputed rather than incremented, a retried upload
+# (whose samples are ignored as duplicates) leaves them unchanged.
+#
+# Reads pick the coarsest tier whose buckets are no wider than the
+# requested resolution and regroup it to that resolution, so a
+# year at one point per day reads ~365 day rows instead of ~31M
+# samples. All times are UTC.
+#------------------------------------------------------------
+import datetime
+
+from backend.db_connection import db
+
+MAX_SAMPLES = 86400
+MIN_BPM, MAX_BPM = 20, 250
+CHUNK_SIZE = 1000
+
+# finest first: (tier, bucket width in seconds, bucket start
+# expression, source table, source filter, time column, and the
+# min / max / sum / count aggregates over the source)
+TIERS = [
+    ('minute', 60, "DATE_FORMAT(SampleTime, '%%Y-%%m-%%d %%H:%%i:00')",
+     'HeartRateSample', '', 'SampleTime', 'MIN(BPM)', 'MAX(BPM)', 'SUM(BPM)', 'COUNT(*)'),
+    ('hour', 3600, "DATE_FORMAT(BucketStart, '%%Y-%%m-%%d %%H:00:00')",
+     'HeartRateTier', "Tier = 'minute' AND ", 'BucketStart',
+     'MIN(MinBPM)', 'MAX(MaxBPM)', 'SUM(SumBPM)', 'SUM(SampleCount)'),
+    ('day', 86400, "DATE_FORMAT(BucketStart, '%%Y-%%m-%%d 00:00:00')",
+     'HeartRateTier', "Tier = 'hour' AND ", 'BucketStart',
+     'MIN(MinBPM)', 'MAX(MaxBPM)', 'SUM(SumBPM)', 'SUM(SampleCount)'),
+]
+TIER_SECONDS = {tier[0]: tier[1] for tier in TIERS}
+
+REFRESH_QUERY = '''
+    INSERT INTO HeartRateTier (UserID, Tier, BucketStart, MinBPM, MaxBPM, SumBPM, SampleCount)
+    SELECT * FROM (
+        SELECT UserID, %s AS Tier, {bucket} AS BucketStart, {min} AS MinBPM, {max} AS MaxBPM,
+               {sum} AS SumBPM, {count} AS SampleCount
+        FROM {table}
+        WHERE {filter}UserID = %s AND {column} >= %s AND {column} < %s
+        GROUP BY UserID, BucketStart
+    ) AS agg
+    ON DUPLICATE KEY UPDATE MinBPM = agg.MinBPM, MaxBPM = agg.MaxBPM,
+                            SumBPM = agg.SumBPM, SampleCount = agg.SampleCount
+'''
+
+
+class SampleError(ValueError):
+    pass
+
+
+#------------------------------------------------------------
+# parsing
+def parse_time(value):
+    if isinstance(value, bool):
+        raise SampleError('times must be ISO 8601 strings or epoch milliseconds')
+    if isinstance(value, (int, float)):
+        return datetime.datetime(1970, 1, 1) + datetime.timedelta(milliseconds=value)
+    try:
+        moment = datetime.datetime.fromisoformat(str(value))
+    except ValueError:
+        raise SampleError('times must be ISO 8601 strings or epoch milliseconds')
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return moment
+
+
+def _round_ms(moment):
+    return moment.replace(microsecond=moment.microsecond // 1000 * 1000)
+
+
+# returns [(SampleTime, BPM)] sorted by time, one per millisecond
+def parse_samples(body):
+    if not isinstance(body, dict) or 'bpm' not in body or 'start' not in body:
+        raise SampleError('expected an object with start, bpm and interval_ms or offsets_ms')
+    values = body['bpm']
+    if not isinstance(values, list) or not values:
+        raise SampleError('bpm must be a non-empty list')
+    if len(values) > MAX_SAMPLES:
+        raise SampleError(f'at most {MAX_SAMPLES} samples per upload')
+
+    start = parse_time(body['start'])
+    if 'offsets_ms' in body:
+        offsets = body['offsets_ms']
+        if not isinstance(offsets, list) or len(offsets) != len(values):
+            raise SampleError('offsets_ms must have one entry per bpm value')
+    elif 'interval_ms' in body:
+        interval = body['interval_ms']
+        if isinstance(interval, bool) or not isinstance(interval, (int, float)) or interval <= 0:
+            raise SampleError('interval_ms must be a positive number')
+        offsets = [index * interval for index in range(len(values))]
+    else:
+        raise SampleError('either interval_ms or offsets_ms is required')
+
+    samples = {}
+    for index, (offset, bpm) in enumerate(zip(offsets, values)):
+        if isinstance(bpm, bool) or not isinstance(bpm, (int, float)) or not MIN_BPM <= bpm <= MAX_BPM:
+            raise SampleError(f'bpm[{index}] must be a number between {MIN_BPM} and {MAX_BPM}')
+        if isinstance(offset, bool) or not isinstance(offset, (int, float)) or offset < 0:
+            raise SampleError(f'offsets_ms[{index}] must be a non-negative number')
+        moment = _round_ms(start + datetime.timedelta(milliseconds=offset))
+        samples[moment] = int(round(bpm))
+    return sorted(samples.items())
+
+
+#------------------------------------------------------------
+# writing
+def _floor(moment, seconds):
+    if seconds == 60:
+        return moment.replace(second=0, microsecond=0)
+    if seconds == 3600:
+        return moment.replace(minute=0, second=0, microsecond=0)
+    return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+# merges the buckets the given times fall in into [start, end) runs
+def _ranges(times, seconds):
+    width = datetime.timedelta(seconds=seconds)
+    ranges = []
+    for moment in times:
+        start = _floor(moment, seconds)
+        if ranges and start <= ranges[-1][1]:
+            ranges[-1][1] = max(ranges[-1][1], start + width)
+        else:
+            ranges.append([start, start + width])
+    return ranges
+
+
+# recomputes every tier bucket that contains one of `times`
+def refresh_tiers(cursor, user_id, times):
+    times = sorted(times)
+    for name, seconds, bucket, table, source_filter, column, low, high, total, count in TIERS:
+        query = REFRESH_QUERY.format(bucket=bucket, table=table, filter=source_filter,
+                                     column=column, min=low, max=high, sum=total, count=count)
+        for start, end in _ranges(times, seconds):
+            cursor.execute(query, (name, user_id, start, end))
+
+
+# stores the samples and refreshes the tiers inside the caller's
+# transaction; returns the number of new samples
+def store(cursor, user_id, samples):
+    query = '''
+        INSERT INTO HeartRateSample (UserID, SampleTime, BPM)
+        VALUES (%s, %s, %s)
+        ON DUPLICATE KEY UPDATE BPM = BPM
+    '''
+    rows = [(user_id, moment, bpm) for moment, bpm in samples]
+    inserted = 0
+    for start in range(0, len(rows), CHUNK_SIZE):
+        # a duplicate counts 0 affected rows, a new sample 1
+        inserted += cursor.executemany(query, rows[start:start + CHUNK_SIZE]) or 0
+    refresh_tiers(cursor, user_id, [moment for moment, _ in samples])
+    return inserted
+
+
+#------------------------------------------------------------
+# reading
+def choose_tier(resolution):
+    chosen = 'raw'
+    for name, seconds, *_ in TIERS:
+        if seconds <= resolution:
+            chosen = name
+    return chosen
+
+
+# query behind read(); its parameters are (start, resolution,
+# user, [tier,] start, end)
+def read_query(tier):
+    if tier == 'raw':
+        source, column, tier_filter = 'HeartRateSample', 'SampleTime', ''
+        low, high, total, count = 'MIN(BPM)', 'MAX(BPM)', 'SUM(BPM)', 'COUNT(*)'
+    else:
+        source, column, tier_filter = 'HeartRateTier', 'BucketStart', 'AND Tier = %s'
+        low, high, total, count = 'MIN(MinBPM)', 'MAX(MaxBPM)', 'SUM(SumBPM)', 'SUM(SampleCount)'
+    return f'''
+        SELECT FLOOR(TIMESTAMPDIFF(SECOND, %s, {column}) / %s) AS Slot,
+               {low} AS MinBPM, {high} AS MaxBPM,
+               {total} / {count} AS MeanBPM, {count} AS SampleCount
+        FROM {source}
+        WHERE UserID = %s {tier_filter} AND {column} >= %s AND {column} < %s
+        GROUP BY Slot
+        ORDER BY Slot
+    '''
+
+
+def read_params(user_id, tier, start, end, resolution):
+    params = [start, resolution, user_id]
+    if tier != 'raw':
+        params.append(tier)
+    return params + [start, end]
+
+
+# points of `resolution` seconds between start and end, from the
+# coarsest tier that is fine enough
+def read(user_id, start, end, resolution):
+    tier = choose_tier(resolution)
+    if tier != 'raw':
+        # align the points with the tier's buckets
+        start = _floor(start, TIER_SECONDS[tier])
+
+    cursor = db.get_db().cursor()
+    cursor.execute(read_query(tier), read_params(user_id, tier, start, end, resolution))
+
+    points = []
+    for row in cursor.fetchall():
+        points.append({
+            'BucketStart': start + datetime.timedelta(seconds=int(row['Slot']) * resolution),
+            'MinBPM': row['MinBPM'],
+            'MaxBPM': row['MaxBPM'],
+            'MeanBPM': round(float(row['MeanBPM']), 1),
+            'SampleCount': int(row['SampleCount']),
+        })
+    return tier, points
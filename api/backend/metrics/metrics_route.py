@@ -0,0 +1,34 @@
+########################################################
+# Prometheus scrape endpoint
+########################################################
+from flask import Blueprint
+from flask import make_response
+from backend.db_connection import db
+from backend.utils.cache import response_cache
+from backend.utils.metrics import metrics, PROMETHEUS_MIMETYPE
+
+metrics_route = Blueprint('metrics_route', __name__)
+
+#------------------------------------------------------------
+# request histograms plus the connection pool and response cache
+# counters of this worker process
+@metrics_route.route('/metrics', methods=['GET'])
+def get_metrics():
+    pool = db.stats()
+    cache = response_cache.stats()
+    values = [
+        ('healthhub_db_pool_size', 'gauge', 'Open database connections.', pool['size']),
+        ('healthhub_db_pool_in_use', 'gauge', 'Connections checked out by requests.', pool['in_use']),
+        ('healthhub_db_pool_idle', 'gauge', 'Connections idle in the pool.', pool['idle']),
+        ('healthhub_db_pool_checkouts_total', 'counter', 'Connections handed out.', pool['checkouts']),
+        ('healthhub_db_pool_waits_total', 'counter', 'Checkouts that had to wait.', pool['waits']),
+        ('healthhub_db_pool_timeouts_total', 'counter', 'Checkouts that timed out.', pool['timeouts']),
+        ('healthhub_cache_hits_total', 'counter', 'Response cache hits.', cache['hits']),
+        ('healthhub_cache_misses_total', 'counter', 'Response cache misses.', cache['misses']),
+        ('healthhub_cache_entries', 'gauge', 'Responses held in the cache.', cache.get('entries')),
+    ]
+
+    the_response = make_response(metrics.render(values))
+    the_response.status_code = 200
+    the_response.headers['Content-Type'] = PROMETHEUS_MIMETYPE
+    return the_response
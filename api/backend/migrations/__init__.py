@@ -0,0 +1,108 @@
+#------------------------------------------------------------
+# Versioned schema migrations.
+#
+# Each file in versions/ is named NNNN_description.sql and holds
+# plain SQL statements separated by semicolons. Files are applied
+# in version order and every applied version is recorded in the
+# SchemaMigrations table, so running the command again only picks
+# up new files.
+#
+#   flask --app backend_app db-migrate          apply pending versions
+#   flask --app backend_app db-migrate --list   show what is applied
+#   flask --app backend_app db-explain-check    EXPLAIN the route queries
+#
+# MySQL commits DDL implicitly, so a migration that fails half way
+# is not rolled back: fix the file and the database by hand, then
+# rerun.
+#------------------------------------------------------------
+import os
+import re
+
+import click
+
+from backend.db_connection import db
+
+VERSIONS_DIR = os.path.join(os.path.dirname(__file__), 'versions')
+FILENAME_PATTERN = re.compile(r'^(\d+)_(\w+)\.sql$')
+
+CREATE_TABLE = '''
+    CREATE TABLE IF NOT EXISTS SchemaMigrations (
+        Version INT PRIMARY KEY,
+        Name VARCHAR(255) NOT NULL,
+        AppliedAt DATETIME DEFAULT CURRENT_TIMESTAMP
+    )
+'''
+
+
+def available_migrations():
+    migrations = []
+    for filename in os.listdir(VERSIONS_DIR):
+        match = FILENAME_PATTERN.match(filename)
+        if match:
+            migrations.append((int(match.group(1)), match.group(2),
+                               os.path.join(VERSIONS_DIR, filename)))
+    return sorted(migrations)
+
+
+def split_statements(sql):
+    lines = [line for line in sql.splitlines() if not line.strip().startswith('--')]
+    return [stmt.strip() for stmt in '\n'.join(lines).split(';') if stmt.strip()]
+
+
+def applied_versions():
+    cursor = db.get_db().cursor()
+    cursor.execute(CREATE_TABLE)
+    cursor.execute('SELECT Version FROM SchemaMigrations')
+    return {row['Version'] for row in cursor.fetchall()}
+
+
+def migrate(echo=print):
+    conn = db.get_db()
+    done = applied_versions()
+    applied = []
+
+    for version, name, path in available_migrations():
+        if version in done:
+            continue
+        echo(f'applying {version:04d}_{name}')
+        with open(path) as f:
+            statements = split_statements(f.read())
+
+        cursor = conn.cursor()
+        for statement in statements:
+            cursor.execute(statement)
+        cursor.execute('INSERT INTO SchemaMigrations (Version, Name) VALUES (%s, %s)',
+                       (version, name))
+        conn.commit()
+        applied.append(version)
+
+    return applied
+
+
+def register_commands(app):
+
+    @app.cli.command('db-migrate')
+    @click.option('--list', 'list_only', is_flag=True, help='Only show migration status.')
+    def db_migrate(list_only):
+        if list_only:
+            done = applied_versions()
+            for version, name, _ in available_migrations():
+                state = 'applied' if version in done else 'pending'
+                click.echo(f'{version:04d}_{name}: {state}')
+            return
+
+        applied = migrate(echo=click.echo)
+        click.echo(f'{len(applied)} migration(s) applied')
+
+    @app.cli.command('db-explain-check')
+    def db_explain_check():
+        from backend.migrations.explain_check import run_checks
+
+        failures = 0
+        for result in run_checks():
+            status = 'ok  ' if result['ok'] else 'FAIL'
+            click.echo(f"{status} {result['route']}: {result['detail']}")
+            failures += not result['ok']
+
+        if failures:
+            raise click.ClickException(f'{failures} route quer(y/ies) not served by an index')
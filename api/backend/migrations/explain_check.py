@@ -0,0 +1,112 @@
+#------------------------------------------------------------
+# EXPLAINs the hot query shape of each route and checks that
+# MySQL serves it from an index: every table in the plan must
+# have a chosen key and no full table scan (type ALL), and the
+# ORDER BY shapes must not need a filesort.
+#
+# The optimizer may still prefer a table scan on a database
+# with only the sample data in it, so run this against a
+# realistically sized database.
+#------------------------------------------------------------
+import datetime
+
+from backend.db_connection import db
+from backend.utils import multiget
+from backend.utils import pagination
+from backend.workoutlog.workoutlog_route import WORKOUT_COLUMNS
+from backend.foodlog.foodlog_route import FOODLOG_COLUMNS
+from backend.sleeplog.sleeplog_route import SLEEPLOG_COLUMNS
+from backend.moodlog.moodlog_route import MOODLOG_COLUMNS
+from backend.heartratelog.heartratelog_route import HEARTRATELOG_COLUMNS
+from backend.heartratelog import samples
+from backend.workoutlog import progression
+
+LOG_TABLES = [
+    ('/workoutlog', 'WorkoutLog', WORKOUT_COLUMNS),
+    ('/foodlog', 'FoodLog', FOODLOG_COLUMNS),
+    ('/sleeplog', 'SleepLog', SLEEPLOG_COLUMNS),
+    ('/moodlog', 'MoodLog', MOODLOG_COLUMNS),
+    ('/heartratelog', 'HeartRateLog', HEARTRATELOG_COLUMNS),
+]
+
+SAMPLE_PAGE = pagination.Page(pagination.DEFAULT_PAGE_SIZE, (datetime.date(2024, 1, 1), 1, 1))
+
+
+# (route, query, params, whether the query must avoid a filesort)
+def route_queries():
+    checks = []
+    for prefix, table, columns in LOG_TABLES:
+        query, params = pagination.list_query(columns, table, [], [], pagination.Page(100, None))
+        checks.append((f'GET {prefix}', query, params, True))
+
+        query, params = pagination.list_query(columns, table, [], [], SAMPLE_PAGE)
+        checks.append((f'GET {prefix}?next=', query, params, True))
+
+        query, params = pagination.list_query(columns, table, ['UserID = %s'], [1], None)
+        checks.append((f'GET {prefix}?user_id=', query, params, True))
+
+        query = f'SELECT {columns} FROM {table} WHERE LogID = %s'
+        checks.append((f'GET {prefix}/<id>', query, [1], False))
+
+        query = multiget.lookup_query(table, columns, 3)
+        checks.append((f'GET {prefix}/lookup', query, [1, 1, 1, 2, 2, 1], False))
+
+    checks.extend([
+        ('PUT /workoutlog/<id>',
+         'UPDATE WorkoutLog SET Duration = %s WHERE LogID = %s', [1, 1], False),
+        ('DELETE /workoutlog/<id>',
+         'DELETE FROM WorkoutLog WHERE LogID = %s', [1], False),
+        ('GET /workoutlog/progression',
+         progression.QUERY.format(until=' AND Date <= %s'),
+         [1, 'Bench Press', datetime.date(2024, 1, 1)], True),
+        ('GET /workoutlog/pr?user_id=',
+         'SELECT ExerciseType, MaxWeight AS PR FROM PersonalRecord WHERE UserID = %s',
+         [1], False),
+        ('DELETE /workoutlog/<id> (PR recompute)',
+         'SELECT MAX(WeightUsed) AS MaxWeight FROM WorkoutLog WHERE UserID = %s AND ExerciseType = %s',
+         [1, 'Bench Press'], False),
+        ('PUT /admin/users (email)',
+         'UPDATE User SET Email = %s WHERE Email = %s', ['a@example.com', 'b@example.com'], False),
+        ('PUT /admin/users (name)',
+         'UPDATE User SET Name = %s WHERE Name = %s', ['A', 'B'], False),
+        ('DELETE /admin/users',
+         'DELETE FROM User WHERE Email = %s', ['a@example.com'], False),
+    ])
+
+    start, end = datetime.datetime(2024, 1, 1), datetime.datetime(2024, 1, 2)
+    for tier in ['raw'] + list(samples.TIER_SECONDS):
+        checks.append((f'GET /heartratelog/<id>/samples ({tier})', samples.read_query(tier),
+                       samples.read_params(1, tier, start, end, 60), False))
+    return checks
+
+
+def check_plan(plan, no_filesort):
+    problems = []
+    for row in plan:
+        table = row.get('table')
+        if table is None or table.startswith('<'):
+            # derived / union result rows have no index of their own
+            continue
+        if row.get('key') is None or row.get('type') == 'ALL':
+            problems.append(f"{table}: full scan (type={row.get('type')}, key={row.get('key')})")
+        elif no_filesort and 'filesort' in (row.get('Extra') or ''):
+            problems.append(f"{table}: {row.get('Extra')}")
+
+    if problems:
+        return False, '; '.join(problems)
+    return True, ', '.join(f"{row['table']} via {row['key']} ({row['type']})"
+                           for row in plan if row.get('key'))
+
+
+def run_checks():
+    cursor = db.get_db().cursor()
+    results = []
+    for route, query, params, no_filesort in route_queries():
+        cursor.execute('EXPLAIN ' + query, params)
+        ok, detail = check_plan(cursor.fetchall(), no_filesort)
+        results.append({'route': route, 'ok': ok, 'detail': detail})
+
+    # EXPLAIN of an UPDATE / DELETE does not change anything, but
+    # leave no transaction open either way
+    db.get_db().rollback()
+    return results
@@ -0,0 +1,37 @@
+-- Secondary indexes for the queries the blueprints actually run.
+--
+-- InnoDB appends the primary key (UserID, LogID) to every secondary
+-- index anyway; it is spelled out where the query sorts on it.
+
+-- list routes, unfiltered: ORDER BY Date DESC, UserID DESC, LogID DESC
+-- (keyset pagination walks this index backwards)
+CREATE INDEX idx_workoutlog_date ON WorkoutLog (Date, UserID, LogID);
+CREATE INDEX idx_foodlog_date ON FoodLog (Date, UserID, LogID);
+CREATE INDEX idx_sleeplog_date ON SleepLog (Date, UserID, LogID);
+CREATE INDEX idx_moodlog_date ON MoodLog (Date, UserID, LogID);
+CREATE INDEX idx_heartratelog_date ON HeartRateLog (Date, UserID, LogID);
+
+-- list routes, ?user_id=: WHERE UserID = %s ORDER BY Date DESC
+CREATE INDEX idx_workoutlog_user_date ON WorkoutLog (UserID, Date, LogID);
+CREATE INDEX idx_foodlog_user_date ON FoodLog (UserID, Date, LogID);
+CREATE INDEX idx_sleeplog_user_date ON SleepLog (UserID, Date, LogID);
+CREATE INDEX idx_moodlog_user_date ON MoodLog (UserID, Date, LogID);
+CREATE INDEX idx_heartratelog_user_date ON HeartRateLog (UserID, Date, LogID);
+
+-- single record GET / PUT / DELETE: WHERE LogID = %s (no UserID)
+CREATE INDEX idx_workoutlog_logid ON WorkoutLog (LogID);
+CREATE INDEX idx_foodlog_logid ON FoodLog (LogID);
+CREATE INDEX idx_sleeplog_logid ON SleepLog (LogID);
+CREATE INDEX idx_moodlog_logid ON MoodLog (LogID);
+CREATE INDEX idx_heartratelog_logid ON HeartRateLog (LogID);
+
+-- /workoutlog/progression: WHERE ExerciseType = %s ORDER BY Date,
+-- selecting Date, WeightUsed (covered by the index).
+-- /workoutlog/pr: GROUP BY ExerciseType, MAX(WeightUsed) reads the
+-- index in ExerciseType order instead of sorting the table.
+CREATE INDEX idx_workoutlog_exercise ON WorkoutLog (ExerciseType, Date, WeightUsed);
+
+-- admin user updates: WHERE Name = '...'
+-- (WHERE Email = '...' is already served by the UNIQUE key on
+-- User.Email from HealthHubDatabase.sql)
+CREATE INDEX idx_user_name ON User (Name);
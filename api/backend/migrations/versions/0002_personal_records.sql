@@ -0,0 +1,23 @@
+-- Per user, per exercise personal record (heaviest WeightUsed),
+-- kept up to date by the workoutlog blueprint on every write so
+-- GET /workoutlog/pr is a primary key lookup instead of a
+-- GROUP BY over the whole WorkoutLog table.
+CREATE TABLE PersonalRecord (
+    UserID INT,
+    ExerciseType VARCHAR(50),
+    MaxWeight DECIMAL(5,2) NOT NULL,
+    UpdatedAt DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (UserID, ExerciseType),
+    FOREIGN KEY (UserID) REFERENCES User(UserID) ON DELETE CASCADE
+);
+
+-- recomputing one record after its max row is deleted reads the
+-- last entry of this index
+CREATE INDEX idx_workoutlog_user_exercise_weight ON WorkoutLog (UserID, ExerciseType, WeightUsed);
+
+-- backfill
+INSERT INTO PersonalRecord (UserID, ExerciseType, MaxWeight)
+SELECT UserID, ExerciseType, MAX(WeightUsed)
+FROM WorkoutLog
+WHERE ExerciseType IS NOT NULL AND WeightUsed IS NOT NULL
+GROUP BY UserID, ExerciseType;
@@ -0,0 +1,22 @@
+-- One row per user and day with the aggregates the dashboard
+-- charts plot. Kept current by the log blueprints on every write
+-- (see backend/rollups/daily_rollup.py) and served by
+-- GET /users/<id>/daily. Backfill existing logs with
+--   flask --app backend_app rollup-rebuild
+CREATE TABLE DailyRollup (
+    UserID INT,
+    Date DATE NOT NULL,
+    WorkoutCount INT,
+    WorkoutMinutes INT,
+    CaloriesBurned INT,
+    CaloriesEaten INT,
+    Protein DECIMAL(8,2),
+    Carbs DECIMAL(8,2),
+    Fats DECIMAL(8,2),
+    SleepHours DECIMAL(5,2),
+    SleepQuality DECIMAL(4,2),
+    DominantMood VARCHAR(50),
+    AvgHeartRate DECIMAL(5,1),
+    PRIMARY KEY (UserID, Date),
+    FOREIGN KEY (UserID) REFERENCES User(UserID) ON DELETE CASCADE
+);
@@ -0,0 +1,9 @@
+-- Version counters for conditional GET (ETag / Last-Modified).
+-- Tags are table names ("WorkoutLog"), table plus user
+-- ("WorkoutLog:12") or "*" for changes that can touch anything.
+-- The write routes bump them in the same transaction as the data.
+CREATE TABLE DataVersion (
+    Tag VARCHAR(100) PRIMARY KEY,
+    Version BIGINT NOT NULL,
+    ModifiedAt DATETIME NOT NULL
+);
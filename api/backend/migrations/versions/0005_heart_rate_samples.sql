@@ -0,0 +1,26 @@
+-- Raw heart rate samples from wearables (1 Hz or faster) and
+-- their minute / hour / day aggregates. Samples are clustered by
+-- (UserID, SampleTime), so a device uploading in time order only
+-- ever appends to the end of its user's range. The tiers hold
+-- min, max, sum and count per bucket (mean = SumBPM / SampleCount)
+-- and are recomputed for the buckets each upload touches (see
+-- backend/heartratelog/samples.py). Times are UTC.
+CREATE TABLE HeartRateSample (
+    UserID INT NOT NULL,
+    SampleTime DATETIME(3) NOT NULL,
+    BPM SMALLINT UNSIGNED NOT NULL,
+    PRIMARY KEY (UserID, SampleTime),
+    FOREIGN KEY (UserID) REFERENCES User(UserID) ON DELETE CASCADE
+);
+
+CREATE TABLE HeartRateTier (
+    UserID INT NOT NULL,
+    Tier ENUM('minute', 'hour', 'day') NOT NULL,
+    BucketStart DATETIME NOT NULL,
+    MinBPM SMALLINT UNSIGNED NOT NULL,
+    MaxBPM SMALLINT UNSIGNED NOT NULL,
+    SumBPM BIGINT UNSIGNED NOT NULL,
+    SampleCount INT UNSIGNED NOT NULL,
+    PRIMARY KEY (UserID, Tier, BucketStart),
+    FOREIGN KEY (UserID) REFERENCES User(UserID) ON DELETE CASCADE
+);
@@ -0,0 +1,7 @@
+-- /workoutlog/progression reads one user's entries for one exercise
+-- in date order: WHERE UserID = %s AND ExerciseType = %s
+-- [AND Date <= %s] ORDER BY Date, selecting Date, setCount,
+-- repsInSet and WeightUsed. This index serves the range and the
+-- order, and covers the columns, so the table is never touched.
+CREATE INDEX idx_workoutlog_user_exercise_date
+    ON WorkoutLog (UserID, ExerciseType, Date, WeightUsed, repsInSet, setCount);
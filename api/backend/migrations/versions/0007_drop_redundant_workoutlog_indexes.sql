@@ -0,0 +1,29 @@
+-- Two WorkoutLog indexes that idx_workoutlog_user_exercise_date
+-- (0006) makes redundant. Every workout write pays for each of them.
+
+-- idx_workoutlog_exercise (0001) served the old progression query,
+-- which filtered on ExerciseType alone; /workoutlog/progression now
+-- filters on UserID first and /workoutlog/pr reads PersonalRecord.
+-- It is dropped only if present, since databases migrated from an
+-- earlier copy of 0001 never had it. MySQL has no DROP INDEX IF
+-- EXISTS, so the statement is chosen from information_schema.
+SET @drop_exercise_index = (
+    SELECT IF(COUNT(*) > 0, 'DROP INDEX idx_workoutlog_exercise ON WorkoutLog', 'DO 0')
+    FROM information_schema.statistics
+    WHERE table_schema = DATABASE()
+      AND table_name = 'WorkoutLog'
+      AND index_name = 'idx_workoutlog_exercise'
+);
+PREPARE drop_exercise_index FROM @drop_exercise_index;
+EXECUTE drop_exercise_index;
+DEALLOCATE PREPARE drop_exercise_index;
+
+-- idx_workoutlog_user_exercise_weight (0002) only serves the
+-- personal record recompute after the record's row is deleted:
+-- MAX(WeightUsed) WHERE UserID = %s AND ExerciseType = %s. The 0006
+-- index has the same (UserID, ExerciseType) prefix and covers
+-- WeightUsed, so that query reads one user's entries for one
+-- exercise from it instead of a single index entry.
+-- That rare read is cheaper than maintaining a second index on
+-- every insert.
+DROP INDEX idx_workoutlog_user_exercise_weight ON WorkoutLog;
@@ -5,43 +5,39 @@ from flask import jsonify
 from flask import make_response
 from flask import current_app
 from backend.db_connection import db
+from backend.utils.cache import cached
+from backend.utils.conditional import conditional
+from backend.utils import batch
+from backend.utils import multiget
+from backend.utils import pagination
+from backend.utils import write_hooks
 
 moodlog_route = Blueprint('moodlog_route', __name__)
 
+MOODLOG_COLUMNS = 'LogID, UserID, Date, Mood'
+
+# fields accepted by POST /moodlog/batch
+MOODLOG_FIELDS = [
+    batch.Field('LogID', batch.to_int, True),
+    batch.Field('UserID', batch.to_int, True),
+    batch.Field('Date', batch.to_date, True),
+    batch.Field('Mood', batch.to_text, False),
+]
+
 #------------------------------------------------------------
 # Get all mood logs (optionally filtered by user_id)
 @moodlog_route.route('/', methods=['GET'])
+@conditional('MoodLog')
+@cached('MoodLog')
 def get_moods():
     current_app.logger.info('GET /moodlog route')
-    user_id = request.args.get('user_id')
-
-    cursor = db.get_db().cursor()
-
-    if user_id:
-        query = '''
-            SELECT LogID, UserID, Date, Mood
-            FROM MoodLog
-            WHERE UserID = %s
-            ORDER BY Date DESC
-        '''
-        cursor.execute(query, (user_id,))
-    else:
-        query = '''
-            SELECT LogID, UserID, Date, Mood
-            FROM MoodLog
-            ORDER BY Date DESC
-        '''
-        cursor.execute(query)
-
-    theData = cursor.fetchall()
-
-    the_response = make_response(jsonify(theData))
-    the_response.status_code = 200
-    return the_response
+    return pagination.list_response('MoodLog', MOODLOG_COLUMNS)
 
 #------------------------------------------------------------
 # Get details for a single mood log by MoodID
 @moodlog_route.route('/<moodID>', methods=['GET'])
+@conditional('MoodLog')
+@cached('MoodLog')
 def get_mood(moodID):
     current_app.logger.info(f'GET /moodlog/{moodID} route')
 
@@ -59,6 +55,35 @@ def get_mood(moodID):
     the_response.status_code = 200
     return the_response
 
+#------------------------------------------------------------
+# Get several mood logs by (UserID, LogID) in one request, in the
+# order asked for (see utils/multiget.py)
+@moodlog_route.route('/lookup', methods=['GET'])
+@conditional('MoodLog')
+@cached('MoodLog')
+def lookup_mood_logs():
+    current_app.logger.info('GET /moodlog/lookup route')
+
+    try:
+        keys = multiget.keys_from_args(request.args)
+    except multiget.BadLookup as e:
+        return multiget.error_response(e)
+
+    return multiget.lookup_response('MoodLog', MOODLOG_COLUMNS, keys)
+
+#------------------------------------------------------------
+# Same as above with the keys in the body, for long lists
+@moodlog_route.route('/lookup', methods=['POST'])
+def lookup_mood_logs_post():
+    current_app.logger.info('POST /moodlog/lookup route')
+
+    try:
+        keys = multiget.keys_from_body()
+    except multiget.BadLookup as e:
+        return multiget.error_response(e)
+
+    return multiget.lookup_response('MoodLog', MOODLOG_COLUMNS, keys)
+
 #------------------------------------------------------------
 # Inserts mood and its data to the mood log
 @moodlog_route.route('/', methods=['POST'])
@@ -79,11 +104,31 @@ def add_mood_log():
         data["Date"],    # Date is required
         data["Mood"]     # Mood is required
     ))
+    write_hooks.after_log_write('MoodLog', [(data["UserID"], data["Date"])])
     db.get_db().commit()
 
     the_response = make_response(jsonify({"message": "Mood log added"}))
     the_response.status_code = 201
     return the_response
+
+#------------------------------------------------------------
+# Add many mood logs at once (JSON array or NDJSON body)
+@moodlog_route.route('/batch', methods=['POST'])
+def add_mood_logs_batch():
+    current_app.logger.info('POST /moodlog/batch route')
+
+    try:
+        rows = batch.read_rows()
+    except batch.BatchError as e:
+        return batch.error_response(e)
+
+    valid, errors = batch.validate_rows(rows, MOODLOG_FIELDS)
+    inserted, failed = batch.insert_rows('MoodLog', MOODLOG_FIELDS, valid)
+    inserted_rows = batch.as_dicts(MOODLOG_FIELDS, inserted)
+    write_hooks.after_log_write('MoodLog', [(row['UserID'], row['Date']) for row in inserted_rows])
+    db.get_db().commit()
+
+    return batch.batch_response(len(rows), inserted, errors + failed)
 #------------------------------------------------------------
 # Update mood log info for customer with particular LogID
 @moodlog_route.route('/', methods=['PUT'])
@@ -100,8 +145,10 @@ def update_moodlog():
         data['UserID'], data['Date'], data['Mood'], data['LogID']
     )
 
+    old_days = write_hooks.days_for_log('MoodLog', data['LogID'])
     cursor = db.get_db().cursor()
     cursor.execute(query, values)
+    write_hooks.after_log_write('MoodLog', old_days + [(data['UserID'], data['Date'])])
     db.get_db().commit()
 
     return jsonify({'message': 'Mood log updated!'}), 200
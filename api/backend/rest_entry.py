@@ -6,6 +6,16 @@ from backend.sleeplog.sleeplog_route import sleeplog_route
 from backend.heartratelog.heartratelog_route import heartratelog_route
 from backend.workoutlog.workoutlog_route import workoutlog_route
 from backend.admin.admin_route import admin_route
+from backend.users.users_route import users_route
+from backend.health.health_route import health_route
+from backend.metrics.metrics_route import metrics_route
+from backend.migrations import register_commands
+from backend.workoutlog import personal_records
+from backend.rollups import daily_rollup
+from backend.utils.cache import response_cache
+from backend.utils import json_provider
+from backend.utils.compression import compression
+from backend.utils.metrics import metrics
 import os
 from dotenv import load_dotenv
 
@@ -33,9 +43,56 @@ def create_app():
     app.config['MYSQL_DATABASE_PORT'] = int(os.getenv('DB_PORT').strip())
     app.config['MYSQL_DATABASE_DB'] = os.getenv('DB_NAME').strip()  # Change this to your DB name
 
-    # Initialize the database object with the settings above. 
-    app.logger.info('current_app(): starting the database connection')
+    # connection pool sizing (seconds for the time based settings).
+    # See backend/db_connection/pool.py for what each one does.
+    app.config['DB_POOL_MIN_SIZE'] = int(os.getenv('DB_POOL_MIN_SIZE', '1'))
+    app.config['DB_POOL_MAX_SIZE'] = int(os.getenv('DB_POOL_MAX_SIZE', '10'))
+    app.config['DB_POOL_RECYCLE'] = int(os.getenv('DB_POOL_RECYCLE', '3600'))
+    app.config['DB_POOL_IDLE_TIMEOUT'] = int(os.getenv('DB_POOL_IDLE_TIMEOUT', '300'))
+    app.config['DB_POOL_TIMEOUT'] = float(os.getenv('DB_POOL_TIMEOUT', '10'))
+    app.config['DB_POOL_PING_AFTER'] = float(os.getenv('DB_POOL_PING_AFTER', '10'))
+
+    # statements at least this slow are logged and EXPLAINed (see
+    # backend/db_connection/slow_queries.py); -1 turns it off
+    app.config['DB_SLOW_QUERY_MS'] = float(os.getenv('DB_SLOW_QUERY_MS', '200'))
+    app.config['DB_SLOW_QUERY_EXPLAIN'] = os.getenv('DB_SLOW_QUERY_EXPLAIN', '1') == '1'
+
+    # GET response cache (see backend/utils/cache.py). Leave
+    # CACHE_REDIS_URL unset for a per-process in-memory cache.
+    app.config['CACHE_ENABLED'] = os.getenv('CACHE_ENABLED', '1') == '1'
+    app.config['CACHE_TTL'] = int(os.getenv('CACHE_TTL', '60'))
+    app.config['CACHE_MAX_ENTRIES'] = int(os.getenv('CACHE_MAX_ENTRIES', '1024'))
+    app.config['CACHE_REDIS_URL'] = os.getenv('CACHE_REDIS_URL')
+
+    # ETag / Last-Modified on the read routes (see
+    # backend/utils/conditional.py)
+    app.config['CONDITIONAL_GET_ENABLED'] = os.getenv('CONDITIONAL_GET_ENABLED', '1') == '1'
+
+    # JSON wire format: ISO 8601 dates and numeric decimals, or the
+    # old RFC 1123 dates / string decimals with JSON_LEGACY_FORMAT=1
+    app.config['JSON_LEGACY_FORMAT'] = os.getenv('JSON_LEGACY_FORMAT', '0') == '1'
+    json_provider.init_app(app)
+
+    # gzip / brotli for JSON responses of at least COMPRESS_MIN_SIZE
+    # bytes (see backend/utils/compression.py); levels are 1-9 for
+    # gzip and 0-11 for brotli
+    app.config['COMPRESS_ENABLED'] = os.getenv('COMPRESS_ENABLED', '1') == '1'
+    app.config['COMPRESS_MIN_SIZE'] = int(os.getenv('COMPRESS_MIN_SIZE', '1024'))
+    app.config['COMPRESS_LEVEL'] = int(os.getenv('COMPRESS_LEVEL', '6'))
+    app.config['COMPRESS_BR_LEVEL'] = int(os.getenv('COMPRESS_BR_LEVEL', '4'))
+    compression.init_app(app)
+
+    # request / SQL timings for GET /metrics (see
+    # backend/utils/metrics.py); SERVER_TIMING=1 also reports them
+    # per response in a Server-Timing header
+    app.config['SERVER_TIMING'] = os.getenv('SERVER_TIMING', '0') == '1'
+    metrics.init_app(app)
+
+    # Initialize the database object (and its connection pool)
+    # with the settings above. 
+    app.logger.info('current_app(): starting the database connection pool')
     db.init_app(app)
+    response_cache.init_app(app)
 
 
     # Register the routes from each Blueprint with the app object
@@ -47,6 +104,15 @@ def create_app():
     app.register_blueprint(heartratelog_route, url_prefix='/heartratelog')
     app.register_blueprint(workoutlog_route, url_prefix='/workoutlog')
     app.register_blueprint(admin_route, url_prefix='/admin')
+    app.register_blueprint(users_route, url_prefix='/users')
+    app.register_blueprint(health_route, url_prefix='/health')
+    app.register_blueprint(metrics_route)
+
+    # schema migration commands (flask --app backend_app db-migrate)
+    # and the backfills for derived tables (pr-rebuild, rollup-rebuild)
+    register_commands(app)
+    personal_records.register_commands(app)
+    daily_rollup.register_commands(app)
 
     # Don't forget to return the app object
     return app
@@ -0,0 +1,125 @@
+#------------------------------------------------------------
+# Per user, per day aggregates for the dashboard charts, kept in
+# the DailyRollup table.
+#
+# Each log table feeds its own set of columns. When logs are
+# written, the affected (UserID, Date) days are recomputed from
+# the raw rows of that table only, inside the write's
+# transaction, so updates and deletes are handled the same way
+# as inserts and a day is never more than one commit behind.
+#
+#   flask --app backend_app rollup-rebuild    recompute every day
+#------------------------------------------------------------
+import datetime
+
+import click
+
+from backend.db_connection import db
+
+# days recomputed per statement
+CHUNK_SIZE = 500
+
+# log table -> (rollup columns it feeds, aggregate query). The
+# query returns UserID, Date and those columns by name; {where} is
+# filled in with the day filter (or nothing for a rebuild).
+SOURCES = {
+    'WorkoutLog': (
+        ['WorkoutCount', 'WorkoutMinutes', 'CaloriesBurned'],
+        '''
+        SELECT UserID, Date, COUNT(*) AS WorkoutCount, SUM(Duration) AS WorkoutMinutes,
+               SUM(CaloriesBurned) AS CaloriesBurned
+        FROM WorkoutLog {where}
+        GROUP BY UserID, Date
+        '''),
+    'FoodLog': (
+        ['CaloriesEaten', 'Protein', 'Carbs', 'Fats'],
+        '''
+        SELECT UserID, Date, SUM(Calories) AS CaloriesEaten, SUM(Protein) AS Protein,
+               SUM(Carbs) AS Carbs, SUM(Fats) AS Fats
+        FROM FoodLog {where}
+        GROUP BY UserID, Date
+        '''),
+    'SleepLog': (
+        ['SleepHours', 'SleepQuality'],
+        '''
+        SELECT UserID, Date, SUM(SleepDuration) AS SleepHours, AVG(SleepQuality) AS SleepQuality
+        FROM SleepLog {where}
+        GROUP BY UserID, Date
+        '''),
+    # the most frequent mood of the day, latest entry breaks ties
+    'MoodLog': (
+        ['DominantMood'],
+        '''
+        SELECT UserID, Date, Mood AS DominantMood
+        FROM (
+            SELECT UserID, Date, Mood,
+                   ROW_NUMBER() OVER (PARTITION BY UserID, Date
+                                      ORDER BY COUNT(*) DESC, MAX(LogID) DESC) AS MoodRank
+            FROM MoodLog {where}
+            GROUP BY UserID, Date, Mood
+        ) AS ranked
+        WHERE MoodRank = 1
+        '''),
+    'HeartRateLog': (
+        ['AvgHeartRate'],
+        '''
+        SELECT UserID, Date, AVG(AvgHeartRate) AS AvgHeartRate
+        FROM HeartRateLog {where}
+        GROUP BY UserID, Date
+        '''),
+}
+
+
+def _day_key(user_id, date):
+    if isinstance(date, (datetime.date, datetime.datetime)):
+        date = date.isoformat()[:10]
+    return (int(user_id), str(date))
+
+
+def _upsert(cursor, columns, select, params):
+    names = ', '.join(['UserID', 'Date'] + columns)
+    updates = ', '.join(f'{name} = agg.{name}' for name in columns)
+    # the aggregate goes through a derived table so its columns can
+    # be referenced by name in ON DUPLICATE KEY UPDATE
+    cursor.execute(f'''
+        INSERT INTO DailyRollup ({names})
+        SELECT {names} FROM ({select}) AS agg
+        ON DUPLICATE KEY UPDATE {updates}
+    ''', params)
+
+
+# Recomputes the columns fed by `table` for the given
+# (UserID, Date) days, in the caller's transaction.
+def refresh(cursor, table, days):
+    columns, select = SOURCES[table]
+    days = sorted({_day_key(user_id, date) for user_id, date in days})
+
+    for start in range(0, len(days), CHUNK_SIZE):
+        chunk = days[start:start + CHUNK_SIZE]
+        in_list = ', '.join(['(%s, %s)'] * len(chunk))
+        params = [value for day in chunk for value in day]
+
+        # days whose last row just went away must not keep old values
+        cleared = ', '.join(f'{name} = NULL' for name in columns)
+        cursor.execute(f'UPDATE DailyRollup SET {cleared} WHERE (UserID, Date) IN ({in_list})',
+                       params)
+        _upsert(cursor, columns,
+                select.format(where=f'WHERE (UserID, Date) IN ({in_list})'), params)
+
+
+def rebuild(cursor):
+    cursor.execute('DELETE FROM DailyRollup')
+    for columns, select in SOURCES.values():
+        _upsert(cursor, columns, select.format(where=''), [])
+    cursor.execute('SELECT COUNT(*) AS Days FROM DailyRollup')
+    return cursor.fetchone()['Days']
+
+
+def register_commands(app):
+
+    @app.cli.command('rollup-rebuild')
+    def rollup_rebuild():
+        conn = db.get_db()
+        count = rebuild(conn.cursor())
+        conn.commit()
+        click.echo(f'{count} daily rollup row(s) rebuilt')
@@ -5,44 +5,41 @@ from flask import jsonify
 from flask import make_response
 from flask import current_app
 from backend.db_connection import db
+from backend.utils.cache import cached
+from backend.utils.conditional import conditional
+from backend.utils import batch
+from backend.utils import multiget
+from backend.utils import pagination
+from backend.utils import write_hooks
 
 
 sleeplog_route = Blueprint('sleeplog_route', __name__)
 
+SLEEPLOG_COLUMNS = 'LogID, UserID, Date, SleepDuration, SleepQuality'
+
+# fields accepted by POST /sleeplog/batch
+SLEEPLOG_FIELDS = [
+    batch.Field('LogID', batch.to_int, True),
+    batch.Field('UserID', batch.to_int, True),
+    batch.Field('Date', batch.to_date, True),
+    batch.Field('SleepDuration', batch.to_decimal, False),
+    batch.Field('SleepQuality', batch.to_int, False),
+]
+
 #------------------------------------------------------------
 # Get all sleep logs (optionally filtered by user_id)
 @sleeplog_route.route('/', methods=['GET'])
+@conditional('SleepLog')
+@cached('SleepLog')
 def get_sleep_logs():
     current_app.logger.info('GET /sleeplog route')
-    user_id = request.args.get('user_id')
-
-    cursor = db.get_db().cursor()
-
-    if user_id:
-        query = '''
-            SELECT LogID, UserID, Date, SleepDuration, SleepQuality
-            FROM SleepLog
-            WHERE UserID = %s
-            ORDER BY Date DESC
-        '''
-        cursor.execute(query, (user_id,))
-    else:
-        query = '''
-            SELECT LogID, UserID, Date, SleepDuration, SleepQuality
-            FROM SleepLog
-            ORDER BY Date DESC
-        '''
-        cursor.execute(query)
-
-    theData = cursor.fetchall()
-
-    the_response = make_response(jsonify(theData))
-    the_response.status_code = 200
-    return the_response
+    return pagination.list_response('SleepLog', SLEEPLOG_COLUMNS)
 
 #------------------------------------------------------------
 # Get details for a single sleep log by SleepID
 @sleeplog_route.route('/<sleepID>', methods=['GET'])
+@conditional('SleepLog')
+@cached('SleepLog')
 def get_sleep_log(sleepID):
     current_app.logger.info(f'GET /sleeplog/{sleepID} route')
 
@@ -60,6 +57,35 @@ def get_sleep_log(sleepID):
     the_response.status_code = 200
     return the_response
 
+#------------------------------------------------------------
+# Get several sleep logs by (UserID, LogID) in one request, in the
+# order asked for (see utils/multiget.py)
+@sleeplog_route.route('/lookup', methods=['GET'])
+@conditional('SleepLog')
+@cached('SleepLog')
+def lookup_sleep_logs():
+    current_app.logger.info('GET /sleeplog/lookup route')
+
+    try:
+        keys = multiget.keys_from_args(request.args)
+    except multiget.BadLookup as e:
+        return multiget.error_response(e)
+
+    return multiget.lookup_response('SleepLog', SLEEPLOG_COLUMNS, keys)
+
+#------------------------------------------------------------
+# Same as above with the keys in the body, for long lists
+@sleeplog_route.route('/lookup', methods=['POST'])
+def lookup_sleep_logs_post():
+    current_app.logger.info('POST /sleeplog/lookup route')
+
+    try:
+        keys = multiget.keys_from_body()
+    except multiget.BadLookup as e:
+        return multiget.error_response(e)
+
+    return multiget.lookup_response('SleepLog', SLEEPLOG_COLUMNS, keys)
+
 #------------------------------------------------------------
 # Inserts food and its data to the food log
 @sleeplog_route.route('/', methods=['POST'])
@@ -81,12 +107,32 @@ def add_sleep_log():
         data["SleepDuration"],
         data["SleepQuality"], 
     ))
+    write_hooks.after_log_write('SleepLog', [(data["UserID"], data["Date"])])
     db.get_db().commit()
 
     the_response = make_response(jsonify({"message": "Sleep log added!"}))
     the_response.status_code = 201
     return the_response
 
+#------------------------------------------------------------
+# Add many sleep logs at once (JSON array or NDJSON body)
+@sleeplog_route.route('/batch', methods=['POST'])
+def add_sleep_logs_batch():
+    current_app.logger.info('POST /sleeplog/batch route')
+
+    try:
+        rows = batch.read_rows()
+    except batch.BatchError as e:
+        return batch.error_response(e)
+
+    valid, errors = batch.validate_rows(rows, SLEEPLOG_FIELDS)
+    inserted, failed = batch.insert_rows('SleepLog', SLEEPLOG_FIELDS, valid)
+    inserted_rows = batch.as_dicts(SLEEPLOG_FIELDS, inserted)
+    write_hooks.after_log_write('SleepLog', [(row['UserID'], row['Date']) for row in inserted_rows])
+    db.get_db().commit()
+
+    return batch.batch_response(len(rows), inserted, errors + failed)
+
 #------------------------------------------------------------
 # Update food log info for customer with particular userID
 @sleeplog_route.route('/', methods=['PUT'])
@@ -104,8 +150,10 @@ def update_sleeplog():
         data['LogID']
     )
 
+    old_days = write_hooks.days_for_log('SleepLog', data['LogID'])
     cursor = db.get_db().cursor()
     cursor.execute(query, values)
+    write_hooks.after_log_write('SleepLog', old_days + [(data['UserID'], data['Date'])])
     db.get_db().commit()
 
     return jsonify({'message': 'Sleep log updated!'}), 200
\ No newline at end of file
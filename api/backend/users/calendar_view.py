@@ -0,0 +1,85 @@
+#------------------------------------------------------------
+# Calendar views of one DailyRollup column for one user.
+#
+# With ?month= the result is that month laid out in weeks, Monday
+# first, like calendar.monthcalendar: each week is seven cells,
+# None for days outside the month, otherwise {"Day", "Value"}.
+# Without it the result is the whole year as a 12 x 31 matrix
+# (months x day of month), None where nothing was logged or the
+# day does not exist.
+#
+# DailyRollup already holds one aggregated row per user and day
+# for every log type, so either view is a single range scan of its
+# primary key, whatever the metric.
+#------------------------------------------------------------
+import calendar
+import datetime
+
+from backend.db_connection import db
+
+DEFAULT_METRIC = 'WorkoutMinutes'
+MIN_YEAR, MAX_YEAR = 1900, 2100
+
+
+class BadCalendarRequest(ValueError):
+    pass
+
+
+# ?year=, ?month= and ?metric= checked against the rollup columns
+def parse_request(args, metrics):
+    try:
+        year = int(args.get('year', datetime.date.today().year))
+        month = int(args['month']) if args.get('month') else None
+    except ValueError:
+        raise BadCalendarRequest('year and month must be integers')
+    if not MIN_YEAR <= year <= MAX_YEAR:
+        raise BadCalendarRequest(f'year must be between {MIN_YEAR} and {MAX_YEAR}')
+    if month is not None and not 1 <= month <= 12:
+        raise BadCalendarRequest('month must be between 1 and 12')
+
+    allowed = {name.lower(): name for name in metrics}
+    metric = args.get('metric', DEFAULT_METRIC)
+    if metric.lower() not in allowed:
+        raise BadCalendarRequest(f'unknown metric {metric}; allowed: {", ".join(metrics)}')
+    return year, month, allowed[metric.lower()]
+
+
+def read_values(user_id, metric, start, end):
+    cursor = db.get_db().cursor()
+    cursor.execute(f'''
+        SELECT Date, {metric} AS Value
+        FROM DailyRollup
+        WHERE UserID = %s AND Date >= %s AND Date < %s AND {metric} IS NOT NULL
+    ''', (user_id, start, end))
+    return {row['Date']: row['Value'] for row in cursor.fetchall()}
+
+
+def month_view(user_id, metric, year, month):
+    start = datetime.date(year, month, 1)
+    end = datetime.date(year + month // 12, month % 12 + 1, 1)
+    values = read_values(user_id, metric, start, end)
+
+    weeks = [[None if day == 0 else {'Day': day, 'Value': values.get(datetime.date(year, month, day))}
+              for day in week]
+             for week in calendar.monthcalendar(year, month)]
+    return {'weeks': weeks, 'summary': summarize(values.values())}
+
+
+def year_view(user_id, metric, year):
+    values = read_values(user_id, metric, datetime.date(year, 1, 1), datetime.date(year + 1, 1, 1))
+
+    matrix = [[None] * 31 for _ in range(12)]
+    for date, value in values.items():
+        matrix[date.month - 1][date.day - 1] = value
+    return {'matrix': matrix, 'summary': summarize(values.values())}
+
+
+# days with a value, and for numeric metrics their total and mean
+def summarize(values):
+    values = list(values)
+    summary = {'Days': len(values)}
+    if values and not isinstance(values[0], str):
+        total = sum(values)
+        summary['Total'] = total
+        summary['Mean'] = round(float(total) / len(values), 2)
+    return summary
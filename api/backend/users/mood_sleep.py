@@ -0,0 +1,155 @@
+#------------------------------------------------------------
+# Mood against sleep for one user over a date range.
+#
+# DailyRollup already lines the two logs up by day (the day's
+# dominant mood next to its hours and quality of sleep), so the
+# join is a single range scan of its primary key. On the days
+# that have both, numpy works out per mood sleep statistics and:
+#
+#   HoursQualityPearson   Pearson r of sleep hours and quality
+#   HoursByMoodEta        correlation ratio of sleep hours on mood
+#   QualityByMoodEta      correlation ratio of sleep quality on mood
+#
+# The correlation ratio (0 to 1) is the share of the spread in
+# sleep that the mood categories account for, the usual measure
+# between a category and a number.
+#
+# ?days=N instead of ?from= asks for the last N days up to the
+# user's latest mood or sleep day (or ?to=), so a page can open on
+# data that exists. Every answer carries the extent of that data.
+#------------------------------------------------------------
+import datetime
+
+import numpy as np
+
+from backend.db_connection import db
+from backend.utils import dates
+
+MIN_PAIRED_DAYS = 3
+MAX_DAYS = 3660
+
+HAS_DATA = '(DominantMood IS NOT NULL OR SleepHours IS NOT NULL)'
+
+
+class BadWindow(ValueError):
+    pass
+
+
+def parse_days(args, start):
+    raw = args.get('days')
+    if raw is None:
+        return None
+    if start:
+        raise BadWindow('days cannot be combined with from')
+    try:
+        days = int(raw)
+    except ValueError:
+        raise BadWindow('days must be an integer')
+    if not 1 <= days <= MAX_DAYS:
+        raise BadWindow(f'days must be between 1 and {MAX_DAYS}')
+    return days
+
+
+# the first and last day with a mood or sleep, both None when the
+# user has neither
+def read_extent(user_id):
+    cursor = db.get_db().cursor()
+    cursor.execute(f'''
+        SELECT MIN(Date) AS first, MAX(Date) AS last
+        FROM DailyRollup
+        WHERE UserID = %s AND {HAS_DATA}
+    ''', (user_id,))
+    row = cursor.fetchone() or {}
+    return {'first': row.get('first'), 'last': row.get('last')}
+
+
+# the `days` days up to `end`, or up to the last day with data
+def window(days, end, extent):
+    end = end or extent['last']
+    if end is None:
+        return None, None
+    return end - datetime.timedelta(days=days - 1), end
+
+
+def read_days(user_id, start, end):
+    filters, params = dates.range_filters(start, end)
+    cursor = db.get_db().cursor()
+    cursor.execute(f'''
+        SELECT Date, DominantMood AS Mood, SleepHours, SleepQuality
+        FROM DailyRollup
+        WHERE {' AND '.join(['UserID = %s'] + filters)}
+          AND {HAS_DATA}
+        ORDER BY Date ASC
+    ''', [user_id] + params)
+    return cursor.fetchall()
+
+
+def _round(value, digits=2):
+    return None if value is None or np.isnan(value) else round(float(value), digits)
+
+
+def pearson(x, y):
+    if len(x) < MIN_PAIRED_DAYS or np.std(x) == 0 or np.std(y) == 0:
+        return None
+    return _round(np.corrcoef(x, y)[0, 1], 3)
+
+
+# between-group sum of squares over the total, square-rooted
+def correlation_ratio(values, counts, means):
+    if len(values) < MIN_PAIRED_DAYS:
+        return None
+    total = np.sum((values - values.mean()) ** 2)
+    if total == 0:
+        return None
+    between = np.sum(counts * (means - values.mean()) ** 2)
+    return _round(np.sqrt(between / total), 3)
+
+
+def group_medians(groups, values, counts):
+    # sort by group, then value; each group's median sits in the
+    # middle of its run
+    order = np.lexsort((values, groups))
+    ordered = values[order]
+    starts = np.cumsum(counts) - counts
+    low = starts + (counts - 1) // 2
+    high = starts + counts // 2
+    return (ordered[low] + ordered[high]) / 2
+
+
+def summarize(rows):
+    paired = [row for row in rows if row['Mood'] is not None and row['SleepHours'] is not None]
+    moods, groups = np.unique(np.array([row['Mood'] for row in paired], dtype=object).astype(str),
+                              return_inverse=True)
+    hours = np.array([row['SleepHours'] for row in paired], dtype=float)
+    quality = np.array([np.nan if row['SleepQuality'] is None else row['SleepQuality']
+                        for row in paired], dtype=float)
+
+    counts = np.bincount(groups, minlength=len(moods))
+    hours_mean = np.bincount(groups, weights=hours, minlength=len(moods)) / np.maximum(counts, 1)
+    hours_std = np.sqrt(np.maximum(
+        np.bincount(groups, weights=hours ** 2, minlength=len(moods)) / np.maximum(counts, 1)
+        - hours_mean ** 2, 0.0))
+    hours_median = group_medians(groups, hours, counts) if len(paired) else hours_mean
+
+    rated = ~np.isnan(quality)
+    rated_counts = np.bincount(groups[rated], minlength=len(moods))
+    quality_mean = (np.bincount(groups[rated], weights=quality[rated], minlength=len(moods))
+                    / np.maximum(rated_counts, 1))
+
+    per_mood = [{
+        'Mood': str(mood),
+        'Days': int(counts[index]),
+        'SleepHoursMean': _round(hours_mean[index]),
+        'SleepHoursMedian': _round(hours_median[index]),
+        'SleepHoursStd': _round(hours_std[index]),
+        'SleepQualityMean': _round(quality_mean[index]) if rated_counts[index] else None,
+    } for index, mood in enumerate(moods)]
+    per_mood.sort(key=lambda entry: entry['Days'], reverse=True)
+
+    correlation = {
+        'PairedDays': len(paired),
+        'HoursQualityPearson': pearson(hours[rated], quality[rated]),
+        'HoursByMoodEta': correlation_ratio(hours, counts, hours_mean),
+        'QualityByMoodEta': correlation_ratio(quality[rated], rated_counts, quality_mean),
+    }
+    return per_mood, correlation
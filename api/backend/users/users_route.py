@@ -0,0 +1,142 @@
+########################################################
+# Per user summary endpoints
+########################################################
+from flask import Blueprint
+from flask import request
+from flask import jsonify
+from flask import make_response
+from flask import current_app
+from backend.db_connection import db
+from backend.utils.cache import cached
+from backend.utils.conditional import conditional
+from backend.utils import dates
+from backend.utils import downsample
+from backend.utils import projection
+from backend.users import calendar_view
+from backend.users import mood_sleep
+
+users_route = Blueprint('users_route', __name__)
+
+DAILY_COLUMNS = '''Date, WorkoutCount, WorkoutMinutes, CaloriesBurned,
+    CaloriesEaten, Protein, Carbs, Fats, SleepHours, SleepQuality,
+    DominantMood, AvgHeartRate'''
+
+#------------------------------------------------------------
+# Daily aggregates for one user, oldest first, optionally limited
+# to ?from=YYYY-MM-DD and/or ?to=YYYY-MM-DD (inclusive) and to the
+# ?fields= columns. ?max_points= downsamples the ?y= column (or the
+# one column besides Date in ?fields=) for charts (see downsample.py)
+@users_route.route('/<int:userID>/daily', methods=['GET'])
+@conditional('DailyRollup', user_arg='userID')
+@cached('DailyRollup', user_arg='userID')
+def get_daily_rollup(userID):
+    current_app.logger.info(f'GET /users/{userID}/daily route')
+
+    try:
+        start, end = dates.parse_range(request.args)
+        # ?fields=Date,... narrows the columns (see projection.py)
+        fields = projection.parse_fields(request.args, DAILY_COLUMNS)
+        values = [name for name in (fields or projection.column_names(DAILY_COLUMNS))
+                  if name not in ('Date', 'DominantMood')]
+        sampling = downsample.parse_request(request.args, values)
+    except (dates.BadDateRange, projection.BadFields, downsample.BadDownsample) as e:
+        the_response = make_response(jsonify({'error': str(e)}))
+        the_response.status_code = 400
+        return the_response
+
+    # the series is ordered by Date, so it is read even when
+    # ?fields= leaves it out
+    selected = fields
+    if sampling is not None and fields is not None and 'Date' not in fields:
+        selected = ['Date'] + fields
+
+    filters, params = dates.range_filters(start, end)
+    query = f'''
+        SELECT {projection.select_list(DAILY_COLUMNS, selected)}
+        FROM DailyRollup
+        WHERE {' AND '.join(['UserID = %s'] + filters)}
+        ORDER BY Date ASC
+    '''
+
+    cursor = db.get_db().cursor()
+    cursor.execute(query, [userID] + params)
+    theData = cursor.fetchall()
+
+    if sampling is None:
+        the_response = make_response(jsonify(theData))
+        the_response.status_code = 200
+        return the_response
+
+    total = len(theData)
+    theData = projection.project(downsample.downsample(theData, 'Date', sampling), fields)
+    the_response = make_response(jsonify(theData))
+    the_response.status_code = 200
+    the_response.headers['X-Total-Points'] = str(total)
+    return the_response
+
+#------------------------------------------------------------
+# Mood and sleep lined up by day over ?from= / ?to= (or the last
+# ?days= days with data), with sleep statistics per mood and how
+# strongly the two go together (see mood_sleep.py)
+@users_route.route('/<int:userID>/mood_sleep', methods=['GET'])
+@conditional('DailyRollup', user_arg='userID')
+@cached('DailyRollup', user_arg='userID')
+def get_mood_sleep(userID):
+    current_app.logger.info(f'GET /users/{userID}/mood_sleep route')
+
+    try:
+        start, end = dates.parse_range(request.args)
+        days = mood_sleep.parse_days(request.args, start)
+    except (dates.BadDateRange, mood_sleep.BadWindow) as e:
+        the_response = make_response(jsonify({'error': str(e)}))
+        the_response.status_code = 400
+        return the_response
+
+    extent = mood_sleep.read_extent(userID)
+    if days is not None:
+        # (None, None) only when the user has no data to read
+        start, end = mood_sleep.window(days, end, extent)
+
+    rows = mood_sleep.read_days(userID, start, end)
+    per_mood, correlation = mood_sleep.summarize(rows)
+
+    the_response = make_response(jsonify({
+        'UserID': userID,
+        'from': start,
+        'to': end,
+        'extent': extent,
+        'days': rows,
+        'moods': per_mood,
+        'correlation': correlation,
+    }))
+    the_response.status_code = 200
+    return the_response
+
+#------------------------------------------------------------
+# One daily metric (?metric=, a DailyRollup column) laid out as a
+# calendar: ?year= and ?month= give a month of weeks, ?year= alone
+# a months x days matrix (see calendar_view.py)
+@users_route.route('/<int:userID>/calendar', methods=['GET'])
+@conditional('DailyRollup', user_arg='userID')
+@cached('DailyRollup', user_arg='userID')
+def get_calendar(userID):
+    current_app.logger.info(f'GET /users/{userID}/calendar route')
+
+    metrics = [name for name in projection.column_names(DAILY_COLUMNS) if name != 'Date']
+    try:
+        year, month, metric = calendar_view.parse_request(request.args, metrics)
+    except calendar_view.BadCalendarRequest as e:
+        the_response = make_response(jsonify({'error': str(e)}))
+        the_response.status_code = 400
+        return the_response
+
+    if month is None:
+        view = calendar_view.year_view(userID, metric, year)
+    else:
+        view = calendar_view.month_view(userID, metric, year, month)
+
+    the_response = make_response(jsonify(dict(view, UserID=userID, year=year,
+                                              month=month, metric=metric)))
+    the_response.status_code = 200
+    return the_response
+
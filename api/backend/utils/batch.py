@@ -0,0 +1,204 @@
+#------------------------------------------------------------
+# Bulk ingest for the POST /<log>/batch endpoints.
+#
+# Sync clients upload hundreds of entries at once. Instead of one
+# round trip and one commit per row, a batch is validated up
+# front, inserted with executemany (which PyMySQL turns into
+# multi-row INSERT ... VALUES statements) in chunks of CHUNK_SIZE
+# rows, and committed once.
+#
+# The body is either a JSON array of objects or NDJSON (one object
+# per line, Content-Type: application/x-ndjson). A bad row does
+# not abort the batch: it is reported by its position in the body
+# and everything else is still inserted. When a chunk is rejected
+# by MySQL (duplicate key, unknown user, ...) the chunk is rolled
+# back to a savepoint and retried row by row to find the culprits.
+#------------------------------------------------------------
+import datetime
+import decimal
+import json
+from collections import namedtuple
+
+import pymysql
+from flask import jsonify, make_response, request
+
+from backend.db_connection import db
+
+CHUNK_SIZE = 500
+MAX_BATCH_ROWS = 10000
+
+# errors that reject the rows themselves rather than the connection
+ROW_ERRORS = (pymysql.err.IntegrityError, pymysql.err.DataError,
+              pymysql.err.OperationalError, pymysql.err.InternalError)
+
+Field = namedtuple('Field', ['name', 'convert', 'required'])
+
+
+class BatchError(ValueError):
+
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+# stands in for an NDJSON line that is not a JSON object
+class BadRow:
+
+    def __init__(self, error):
+        self.error = error
+
+
+#------------------------------------------------------------
+# converters used in the per-table field lists
+def to_int(value):
+    if isinstance(value, bool):
+        raise ValueError('expected an integer')
+    if isinstance(value, float):
+        if not value.is_integer():
+            raise ValueError('expected an integer')
+        return int(value)
+    return int(value)
+
+
+def to_decimal(value):
+    if isinstance(value, bool):
+        raise ValueError('expected a number')
+    number = decimal.Decimal(str(value))
+    if not number.is_finite():
+        raise ValueError('expected a finite number')
+    return number
+
+
+def to_date(value):
+    return datetime.date.fromisoformat(str(value))
+
+
+def to_text(value):
+    if isinstance(value, (dict, list)):
+        raise ValueError('expected a string')
+    return str(value)
+
+
+#------------------------------------------------------------
+def read_rows():
+    if request.mimetype == 'application/x-ndjson':
+        rows = []
+        for line in request.get_data(as_text=True).splitlines():
+            if not line.strip():
+                continue
+            try:
+                rows.append(json.loads(line))
+            except ValueError as e:
+                rows.append(BadRow(f'invalid JSON: {e}'))
+    else:
+        rows = request.get_json(silent=True)
+        if not isinstance(rows, list):
+            raise BatchError('expected a JSON array of rows or an NDJSON body')
+
+    if not rows:
+        raise BatchError('empty batch')
+    if len(rows) > MAX_BATCH_ROWS:
+        raise BatchError(f'at most {MAX_BATCH_ROWS} rows per batch', status_code=413)
+    return rows
+
+
+# returns ([(index, values)], [{'index': ..., 'error': ...}])
+def validate_rows(rows, fields):
+    valid, errors = [], []
+    for index, row in enumerate(rows):
+        if isinstance(row, BadRow):
+            errors.append({'index': index, 'error': row.error})
+            continue
+        if not isinstance(row, dict):
+            errors.append({'index': index, 'error': 'row must be a JSON object'})
+            continue
+
+        values, problems = [], []
+        for field in fields:
+            value = row.get(field.name)
+            if value is None or value == '':
+                if field.required:
+                    problems.append(f'{field.name} is required')
+                values.append(None)
+                continue
+            try:
+                values.append(field.convert(value))
+            except (TypeError, ValueError, decimal.InvalidOperation):
+                problems.append(f'{field.name} has an invalid value {value!r}')
+
+        if problems:
+            errors.append({'index': index, 'error': '; '.join(problems)})
+        else:
+            valid.append((index, tuple(values)))
+    return valid, errors
+
+
+#------------------------------------------------------------
+# Inserts the validated rows inside the caller's transaction; the
+# caller commits. Returns the (index, values) pairs that went in
+# and the per-row errors for the ones MySQL refused.
+def insert_rows(table, fields, valid):
+    columns = ', '.join(field.name for field in fields)
+    placeholders = ', '.join(['%s'] * len(fields))
+    query = f'INSERT INTO {table} ({columns}) VALUES ({placeholders})'
+
+    conn = db.get_db()
+    cursor = conn.cursor()
+    inserted, errors = [], []
+
+    for start in range(0, len(valid), CHUNK_SIZE):
+        chunk = valid[start:start + CHUNK_SIZE]
+        cursor.execute('SAVEPOINT batch_chunk')
+        try:
+            cursor.executemany(query, [values for _, values in chunk])
+            inserted.extend(chunk)
+            continue
+        except ROW_ERRORS:
+            if not conn.open:
+                raise
+            cursor.execute('ROLLBACK TO SAVEPOINT batch_chunk')
+
+        # find the offending rows one at a time
+        for index, values in chunk:
+            cursor.execute('SAVEPOINT batch_row')
+            try:
+                cursor.execute(query, values)
+                inserted.append((index, values))
+            except ROW_ERRORS as e:
+                if not conn.open:
+                    raise
+                cursor.execute('ROLLBACK TO SAVEPOINT batch_row')
+                errors.append({'index': index, 'error': e.args[-1] if e.args else str(e)})
+
+    return inserted, errors
+
+
+# the (index, values) pairs from insert_rows as column -> value
+# dicts, for the follow-up work some tables do on insert
+def as_dicts(fields, inserted):
+    names = [field.name for field in fields]
+    return [dict(zip(names, values)) for _, values in inserted]
+
+
+def batch_response(total, inserted, errors):
+    errors = sorted(errors, key=lambda error: error['index'])
+    the_response = make_response(jsonify({
+        'received': total,
+        'inserted': len(inserted),
+        'failed': len(errors),
+        'errors': errors,
+    }))
+    # 207: some rows went in and some did not
+    if not errors:
+        the_response.status_code = 201
+    elif inserted:
+        the_response.status_code = 207
+    else:
+        the_response.status_code = 400
+    return the_response
+
+
+def error_response(error):
+    the_response = make_response(jsonify({'error': str(error)}))
+    the_response.status_code = getattr(error, 'status_code', 400)
+    return the_response
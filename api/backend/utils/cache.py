@@ -0,0 +1,204 @@
+#------------------------------------------------------------
+# Response cache for the read-heavy GET routes.
+#
+# Dashboards poll the same /workoutlog?user_id=..., /moodlog?...
+# URLs over and over. A cached route stores its encoded 200
+# response under a key made of the path, the normalized query
+# args and the current DataVersion of each of its tags. Tags are
+# "<table>" for reads across all users and "<table>:<user id>"
+# for reads of one user (see versions.tags_for), and every key
+# also carries the global versions.ALL_TAG. A write bumps the
+# versions of the tags it affects in its own transaction (see
+# write_hooks.py), which makes every key built on the old
+# versions unreachable in every worker process at once; those
+# entries then age out through the LRU / TTL. The versions are
+# read once per request and shared with conditional.py, so a
+# cached body always goes out with the ETag of the data in it.
+#
+# The store is an in-process LRU with a TTL. Setting
+# CACHE_REDIS_URL shares the cache between worker processes
+# through Redis instead, when the redis package is installed.
+#------------------------------------------------------------
+import functools
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlencode
+
+from flask import current_app, make_response, request
+
+from backend.utils import streaming
+from backend.utils import versions
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+
+class LRUStore:
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def size(self):
+        with self._lock:
+            return len(self._entries)
+
+
+class RedisStore:
+
+    def __init__(self, url, prefix='healthhub:cache:'):
+        self._redis = redis.Redis.from_url(url)
+        self._prefix = prefix
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        raw = self._redis.get(self._prefix + key)
+        return pickle.loads(raw) if raw is not None else None
+
+    def set(self, key, value, ttl):
+        self._redis.set(self._prefix + key, pickle.dumps(value), ex=max(int(ttl), 1))
+
+    def clear(self):
+        for key in self._redis.scan_iter(self._prefix + '*'):
+            self._redis.delete(key)
+
+    def size(self):
+        return None
+
+
+class ResponseCache:
+
+    def __init__(self):
+        self.store = None
+        self.ttl = 60
+        self.max_entry_bytes = 1024 * 1024
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'misses': 0, 'stores': 0}
+
+    def init_app(self, app):
+        config = app.config
+        self.ttl = config.get('CACHE_TTL', 60)
+        self.max_entry_bytes = config.get('CACHE_MAX_ENTRY_BYTES', 1024 * 1024)
+
+        if not config.get('CACHE_ENABLED', True):
+            self.store = None
+        elif config.get('CACHE_REDIS_URL') and redis is not None:
+            self.store = RedisStore(config['CACHE_REDIS_URL'])
+        else:
+            if config.get('CACHE_REDIS_URL'):
+                app.logger.warning('CACHE_REDIS_URL is set but the redis package is '
+                                   'not installed; using the in-process cache')
+            self.store = LRUStore(config.get('CACHE_MAX_ENTRIES', 1024))
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._counters[name] += amount
+
+    # the data versions (see versions.py) are part of the key, the
+    # same ones the ETag is made from
+    def key_for(self, tags):
+        tags = tags + [versions.ALL_TAG]
+        args = urlencode(sorted(request.args.items(multi=True)))
+        return f'{request.path}?{args}#{versions.state(versions.for_request(tags), tags)}'
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+        stats['enabled'] = self.store is not None
+        if self.store is not None:
+            stats['backend'] = type(self.store).__name__
+            stats['entries'] = self.store.size()
+            stats['evictions'] = self.store.evictions
+            stats['expirations'] = self.store.expirations
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_ratio'] = round(stats['hits'] / lookups, 4) if lookups else None
+        return stats
+
+
+response_cache = ResponseCache()
+
+# responses are cached together with these headers
+KEPT_HEADERS = ('X-Next-Page', 'Link', 'X-Total-Points')
+
+
+#------------------------------------------------------------
+# Caches a GET view's 200 responses. `tables` are the tables the
+# response is built from; `user_arg` names the URL or query
+# argument that narrows it down to one user.
+def cached(*tables, user_arg='user_id'):
+
+    def decorator(view):
+
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            # streamed exports are never cached
+            if response_cache.store is None or streaming.wants_stream():
+                return view(*args, **kwargs)
+
+            user_id = kwargs.get(user_arg) or request.args.get(user_arg)
+            if user_id:
+                tags = [f'{table}:{user_id}' for table in tables]
+            else:
+                tags = list(tables)
+
+            key = response_cache.key_for(tags)
+            entry = response_cache.store.get(key)
+            if entry is not None:
+                response_cache._count('hits')
+                body, mimetype, headers = entry
+                the_response = make_response(body)
+                the_response.mimetype = mimetype
+                the_response.headers.update(headers)
+                the_response.headers['X-Cache'] = 'HIT'
+                return the_response
+
+            response_cache._count('misses')
+            the_response = current_app.make_response(view(*args, **kwargs))
+            the_response.headers['X-Cache'] = 'MISS'
+
+            if the_response.status_code == 200 and not the_response.is_streamed:
+                body = the_response.get_data()
+                if len(body) <= response_cache.max_entry_bytes:
+                    headers = {name: the_response.headers[name]
+                               for name in KEPT_HEADERS if name in the_response.headers}
+                    response_cache.store.set(key, (body, the_response.mimetype, headers),
+                                             response_cache.ttl)
+                    response_cache._count('stores')
+            return the_response
+
+        return wrapper
+
+    return decorator
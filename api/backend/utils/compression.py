@@ -0,0 +1,145 @@
+#------------------------------------------------------------
+# gzip / brotli compression of the JSON responses.
+#
+# Log rows (TrainerNotes especially) are repetitive text that
+# compresses several times over. After every request the response
+# is encoded with the best encoding the client accepts: br when
+# the brotli package is installed, gzip otherwise. Responses
+# smaller than COMPRESS_MIN_SIZE are sent as they are, because
+# compressing them costs more than it saves.
+#
+# Streamed exports are compressed chunk by chunk. Each chunk is
+# flushed, so the client still gets rows as they are read instead
+# of waiting for the whole body.
+#------------------------------------------------------------
+import zlib
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = ('application/json', 'application/x-ndjson',
+                          'text/plain', 'text/html', 'text/csv')
+
+
+def _choose_encoding():
+    accepted = request.accept_encodings
+    if brotli is not None and accepted.quality('br') > 0:
+        return 'br'
+    if accepted.quality('gzip') > 0:
+        return 'gzip'
+    return None
+
+
+class GzipEncoder:
+
+    def __init__(self, level):
+        # wbits 16 + MAX_WBITS writes a gzip header and trailer
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data):
+        return self._compressor.compress(data)
+
+    def flush(self):
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._compressor.flush()
+
+
+class BrotliEncoder:
+
+    def __init__(self, level):
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data):
+        return self._compressor.process(data)
+
+    def flush(self):
+        return self._compressor.flush()
+
+    def finish(self):
+        return self._compressor.finish()
+
+
+# wraps a streamed body; close() is passed through so the
+# streaming generator can close its cursor when the client goes
+# away mid-export, even before the first chunk was read
+class CompressedStream:
+
+    def __init__(self, chunks, encoder):
+        self._chunks = chunks
+        self._encoder = encoder
+
+    def __iter__(self):
+        for chunk in self._chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode()
+            data = self._encoder.compress(chunk) + self._encoder.flush()
+            if data:
+                yield data
+        yield self._encoder.finish()
+
+    def close(self):
+        if hasattr(self._chunks, 'close'):
+            self._chunks.close()
+
+
+#------------------------------------------------------------
+class Compression:
+
+    def __init__(self):
+        self.enabled = True
+        self.min_size = 1024
+        self.gzip_level = 6
+        self.br_level = 4
+
+    def init_app(self, app):
+        config = app.config
+        self.enabled = config.get('COMPRESS_ENABLED', True)
+        self.min_size = config.get('COMPRESS_MIN_SIZE', 1024)
+        self.gzip_level = config.get('COMPRESS_LEVEL', 6)
+        self.br_level = config.get('COMPRESS_BR_LEVEL', 4)
+        if self.enabled:
+            app.after_request(self.compress)
+
+    def _encoder(self, encoding):
+        if encoding == 'br':
+            return BrotliEncoder(self.br_level)
+        return GzipEncoder(self.gzip_level)
+
+    def compress(self, the_response):
+        if (the_response.mimetype not in COMPRESSIBLE_MIMETYPES
+                or the_response.status_code < 200
+                or the_response.status_code in (204, 206, 304)
+                or 'Content-Encoding' in the_response.headers
+                or the_response.direct_passthrough):
+            return the_response
+
+        # the body depends on Accept-Encoding whether or not this
+        # particular response ends up compressed
+        the_response.vary.add('Accept-Encoding')
+
+        encoding = _choose_encoding()
+        if encoding is None:
+            return the_response
+
+        if the_response.is_streamed:
+            the_response.response = CompressedStream(the_response.response,
+                                                     self._encoder(encoding))
+            the_response.headers.pop('Content-Length', None)
+        else:
+            body = the_response.get_data()
+            if len(body) < self.min_size:
+                return the_response
+            encoder = self._encoder(encoding)
+            the_response.set_data(encoder.compress(body) + encoder.finish())
+
+        the_response.headers['Content-Encoding'] = encoding
+        return the_response
+
+
+compression = Compression()
@@ -0,0 +1,88 @@
+#------------------------------------------------------------
+# Conditional GET (ETag / If-None-Match, Last-Modified /
+# If-Modified-Since) for the log and admin read routes.
+#
+# The ETag of a response is derived from the request (path,
+# normalized query args, JSON or NDJSON) and the current versions
+# of the tables it reads (see versions.py), not from the body. So
+# a client that already holds the current data gets a
+# 304 Not Modified after one primary key lookup, without the
+# route's SELECT running or any JSON being encoded.
+#------------------------------------------------------------
+import datetime
+import functools
+import hashlib
+from urllib.parse import urlencode
+
+from flask import current_app, make_response, request
+
+from backend.utils import streaming
+from backend.utils import versions
+
+
+def _etag(state):
+    variant = 'ndjson' if streaming.wants_ndjson() else 'json'
+    if current_app.json.legacy_format:
+        variant += '-legacy'
+    args = urlencode(sorted(request.args.items(multi=True)))
+    seed = f'{request.path}?{args}|{variant}|{state}'
+    return hashlib.sha1(seed.encode()).hexdigest()
+
+
+def _not_modified(etag, last_modified):
+    if request.if_none_match:
+        # when both are sent, If-None-Match decides (RFC 9110 13.2.2)
+        return request.if_none_match.contains_weak(etag)
+    if request.if_modified_since and last_modified:
+        return last_modified <= request.if_modified_since
+    return False
+
+
+def _stamp(the_response, etag, last_modified):
+    the_response.set_etag(etag, weak=True)
+    if last_modified:
+        the_response.last_modified = last_modified
+    # clients may keep the body but have to check back every time
+    the_response.headers['Cache-Control'] = 'no-cache'
+    return the_response
+
+
+#------------------------------------------------------------
+# `tables` are the tables the response is read from; `user_arg`
+# names the URL or query argument that narrows it to one user.
+def conditional(*tables, user_arg='user_id'):
+
+    def decorator(view):
+
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            if not current_app.config.get('CONDITIONAL_GET_ENABLED', True):
+                return view(*args, **kwargs)
+
+            user_id = kwargs.get(user_arg) or request.args.get(user_arg)
+            if user_id:
+                tags = [f'{table}:{user_id}' for table in tables]
+            else:
+                tags = list(tables)
+            tags.append(versions.ALL_TAG)
+
+            # read before the route's own SELECT, so the ETag can
+            # only ever be older than the data, never newer
+            known = versions.for_request(tags)
+            state = versions.state(known, tags)
+            stamps = [modified for _, modified in known.values() if modified]
+            last_modified = (max(stamps).replace(tzinfo=datetime.timezone.utc)
+                             if stamps else None)
+
+            etag = _etag(state)
+            if _not_modified(etag, last_modified):
+                return _stamp(make_response('', 304), etag, last_modified)
+
+            the_response = current_app.make_response(view(*args, **kwargs))
+            if the_response.status_code == 200:
+                _stamp(the_response, etag, last_modified)
+            return the_response
+
+        return wrapper
+
+    return decorator
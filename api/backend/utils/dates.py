@@ -0,0 +1,39 @@
+#------------------------------------------------------------
+# ?from= / ?to= date range parsing for the time range endpoints
+#------------------------------------------------------------
+import datetime
+
+
+class BadDateRange(ValueError):
+    pass
+
+
+# returns (from, to) as dates, either of them None when not given
+def parse_range(args):
+    bounds = []
+    for name in ('from', 'to'):
+        value = args.get(name)
+        if not value:
+            bounds.append(None)
+            continue
+        try:
+            bounds.append(datetime.date.fromisoformat(value))
+        except ValueError:
+            raise BadDateRange(f'{name} must be a date in YYYY-MM-DD format')
+
+    start, end = bounds
+    if start and end and start > end:
+        raise BadDateRange('from must not be after to')
+    return start, end
+
+
+# "Date >= %s AND Date <= %s" style filters for a parsed range
+def range_filters(start, end, column='Date'):
+    filters, params = [], []
+    if start:
+        filters.append(f'{column} >= %s')
+        params.append(start)
+    if end:
+        filters.append(f'{column} <= %s')
+        params.append(end)
+    return filters, params
@@ -0,0 +1,150 @@
+#------------------------------------------------------------
+# ?max_points= downsampling for the time-series endpoints.
+#
+#   GET /users/1/daily?fields=Date,CaloriesBurned&max_points=400
+#   GET /workoutlog/progression?user_id=1&exercise=Deadlift&max_points=300&y=TopWeight
+#
+# Years of daily rows make a chart that is slow to draw and a
+# payload that is mostly invisible detail. With ?max_points= the
+# series is cut down to at most that many of its own rows, picked
+# so the plotted line keeps its shape:
+#
+#   lttb     Largest-Triangle-Three-Buckets (the default). The
+#            first and last points are kept; the rest are split
+#            into max_points - 2 buckets and each bucket keeps the
+#            point that makes the largest triangle with the point
+#            kept before it and the mean of the next bucket.
+#   minmax   each of max_points / 2 buckets keeps its lowest and
+#            highest point, so every peak and dip survives.
+#
+# Rows are returned unchanged (only fewer of them), so clients do
+# not need to know whether a series was downsampled; the
+# X-Total-Points header has the length before downsampling. Rows
+# without a value are left out, as a chart would skip them.
+# Without ?max_points= nothing changes.
+#------------------------------------------------------------
+import datetime
+from collections import namedtuple
+
+import numpy as np
+
+METHODS = ('lttb', 'minmax')
+MIN_POINTS = 3
+MAX_POINTS = 10000
+
+Sampling = namedtuple('Sampling', ['max_points', 'method', 'column'])
+
+
+class BadDownsample(ValueError):
+    pass
+
+
+#------------------------------------------------------------
+# Reads ?max_points=, ?downsample= and ?y= from the request args.
+# `columns` are the value columns the series could be drawn from;
+# ?y= picks one of them and may be left out when there is only
+# one or the route has a `default`. Returns None when the caller
+# did not ask for downsampling.
+def parse_request(args, columns, default=None):
+    raw = args.get('max_points')
+    if raw is None:
+        return None
+
+    try:
+        max_points = int(raw)
+    except ValueError:
+        raise BadDownsample('max_points must be an integer')
+    if not MIN_POINTS <= max_points <= MAX_POINTS:
+        raise BadDownsample(f'max_points must be between {MIN_POINTS} and {MAX_POINTS}')
+
+    method = args.get('downsample', METHODS[0]).lower()
+    if method not in METHODS:
+        raise BadDownsample(f'downsample must be one of {", ".join(METHODS)}')
+
+    allowed = {name.lower(): name for name in columns}
+    column = args.get('y', default)
+    if column is None:
+        if len(allowed) != 1:
+            raise BadDownsample(f'max_points needs ?y= to name the value column, one of {", ".join(columns)}')
+        column = columns[0]
+    elif column.lower() in allowed:
+        column = allowed[column.lower()]
+    else:
+        raise BadDownsample(f'unknown y {column}; allowed: {", ".join(columns)}')
+
+    return Sampling(max_points, method, column)
+
+
+def _position(value):
+    if isinstance(value, datetime.datetime):
+        return value.timestamp()
+    if isinstance(value, datetime.date):
+        return float(value.toordinal())
+    return float(value)
+
+
+#------------------------------------------------------------
+# Indices of the points LTTB keeps. Each bucket's pick depends on
+# the previous bucket's, so the buckets are walked in order, but
+# every bucket is scored in one numpy expression and the next
+# bucket means all come from one pass over the cumulative sums.
+def lttb(x, y, max_points):
+    count = len(x)
+    if count <= max_points:
+        return np.arange(count)
+
+    # bucket b covers [edges[b], edges[b + 1]) of the inner points
+    buckets = max_points - 2
+    edges = (np.arange(buckets + 1) * (count - 2) // buckets + 1).astype(int)
+    sizes = np.diff(edges)
+    x_sums = np.concatenate([[0.0], np.cumsum(x)])
+    y_sums = np.concatenate([[0.0], np.cumsum(y)])
+    x_means = np.append((x_sums[edges[1:]] - x_sums[edges[:-1]]) / sizes, x[-1])
+    y_means = np.append((y_sums[edges[1:]] - y_sums[edges[:-1]]) / sizes, y[-1])
+
+    kept = np.empty(max_points, dtype=int)
+    kept[0], kept[-1] = 0, count - 1
+    previous = 0
+    for bucket in range(buckets):
+        start, stop = edges[bucket], edges[bucket + 1]
+        x_a, y_a = x[previous], y[previous]
+        x_c, y_c = x_means[bucket + 1], y_means[bucket + 1]
+        # twice the triangle area, which ranks the same
+        areas = np.abs((x_a - x_c) * (y[start:stop] - y_a) - (x_a - x[start:stop]) * (y_c - y_a))
+        previous = start + int(np.argmax(areas))
+        kept[bucket + 1] = previous
+    return kept
+
+
+#------------------------------------------------------------
+# Indices of the lowest and highest point of each bucket, in
+# order. Sorting by (bucket, value) puts each bucket's minimum at
+# the start of its run and its maximum at the end.
+def minmax(y, max_points):
+    count = len(y)
+    if count <= max_points:
+        return np.arange(count)
+
+    buckets = max_points // 2
+    groups = np.arange(count) * buckets // count
+    order = np.lexsort((y, groups))
+    sizes = np.bincount(groups, minlength=buckets)
+    ends = np.cumsum(sizes)
+    starts = ends - sizes
+    return np.unique(np.concatenate([order[starts], order[ends - 1]]))
+
+
+# the rows `sampling` keeps, ordered by `x_key`
+def downsample(rows, x_key, sampling):
+    rows = sorted((row for row in rows if row[sampling.column] is not None and row[x_key] is not None),
+                  key=lambda row: row[x_key])
+    if len(rows) <= sampling.max_points:
+        return rows
+
+    y = np.array([float(row[sampling.column]) for row in rows])
+    if sampling.method == 'minmax':
+        kept = minmax(y, sampling.max_points)
+    else:
+        kept = lttb(np.array([_position(row[x_key]) for row in rows]), y, sampling.max_points)
+    return [rows[index] for index in kept]
+
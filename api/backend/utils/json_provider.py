@@ -0,0 +1,104 @@
+#------------------------------------------------------------
+# JSON encoding for every response (jsonify, streamed exports,
+# cached bodies).
+#
+# Flask's default provider writes DATE columns as RFC 1123
+# strings ("Mon, 01 Jan 2024 00:00:00 GMT"), DECIMAL columns as
+# strings, and goes through the pure-Python json module. This
+# provider writes dates as ISO 8601 ("2024-01-01"), decimals as
+# JSON numbers, and uses orjson when it is installed (the
+# standard library otherwise).
+#
+# JSON_LEGACY_FORMAT=1 brings back the old wire format
+# (RFC 1123 dates, decimals as strings) for clients that still
+# parse it, while keeping the faster encoder.
+#------------------------------------------------------------
+import datetime
+import decimal
+import functools
+import json
+import time
+
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.http import http_date
+
+from backend.utils import metrics
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _iso_default(o):
+    if isinstance(o, decimal.Decimal):
+        return float(o)
+    if isinstance(o, (datetime.date, datetime.time)):
+        return o.isoformat()
+    # e.g. UUIDs and dataclasses, the same way Flask handles them
+    return DefaultJSONProvider.default(o)
+
+
+# log payloads repeat the same few hundred dates many times over
+_legacy_date = functools.lru_cache(maxsize=4096)(http_date)
+
+
+def _legacy_default(o):
+    if isinstance(o, datetime.date):
+        return _legacy_date(o)
+    if isinstance(o, datetime.time):
+        return o.isoformat()
+    return DefaultJSONProvider.default(o)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+
+    legacy_format = False
+
+    def _default(self):
+        return _legacy_default if self.legacy_format else _iso_default
+
+    def _orjson_options(self):
+        options = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if self.legacy_format:
+            # hand dates to _legacy_default instead of the
+            # built-in ISO encoding
+            options |= orjson.OPT_PASSTHROUGH_DATETIME
+        return options
+
+    def _encode(self, obj):
+        if orjson is not None:
+            return orjson.dumps(obj, default=self._default(), option=self._orjson_options())
+        return json.dumps(obj, default=self._default(), sort_keys=self.sort_keys,
+                          ensure_ascii=self.ensure_ascii,
+                          separators=(',', ':')).encode()
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None:
+            kwargs.setdefault('default', self._default())
+            kwargs.setdefault('sort_keys', self.sort_keys)
+            kwargs.setdefault('ensure_ascii', self.ensure_ascii)
+            return json.dumps(obj, **kwargs)
+        return self._encode(obj).decode()
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return json.loads(s, **kwargs)
+        return orjson.loads(s)
+
+    # skips the bytes -> str -> bytes round trip of the default
+    # implementation
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        started = time.perf_counter()
+        body = self._encode(obj) + b'\n'
+        metrics.add_serialize_time(time.perf_counter() - started)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def init_app(app):
+    app.json_provider_class = FastJSONProvider
+    app.json = FastJSONProvider(app)
+    app.json.legacy_format = app.config.get('JSON_LEGACY_FORMAT', False)
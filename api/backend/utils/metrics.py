@@ -0,0 +1,183 @@
+#------------------------------------------------------------
+# Per-request instrumentation, served at GET /metrics in the
+# Prometheus text format.
+#
+# For every request we record, labelled by the matched URL rule
+# (e.g. /workoutlog/<logID>) rather than the raw path:
+#   - total latency (also by method and status code)
+#   - seconds spent in MySQL and the number of statements
+#     (from the cursor wrapper in db_connection/instrumented.py)
+#   - seconds spent encoding JSON (from json_provider.py and
+#     streaming.py)
+#   - rows read from the database
+#
+# Streamed exports are recorded when the last chunk has been
+# sent, so their DB and encoding time is included.
+#
+# The numbers are per process: under gunicorn every worker keeps
+# its own, and a scrape sees the worker that answered it.
+#
+# With SERVER_TIMING=1 every response also carries a
+# Server-Timing header (db, serialize, app) that shows up in the
+# browser dev tools.
+#------------------------------------------------------------
+import bisect
+import threading
+import time
+
+from flask import g, has_request_context, request
+
+from backend.db_connection.instrumented import query_stats
+
+PROMETHEUS_MIMETYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+ROW_BUCKETS = (0, 1, 10, 100, 1000, 10000, 100000)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names, values, extra=''):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+
+    def __init__(self, name, help_text, label_names, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        # label values -> [per-bucket counts (+Inf last), sum]
+        self._series = {}
+
+    def observe(self, label_values, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def render(self, lines):
+        lines.append(f'# HELP {self.name} {self.help_text}')
+        lines.append(f'# TYPE {self.name} histogram')
+        with self._lock:
+            series = sorted((values, list(counts), total)
+                            for values, (counts, total) in self._series.items())
+        for values, counts, total in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = f'le="{_number(bound)}"'
+                lines.append(f'{self.name}_bucket{_labels(self.label_names, values, le)} {cumulative}')
+            lines.append(f'{self.name}_sum{_labels(self.label_names, values)} {_number(total)}')
+            lines.append(f'{self.name}_count{_labels(self.label_names, values)} {cumulative}')
+
+
+def _render_value(lines, name, kind, help_text, value):
+    if value is None:
+        return
+    lines.append(f'# HELP {name} {help_text}')
+    lines.append(f'# TYPE {name} {kind}')
+    lines.append(f'{name} {_number(value)}')
+
+
+#------------------------------------------------------------
+class Metrics:
+
+    def __init__(self):
+        self.server_timing = False
+        self.request_seconds = Histogram(
+            'healthhub_request_duration_seconds', 'Time from routing to the last byte sent.',
+            ('method', 'endpoint', 'status'), LATENCY_BUCKETS)
+        self.db_seconds = Histogram(
+            'healthhub_request_db_seconds', 'Time per request spent in MySQL.',
+            ('endpoint',), LATENCY_BUCKETS)
+        self.serialize_seconds = Histogram(
+            'healthhub_request_serialize_seconds', 'Time per request spent encoding JSON.',
+            ('endpoint',), LATENCY_BUCKETS)
+        self.queries = Histogram(
+            'healthhub_request_queries', 'SQL statements executed per request.',
+            ('endpoint',), COUNT_BUCKETS)
+        self.rows = Histogram(
+            'healthhub_request_rows', 'Rows read from MySQL per request.',
+            ('endpoint',), ROW_BUCKETS)
+        self.histograms = [self.request_seconds, self.db_seconds, self.serialize_seconds,
+                           self.queries, self.rows]
+
+    def init_app(self, app):
+        self.server_timing = app.config.get('SERVER_TIMING', False)
+        app.before_request(self._start)
+        app.after_request(self._add_server_timing)
+        app.teardown_request(self._finish)
+
+    #------------------------------------------------------------
+    # request hooks
+    def _start(self):
+        g._request_started = time.perf_counter()
+        g._serialize_seconds = 0.0
+
+    def _add_server_timing(self, the_response):
+        g._response_status = the_response.status_code
+        if not self.server_timing or '_request_started' not in g:
+            return the_response
+
+        stats = query_stats()
+        elapsed = time.perf_counter() - g._request_started
+        serialize = g.get('_serialize_seconds', 0.0)
+        app_seconds = max(elapsed - stats.db_seconds - serialize, 0.0)
+        the_response.headers['Server-Timing'] = ', '.join([
+            f'db;dur={stats.db_seconds * 1000:.2f};desc="{stats.queries} queries, {stats.rows} rows"',
+            f'serialize;dur={serialize * 1000:.2f}',
+            f'app;dur={app_seconds * 1000:.2f}',
+        ])
+        return the_response
+
+    def _finish(self, exception):
+        if '_request_started' not in g:
+            return
+        elapsed = time.perf_counter() - g.pop('_request_started')
+        endpoint = request.url_rule.rule if request.url_rule is not None else '<unmatched>'
+        status = 500 if exception is not None else g.get('_response_status', 500)
+        stats = query_stats()
+
+        self.request_seconds.observe((request.method, endpoint, str(status)), elapsed)
+        self.db_seconds.observe((endpoint,), stats.db_seconds)
+        self.serialize_seconds.observe((endpoint,), g.get('_serialize_seconds', 0.0))
+        self.queries.observe((endpoint,), stats.queries)
+        self.rows.observe((endpoint,), stats.rows)
+
+    #------------------------------------------------------------
+    # `values` are extra (name, 'gauge' or 'counter', help, value)
+    # samples, such as the connection pool statistics
+    def render(self, values=()):
+        lines = []
+        for histogram in self.histograms:
+            histogram.render(lines)
+        for name, kind, help_text, value in values:
+            _render_value(lines, name, kind, help_text, value)
+        return '\n'.join(lines) + '\n'
+
+
+metrics = Metrics()
+
+
+# called by the JSON encoders with the time one encode took
+def add_serialize_time(seconds):
+    if has_request_context() and '_serialize_seconds' in g:
+        g._serialize_seconds += seconds
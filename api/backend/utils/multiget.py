@@ -0,0 +1,100 @@
+#------------------------------------------------------------
+# Multi-get for the log tables' single-record lookups.
+#
+#   GET  /<log>/lookup?keys=1:10,1:11,2:7
+#   POST /<log>/lookup    {"keys": [[1, 10], [1, 11], [2, 7]]}
+#
+# Each key is a (UserID, LogID) pair, which is the primary key of
+# every log table, so the whole list is resolved by one query
+# that MySQL serves as primary key range lookups:
+#
+#   WHERE (UserID, LogID) IN ((%s, %s), (%s, %s), ...)
+#
+# The response has one entry per key, in the order the keys were
+# given: the record, or null when there is none. The keys that
+# missed are listed as well. POST takes the same keys (as pairs
+# or {"UserID": ..., "LogID": ...} objects) for lists that do not
+# fit in a URL.
+#------------------------------------------------------------
+from flask import jsonify, make_response, request
+
+from backend.db_connection import db
+
+MAX_KEYS = 1000
+
+
+class BadLookup(ValueError):
+    pass
+
+
+def _key(value):
+    if isinstance(value, dict):
+        value = (value.get('UserID'), value.get('LogID'))
+    if not isinstance(value, (list, tuple)) or len(value) != 2:
+        raise BadLookup('each key must be a (UserID, LogID) pair')
+    try:
+        if any(isinstance(part, (bool, float)) for part in value):
+            raise ValueError
+        return int(value[0]), int(value[1])
+    except (TypeError, ValueError):
+        raise BadLookup(f'invalid key {value!r}: UserID and LogID must be integers')
+
+
+def _checked(keys):
+    if not keys:
+        raise BadLookup('no keys given')
+    if len(keys) > MAX_KEYS:
+        raise BadLookup(f'at most {MAX_KEYS} keys per lookup')
+    return [_key(key) for key in keys]
+
+
+# ?keys=UserID:LogID,UserID:LogID,...
+def keys_from_args(args):
+    value = args.get('keys', '')
+    return _checked([key.split(':') for key in value.split(',') if key.strip()])
+
+
+# {"keys": [...]} or a bare JSON array of keys
+def keys_from_body():
+    body = request.get_json(silent=True)
+    if isinstance(body, dict):
+        body = body.get('keys')
+    if not isinstance(body, list):
+        raise BadLookup('expected {"keys": [[UserID, LogID], ...]}')
+    return _checked(body)
+
+
+def lookup_query(table, columns, count):
+    placeholders = ', '.join(['(%s, %s)'] * count)
+    return f'''
+        SELECT {columns}
+        FROM {table}
+        WHERE (UserID, LogID) IN ({placeholders})
+    '''
+
+
+# the rows for `keys` in the same order, None where there is none
+def lookup(table, columns, keys):
+    unique = list(dict.fromkeys(keys))
+    cursor = db.get_db().cursor()
+    cursor.execute(lookup_query(table, columns, len(unique)),
+                   [part for key in unique for part in key])
+    found = {(row['UserID'], row['LogID']): row for row in cursor.fetchall()}
+    return [found.get(key) for key in keys]
+
+
+def lookup_response(table, columns, keys):
+    results = lookup(table, columns, keys)
+    the_response = make_response(jsonify({
+        'results': results,
+        'found': sum(result is not None for result in results),
+        'missing': [list(key) for key, result in zip(keys, results) if result is None],
+    }))
+    the_response.status_code = 200
+    return the_response
+
+
+def error_response(error):
+    the_response = make_response(jsonify({'error': str(error)}))
+    the_response.status_code = 400
+    return the_response
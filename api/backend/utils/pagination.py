@@ -0,0 +1,173 @@
+#------------------------------------------------------------
+# Keyset (cursor) pagination for the log list endpoints.
+#
+# Every log table is keyed on (UserID, LogID) and listed newest
+# first, so pages are ordered by (Date, UserID, LogID) descending
+# and the next page starts strictly after the last row of the
+# previous one. Unlike OFFSET this costs the same on page 1 and
+# page 10,000.
+#
+# Clients pass ?limit=N (capped at MAX_PAGE_SIZE) and get the
+# rows back as the usual JSON array. When there are more rows the
+# response carries an opaque token in the X-Next-Page header (and
+# a Link: rel="next" URL); sending it back as ?next=<token>
+# returns the following page.
+#
+# list_response() is the whole GET handler of a log list
+# endpoint: the ?user_id= filter, ?fields= (see projection.py),
+# exports (see streaming.py) and pages.
+#------------------------------------------------------------
+import base64
+import binascii
+import datetime
+import json
+from collections import namedtuple
+
+from flask import jsonify, make_response, request, url_for
+
+from backend.db_connection import db
+from backend.utils import projection
+from backend.utils import streaming
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+ORDER_BY = 'ORDER BY Date DESC, UserID DESC, LogID DESC'
+
+# rows strictly after (Date, UserID, LogID) in ORDER_BY order.
+# Spelled out rather than as a row constructor so MySQL can use
+# it as an index range.
+AFTER_CLAUSE = '(Date < %s OR (Date = %s AND (UserID < %s OR (UserID = %s AND LogID < %s))))'
+
+Page = namedtuple('Page', ['limit', 'after'])
+
+
+class BadPageRequest(ValueError):
+    pass
+
+
+#------------------------------------------------------------
+# Reads ?limit= and ?next= from the request args. Returns None
+# when the caller did not ask for a page, unless `always` is set
+# (used for unfiltered reads, which must never return a whole
+# table in one go).
+def parse_page(args, always=False):
+    raw_limit = args.get('limit')
+    token = args.get('next')
+
+    if raw_limit is None and token is None and not always:
+        return None
+
+    if raw_limit is None:
+        limit = DEFAULT_PAGE_SIZE
+    else:
+        try:
+            limit = int(raw_limit)
+        except ValueError:
+            raise BadPageRequest('limit must be an integer')
+        if limit < 1:
+            raise BadPageRequest('limit must be at least 1')
+        limit = min(limit, MAX_PAGE_SIZE)
+
+    after = decode_token(token) if token else None
+    return Page(limit, after)
+
+
+def encode_token(row):
+    key = [row['Date'].isoformat(), row['UserID'], row['LogID']]
+    raw = json.dumps(key, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_token(token):
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        date, user_id, log_id = json.loads(raw)
+        return (datetime.date.fromisoformat(date), int(user_id), int(log_id))
+    except (binascii.Error, ValueError, TypeError):
+        raise BadPageRequest('invalid next token')
+
+
+#------------------------------------------------------------
+# Builds "SELECT <columns> FROM <table> WHERE ... ORDER BY ...
+# LIMIT ..." for one page. One extra row is fetched so we know
+# whether there is a next page without a COUNT(*).
+def list_query(columns, table, filters, params, page):
+    filters = list(filters)
+    params = list(params)
+
+    if page is not None and page.after is not None:
+        date, user_id, log_id = page.after
+        filters.append(AFTER_CLAUSE)
+        params.extend([date, date, user_id, user_id, log_id])
+
+    query = f'SELECT {columns} FROM {table}'
+    if filters:
+        query += ' WHERE ' + ' AND '.join(filters)
+    query += ' ' + ORDER_BY
+
+    if page is not None:
+        query += ' LIMIT %s'
+        params.append(page.limit + 1)
+
+    return query, params
+
+
+# `fields` is the ?fields= projection (see projection.py), applied
+# once the next-page token has been taken from the last row
+def page_response(rows, page, fields=None):
+    next_token = None
+    if page is not None and len(rows) > page.limit:
+        rows = rows[:page.limit]
+        next_token = encode_token(rows[-1])
+
+    the_response = make_response(jsonify(projection.project(rows, fields)))
+    the_response.status_code = 200
+
+    if next_token:
+        args = request.args.to_dict()
+        args['next'] = next_token
+        the_response.headers['X-Next-Page'] = next_token
+        the_response.headers['Link'] = f'<{url_for(request.endpoint, **request.view_args, **args)}>; rel="next"'
+    return the_response
+
+
+def bad_page_response(error):
+    the_response = make_response(jsonify({'error': str(error)}))
+    the_response.status_code = 400
+    return the_response
+
+
+#------------------------------------------------------------
+# GET /<log>/ for one log table; `columns` is its column list
+def list_response(table, columns):
+    user_id = request.args.get('user_id')
+
+    filters, params = [], []
+    if user_id:
+        filters.append('UserID = %s')
+        params.append(user_id)
+
+    # ?fields=Date,... narrows the columns
+    try:
+        fields = projection.parse_fields(request.args, columns)
+    except projection.BadFields as e:
+        return projection.error_response(e)
+
+    # exports (?stream=1 or Accept: application/x-ndjson) skip paging
+    if streaming.wants_stream():
+        query, params = list_query(projection.select_list(columns, fields), table, filters, params, None)
+        return streaming.stream_response(query, params)
+
+    # an unfiltered read is always paged; a single user's logs only
+    # when the caller asks for it with ?limit= or ?next=
+    try:
+        page = parse_page(request.args, always=not user_id)
+    except BadPageRequest as e:
+        return bad_page_response(e)
+
+    query, params = list_query(projection.select_list(columns, fields, page), table, filters, params, page)
+
+    cursor = db.get_db().cursor()
+    cursor.execute(query, params)
+    return page_response(cursor.fetchall(), page, fields)
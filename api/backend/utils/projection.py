@@ -0,0 +1,67 @@
+#------------------------------------------------------------
+# ?fields= column projection for the list endpoints.
+#
+#   GET /workoutlog?user_id=1&fields=Date,CaloriesBurned
+#
+# narrows both the SELECT list and the JSON rows to the named
+# columns, so a chart that plots two columns does not read,
+# encode and transfer the other eight (TrainerNotes included).
+# Names are checked against the route's own column list, which
+# is the only thing ever put into the SQL, and are matched
+# case-insensitively. Without ?fields= every column is returned.
+#
+# Paged reads still need the (Date, UserID, LogID) key of the
+# last row for the next-page token. Those columns are selected
+# when missing and dropped from the rows after the token is made.
+# The cache and ETag keys include the query string, so each
+# projection is cached on its own.
+#------------------------------------------------------------
+from flask import jsonify, make_response
+
+KEY_COLUMNS = ['Date', 'UserID', 'LogID']
+
+
+class BadFields(ValueError):
+    pass
+
+
+def column_names(columns):
+    return [name.strip() for name in columns.split(',')]
+
+
+# the requested columns in request order, or None for all of them
+def parse_fields(args, columns):
+    raw = args.get('fields')
+    if raw is None:
+        return None
+
+    allowed = {name.lower(): name for name in column_names(columns)}
+    requested = [name.strip() for name in raw.split(',') if name.strip()]
+    if not requested:
+        raise BadFields('fields must name at least one column')
+    unknown = [name for name in requested if name.lower() not in allowed]
+    if unknown:
+        raise BadFields(f'unknown fields {", ".join(unknown)}; '
+                        f'allowed: {", ".join(allowed.values())}')
+    return list(dict.fromkeys(allowed[name.lower()] for name in requested))
+
+
+# the SELECT list for `fields`; paged reads add the key columns
+def select_list(columns, fields, page=None):
+    if fields is None:
+        return columns
+    if page is not None:
+        fields = fields + [name for name in KEY_COLUMNS if name not in fields]
+    return ', '.join(fields)
+
+
+def project(rows, fields):
+    if fields is None:
+        return rows
+    return [{name: row[name] for name in fields} for row in rows]
+
+
+def error_response(error):
+    the_response = make_response(jsonify({'error': str(error)}))
+    the_response.status_code = 400
+    return the_response
@@ -0,0 +1,80 @@
+#------------------------------------------------------------
+# Streaming exports for the log list endpoints.
+#
+# A normal list response holds every row in memory twice: once
+# as the dicts from fetchall() and once as the encoded JSON body.
+# In streaming mode the query runs on an unbuffered server-side
+# cursor (SSDictCursor) and rows are encoded a batch at a time
+# by a generator, so memory stays flat however many rows go out.
+#
+#   ?stream=1                   a JSON array, sent incrementally
+#   Accept: application/x-ndjson
+#   or ?stream=ndjson           one JSON object per line
+#
+# Streaming is meant for exports, so it returns the full
+# (filtered) result and ignores ?limit= / ?next=.
+#------------------------------------------------------------
+import time
+
+from flask import Response, current_app, request, stream_with_context
+
+from backend.db_connection import db
+from backend.utils import metrics
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+# rows fetched from the server and encoded per chunk written
+STREAM_BATCH_SIZE = 500
+
+
+def wants_ndjson():
+    if request.args.get('stream') == 'ndjson':
+        return True
+    # only when asked for by name; */* keeps getting plain JSON
+    accept = request.accept_mimetypes
+    if not any(value == NDJSON_MIMETYPE for value, _ in accept):
+        return False
+    return accept.best_match(['application/json', NDJSON_MIMETYPE]) == NDJSON_MIMETYPE
+
+
+def wants_stream():
+    return request.args.get('stream') in ('1', 'true', 'ndjson') or wants_ndjson()
+
+
+def stream_response(query, params):
+    ndjson = wants_ndjson()
+
+    # run the query before handing back the response so that SQL
+    # errors still turn into a normal 500 instead of a cut-off body
+    cursor = db.get_db().cursor(db.stream_cursorclass)
+    cursor.execute(query, params)
+
+    dumps = current_app.json.dumps
+
+    def generate():
+        try:
+            first = True
+            if not ndjson:
+                yield '['
+            while True:
+                rows = cursor.fetchmany(STREAM_BATCH_SIZE)
+                if not rows:
+                    break
+                started = time.perf_counter()
+                if ndjson:
+                    chunk = ''.join(dumps(row) + '\n' for row in rows)
+                else:
+                    chunk = ','.join(dumps(row) for row in rows)
+                    chunk = chunk if first else ',' + chunk
+                    first = False
+                metrics.add_serialize_time(time.perf_counter() - started)
+                yield chunk
+            if not ndjson:
+                yield ']'
+        finally:
+            # an unbuffered cursor has to be drained before the
+            # connection goes back to the pool
+            cursor.close()
+
+    mimetype = NDJSON_MIMETYPE if ndjson else 'application/json'
+    return Response(stream_with_context(generate()), status=200, mimetype=mimetype)
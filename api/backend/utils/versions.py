@@ -0,0 +1,65 @@
+#------------------------------------------------------------
+# Version counters behind conditional GET.
+#
+# Each tag (see cache.py for the naming) has a row in the
+# DataVersion table holding a counter and the time it last
+# changed. Write routes bump the tags they affect inside their
+# own transaction, so a reader can never see new data with an
+# old version. Reading a response's versions is a single primary
+# key lookup, which is what lets conditional.py answer
+# 304 Not Modified without running the route's SELECT.
+#------------------------------------------------------------
+from flask import g, has_request_context
+
+from backend.db_connection import db
+
+ALL_TAG = '*'
+
+
+def tags_for(tables, user_ids=()):
+    return list(tables) + [f'{table}:{user_id}' for table in tables for user_id in user_ids]
+
+
+# returns {tag: (version, modified_at)} for the tags that have
+# ever been bumped
+def current(tags):
+    cursor = db.get_db().cursor()
+    placeholders = ', '.join(['%s'] * len(tags))
+    cursor.execute(f'SELECT Tag, Version, ModifiedAt FROM DataVersion WHERE Tag IN ({placeholders})',
+                   list(tags))
+    return {row['Tag']: (row['Version'], row['ModifiedAt']) for row in cursor.fetchall()}
+
+
+# current() read once per request: conditional.py (the ETag) and
+# cache.py (the cache key) both describe a response by these same
+# versions, so a cached body can never go out under the ETag of
+# newer data
+def for_request(tags):
+    if not has_request_context():
+        return current(tags)
+    seen = g.setdefault('data_versions', {})
+    key = tuple(tags)
+    if key not in seen:
+        seen[key] = current(tags)
+    return seen[key]
+
+
+# "3,0,17": the version of each of `tags`, 0 for never bumped
+def state(known, tags):
+    return ','.join(str(known.get(tag, (0, None))[0]) for tag in tags)
+
+
+def bump(tags):
+    # a fixed order keeps concurrent writers from deadlocking on
+    # each other's rows
+    tags = sorted(set(tags))
+    if not tags:
+        return
+    cursor = db.get_db().cursor()
+    values = ', '.join(['(%s, 1, UTC_TIMESTAMP())'] * len(tags))
+    cursor.execute(f'''
+        INSERT INTO DataVersion (Tag, Version, ModifiedAt)
+        VALUES {values} AS new
+        ON DUPLICATE KEY UPDATE Version = DataVersion.Version + 1,
+                                ModifiedAt = new.ModifiedAt
+    ''', tags)
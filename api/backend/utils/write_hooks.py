@@ -0,0 +1,54 @@
+#------------------------------------------------------------
+# Follow-up work for writes to the log tables.
+#
+# Every log blueprint calls after_log_write() with the
+# (UserID, Date) days it touched, after its INSERT / UPDATE /
+# DELETE and before it commits, so everything derived from the
+# logs (rollups, version counters) changes in the same
+# transaction as the logs themselves. Other write routes call
+# after_table_write() the same way. Cached responses and ETags
+# are keyed on those version counters (see cache.py), so the
+# write reaches every worker process as soon as it commits.
+#------------------------------------------------------------
+from backend.db_connection import db
+from backend.rollups import daily_rollup
+from backend.utils import versions
+
+# tables whose contents are derived from each log table
+DERIVED_TABLES = {
+    'WorkoutLog': ['DailyRollup', 'PersonalRecord'],
+    'FoodLog': ['DailyRollup'],
+    'SleepLog': ['DailyRollup'],
+    'MoodLog': ['DailyRollup'],
+    'HeartRateLog': ['DailyRollup'],
+}
+
+
+# the days a row keyed by LogID lives on before an UPDATE or
+# DELETE moves or removes it, locked until the write commits
+def days_for_log(table, log_id):
+    cursor = db.get_db().cursor()
+    cursor.execute(f'SELECT UserID, Date FROM {table} WHERE LogID = %s FOR UPDATE',
+                   (log_id,))
+    return [(row['UserID'], row['Date']) for row in cursor.fetchall()]
+
+
+def after_log_write(table, days):
+    days = [(user_id, date) for user_id, date in days
+            if user_id is not None and date is not None]
+    if not days:
+        return
+    daily_rollup.refresh(db.get_db().cursor(), table, days)
+
+    tables = [table] + DERIVED_TABLES.get(table, [])
+    user_ids = sorted({str(user_id) for user_id, _ in days})
+    after_table_write(tables, user_ids)
+
+
+# `everything` is for writes that can change any response, such
+# as deleting a user, which cascades to all of their logs
+def after_table_write(tables, user_ids=(), everything=False):
+    tags = versions.tags_for(tables, user_ids)
+    if everything:
+        tags.append(versions.ALL_TAG)
+    versions.bump(tags)
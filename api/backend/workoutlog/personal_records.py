@@ -0,0 +1,108 @@
+#------------------------------------------------------------
+# Maintains the PersonalRecord table (heaviest WeightUsed per
+# UserID and ExerciseType) as workouts are written.
+#
+# Inserts can only raise a record, so they are a single upsert.
+# Updates and deletes only trigger a recompute when they touch
+# the row that currently holds the record. Every function takes
+# the cursor of the write it belongs to, so the record changes
+# commit (or roll back) together with the workout.
+#
+#   flask --app backend_app pr-rebuild    recompute every record
+#------------------------------------------------------------
+import click
+
+from backend.db_connection import db
+
+
+def raise_record(cursor, user_id, exercise, weight):
+    if user_id is None or not exercise or weight is None:
+        return
+    cursor.execute('''
+        INSERT INTO PersonalRecord (UserID, ExerciseType, MaxWeight)
+        VALUES (%s, %s, %s) AS new
+        ON DUPLICATE KEY UPDATE MaxWeight = GREATEST(PersonalRecord.MaxWeight, new.MaxWeight)
+    ''', (user_id, exercise, weight))
+
+
+# inserts from a batch: one upsert per (user, exercise) with the
+# heaviest weight of the batch
+def raise_records(cursor, rows):
+    best = {}
+    for row in rows:
+        key = (row['UserID'], row['ExerciseType'])
+        weight = row['WeightUsed']
+        if key[0] is None or not key[1] or weight is None:
+            continue
+        if key not in best or weight > best[key]:
+            best[key] = weight
+
+    for (user_id, exercise), weight in best.items():
+        raise_record(cursor, user_id, exercise, weight)
+
+
+def recompute_record(cursor, user_id, exercise):
+    cursor.execute('''
+        SELECT MAX(WeightUsed) AS MaxWeight
+        FROM WorkoutLog
+        WHERE UserID = %s AND ExerciseType = %s
+    ''', (user_id, exercise))
+    weight = cursor.fetchone()['MaxWeight']
+
+    if weight is None:
+        cursor.execute('DELETE FROM PersonalRecord WHERE UserID = %s AND ExerciseType = %s',
+                       (user_id, exercise))
+    else:
+        cursor.execute('''
+            INSERT INTO PersonalRecord (UserID, ExerciseType, MaxWeight)
+            VALUES (%s, %s, %s) AS new
+            ON DUPLICATE KEY UPDATE MaxWeight = new.MaxWeight
+        ''', (user_id, exercise, weight))
+
+
+# old_rows are the WorkoutLog rows as they were before an UPDATE
+# or DELETE; recompute only where one of them held the record
+def after_change(cursor, old_rows):
+    for row in old_rows:
+        if row['ExerciseType'] is None or row['WeightUsed'] is None:
+            continue
+        cursor.execute('''
+            SELECT MaxWeight FROM PersonalRecord
+            WHERE UserID = %s AND ExerciseType = %s
+        ''', (row['UserID'], row['ExerciseType']))
+        current = cursor.fetchone()
+        if current is None or row['WeightUsed'] >= current['MaxWeight']:
+            recompute_record(cursor, row['UserID'], row['ExerciseType'])
+
+
+# rows a write is about to change, locked until it commits
+def rows_for_log(cursor, log_id):
+    cursor.execute('''
+        SELECT UserID, Date, ExerciseType, WeightUsed
+        FROM WorkoutLog
+        WHERE LogID = %s
+        FOR UPDATE
+    ''', (log_id,))
+    return cursor.fetchall()
+
+
+def rebuild(cursor):
+    cursor.execute('DELETE FROM PersonalRecord')
+    cursor.execute('''
+        INSERT INTO PersonalRecord (UserID, ExerciseType, MaxWeight)
+        SELECT UserID, ExerciseType, MAX(WeightUsed)
+        FROM WorkoutLog
+        WHERE ExerciseType IS NOT NULL AND WeightUsed IS NOT NULL
+        GROUP BY UserID, ExerciseType
+    ''')
+    return cursor.rowcount
+
+
+def register_commands(app):
+
+    @app.cli.command('pr-rebuild')
+    def pr_rebuild():
+        conn = db.get_db()
+        count = rebuild(conn.cursor())
+        conn.commit()
+        click.echo(f'{count} personal record(s) rebuilt')
@@ -0,0 +1,208 @@
+#------------------------------------------------------------
+# Strength progression for one user and exercise.
+#
+# Every logged set group (WorkoutLog row) gets an estimated one
+# rep max from its weight and reps:
+#
+#   Epley     weight * (1 + reps / 30)    (the inverse of /prcalc)
+#   Brzycki   weight * 36 / (37 - reps)   (reps below 37)
+#
+# and a volume load of sets * reps * weight. The rows are then
+# reduced per training day (heaviest weight, best estimates, total
+# volume) and per week (Monday first), and the Epley estimate is
+# followed by its best so far and its maximum over the trailing
+# ?window= days.
+#
+# The rows come from the (UserID, ExerciseType, Date) index in date
+# order, so every reduction is a reduceat over the runs of equal
+# days or weeks; there is no Python loop over rows. History before
+# ?from= is read as well, so the best so far and the rolling
+# maximum are right from the first day shown.
+#------------------------------------------------------------
+import datetime
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from backend.db_connection import db
+
+DEFAULT_WINDOW = 28
+MAX_WINDOW = 365
+# Brzycki's denominator reaches zero at 37 reps
+BRZYCKI_MAX_REPS = 37
+
+# the per day series, for ?max_points= / ?y=
+SERIES = ['E1RMEpley', 'E1RMBrzycki', 'BestE1RM', 'RollingMaxE1RM', 'TopWeight', 'Volume']
+
+QUERY = '''
+    SELECT Date, setCount, repsInSet, WeightUsed
+    FROM WorkoutLog
+    WHERE UserID = %s AND ExerciseType = %s{until}
+    ORDER BY Date ASC
+'''
+
+
+class ProgressionError(ValueError):
+    pass
+
+
+def parse_user_id(args):
+    try:
+        return int(args['user_id'])
+    except ValueError:
+        raise ProgressionError('user_id must be an integer')
+
+
+def parse_window(args):
+    try:
+        window = int(args.get('window', DEFAULT_WINDOW))
+    except ValueError:
+        raise ProgressionError('window must be an integer')
+    if not 1 <= window <= MAX_WINDOW:
+        raise ProgressionError(f'window must be between 1 and {MAX_WINDOW} days')
+    return window
+
+
+#------------------------------------------------------------
+# array helpers
+def epley(weight, reps):
+    with np.errstate(invalid='ignore'):
+        return np.where(reps >= 1, weight * (1 + reps / 30.0), np.nan)
+
+
+def brzycki(weight, reps):
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where((reps >= 1) & (reps < BRZYCKI_MAX_REPS), weight * 36.0 / (37.0 - reps), np.nan)
+
+
+# index of the first entry of each run of equal keys (keys sorted)
+def run_starts(keys):
+    return np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+
+
+# per run: the largest value, NaN when the run has none
+def max_at(values, starts):
+    return np.fmax.reduceat(values, starts)
+
+
+# per run: the sum of the values, NaN when the run has none
+def sum_at(values, starts):
+    valid = ~np.isnan(values)
+    totals = np.add.reduceat(np.where(valid, values, 0.0), starts)
+    return np.where(np.add.reduceat(valid.astype(int), starts) > 0, totals, np.nan)
+
+
+# maximum over the trailing `window` calendar days of each day in
+# `days` (sorted day numbers), over a grid with one slot per day
+def rolling_max(days, values, window):
+    grid = np.full(days[-1] - days[0] + window, np.nan)
+    grid[days - days[0] + window - 1] = values
+    return np.fmax.reduce(sliding_window_view(grid, window), axis=1)[days - days[0]]
+
+
+def week_starts(days):
+    # day 1 (0001-01-01) is a Monday
+    return days - (days - 1) % 7
+
+
+def _column(rows, name):
+    return np.array([np.nan if row[name] is None else float(row[name]) for row in rows])
+
+
+def _as_list(values, digits=1):
+    return [None if value != value else value for value in np.round(values, digits).tolist()]
+
+
+#------------------------------------------------------------
+def read_rows(user_id, exercise, end):
+    params = [user_id, exercise]
+    if end:
+        params.append(end)
+    cursor = db.get_db().cursor()
+    cursor.execute(QUERY.format(until=' AND Date <= %s' if end else ''), params)
+    return cursor.fetchall()
+
+
+def summarize(rows, start, window):
+    result = {
+        'summary': {'Sessions': 0, 'BestE1RM': None, 'BestE1RMDate': None,
+                    'TopWeight': None, 'TotalVolume': None},
+        'sessions': [],
+        'weeks': [],
+    }
+    if not rows:
+        return result
+
+    days = np.array([row['Date'].toordinal() for row in rows])
+    weight = _column(rows, 'WeightUsed')
+    reps = _column(rows, 'repsInSet')
+    sets = _column(rows, 'setCount')
+
+    # per row, then per training day
+    starts = run_starts(days)
+    session_days = days[starts]
+    top_weight = max_at(weight, starts)
+    best_epley = max_at(epley(weight, reps), starts)
+    best_brzycki = max_at(brzycki(weight, reps), starts)
+    volume = sum_at(sets * reps * weight, starts)
+    best_so_far = np.fmax.accumulate(best_epley)
+    rolling = rolling_max(session_days, best_epley, window)
+
+    shown = session_days >= start.toordinal() if start else np.ones(len(session_days), dtype=bool)
+    if not shown.any():
+        return result
+    session_days, top_weight, best_epley, best_brzycki, volume, best_so_far, rolling = (
+        values[shown] for values in
+        (session_days, top_weight, best_epley, best_brzycki, volume, best_so_far, rolling))
+    dates = [datetime.date.fromordinal(day) for day in session_days.tolist()]
+
+    columns = zip(dates, _as_list(top_weight, 2), _as_list(volume), _as_list(best_epley),
+                  _as_list(best_brzycki), _as_list(best_so_far), _as_list(rolling))
+    result['sessions'] = [{
+        'Date': date,
+        'TopWeight': top,
+        'Volume': load,
+        'E1RMEpley': estimate,
+        'E1RMBrzycki': other,
+        'BestE1RM': best,
+        'RollingMaxE1RM': recent,
+    } for date, top, load, estimate, other, best, recent in columns]
+
+    # per week, from the days shown
+    weeks = week_starts(session_days)
+    starts = run_starts(weeks)
+    columns = zip(weeks[starts].tolist(), np.diff(np.append(starts, len(weeks))).tolist(),
+                  _as_list(max_at(top_weight, starts), 2), _as_list(sum_at(volume, starts)),
+                  _as_list(max_at(best_epley, starts)), _as_list(max_at(best_brzycki, starts)))
+    result['weeks'] = [{
+        'WeekStart': datetime.date.fromordinal(week),
+        'Sessions': count,
+        'TopWeight': top,
+        'Volume': load,
+        'E1RMEpley': estimate,
+        'E1RMBrzycki': other,
+    } for week, count, top, load, estimate, other in columns]
+
+    best = None if np.isnan(best_epley).all() else int(np.nanargmax(best_epley))
+    result['summary'] = {
+        'Sessions': len(dates),
+        'BestE1RM': result['sessions'][best]['E1RMEpley'] if best is not None else None,
+        'BestE1RMDate': dates[best] if best is not None else None,
+        'TopWeight': None if np.isnan(top_weight).all() else round(float(np.nanmax(top_weight)), 2),
+        'TotalVolume': None if np.isnan(volume).all() else round(float(np.nansum(volume)), 1),
+    }
+    return result
+
+
+# user_id is an int; start / end are dates or None (the extent of
+# the data)
+def progression(user_id, exercise, start, end, window):
+    result = summarize(read_rows(user_id, exercise, end), start, window)
+    sessions = result['sessions']
+    return dict({
+        'UserID': user_id,
+        'ExerciseType': exercise,
+        'from': start or (sessions[0]['Date'] if sessions else None),
+        'to': end or (sessions[-1]['Date'] if sessions else None),
+        'window': window,
+    }, **result)
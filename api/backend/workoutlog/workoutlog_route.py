@@ -5,46 +5,51 @@ from flask import jsonify
 from flask import make_response
 from flask import current_app
 from backend.db_connection import db
+from backend.utils.cache import cached
+from backend.utils.conditional import conditional
+from backend.utils import batch
+from backend.utils import dates
+from backend.utils import downsample
+from backend.utils import multiget
+from backend.utils import pagination
+from backend.utils import write_hooks
+from backend.workoutlog import personal_records
+from backend.workoutlog import progression
 
 
 workoutlog_route = Blueprint('workoutlog_route', __name__)
 
+WORKOUT_COLUMNS = '''LogID, UserID, Date, ExerciseType, Duration,
+    CaloriesBurned, TrainerNotes, setCount, repsInSet, WeightUsed'''
+
+# fields accepted by POST /workoutlog/batch
+WORKOUT_FIELDS = [
+    batch.Field('LogID', batch.to_int, True),
+    batch.Field('UserID', batch.to_int, True),
+    batch.Field('Date', batch.to_date, True),
+    batch.Field('ExerciseType', batch.to_text, False),
+    batch.Field('Duration', batch.to_int, False),
+    batch.Field('CaloriesBurned', batch.to_int, False),
+    batch.Field('TrainerNotes', batch.to_text, False),
+    batch.Field('setCount', batch.to_int, False),
+    batch.Field('repsInSet', batch.to_int, False),
+    batch.Field('WeightUsed', batch.to_decimal, False),
+]
+
 #------------------------------------------------------------
 # Get all workouts (optionally filter by user_id)
 @workoutlog_route.route('/', methods=['GET'])
+@conditional('WorkoutLog')
+@cached('WorkoutLog')
 def get_workouts():
     current_app.logger.info('GET /workoutlog route')
-    user_id = request.args.get('user_id')
-
-    cursor = db.get_db().cursor()
-
-    if user_id:
-        query = '''
-            SELECT LogID, UserID, Date, ExerciseType, Duration, 
-                   CaloriesBurned, TrainerNotes, setCount, repsInSet, WeightUsed
-            FROM WorkoutLog
-            WHERE UserID = %s
-            ORDER BY Date DESC
-        '''
-        cursor.execute(query, (user_id,))
-    else:
-        query = '''
-            SELECT LogID, UserID, Date, ExerciseType, Duration, 
-                   CaloriesBurned, TrainerNotes, setCount, repsInSet, WeightUsed
-            FROM WorkoutLog
-            ORDER BY Date DESC
-        '''
-        cursor.execute(query)
-
-    theData = cursor.fetchall()
-
-    the_response = make_response(jsonify(theData))
-    the_response.status_code = 200
-    return the_response
+    return pagination.list_response('WorkoutLog', WORKOUT_COLUMNS)
 
 #------------------------------------------------------------
 # Get details for a single workout by log ID
 @workoutlog_route.route('/<logID>', methods=['GET'])
+@conditional('WorkoutLog')
+@cached('WorkoutLog')
 def get_workout(logID):
     current_app.logger.info(f'GET /workoutlog/{logID} route')
 
@@ -64,18 +69,60 @@ def get_workout(logID):
     return the_response
 
 #------------------------------------------------------------
-# gets the PR or max weight for each exercise
+# Get several workouts by (UserID, LogID) in one request, in the
+# order asked for (see utils/multiget.py)
+@workoutlog_route.route('/lookup', methods=['GET'])
+@conditional('WorkoutLog')
+@cached('WorkoutLog')
+def lookup_workouts():
+    current_app.logger.info('GET /workoutlog/lookup route')
+
+    try:
+        keys = multiget.keys_from_args(request.args)
+    except multiget.BadLookup as e:
+        return multiget.error_response(e)
+
+    return multiget.lookup_response('WorkoutLog', WORKOUT_COLUMNS, keys)
+
+#------------------------------------------------------------
+# Same as above with the keys in the body, for long lists
+@workoutlog_route.route('/lookup', methods=['POST'])
+def lookup_workouts_post():
+    current_app.logger.info('POST /workoutlog/lookup route')
+
+    try:
+        keys = multiget.keys_from_body()
+    except multiget.BadLookup as e:
+        return multiget.error_response(e)
+
+    return multiget.lookup_response('WorkoutLog', WORKOUT_COLUMNS, keys)
+
+#------------------------------------------------------------
+# gets the PR or max weight for each exercise, for one user with
+# ?user_id= or across all users. Reads the PersonalRecord table
+# that the write routes keep up to date.
 @workoutlog_route.route('/pr', methods=['GET'])
+@conditional('PersonalRecord')
+@cached('PersonalRecord')
 def get_pr():
     current_app.logger.info('GET /workoutlog/pr route')
+    user_id = request.args.get('user_id')
 
     cursor = db.get_db().cursor()
-    query = '''
-        SELECT ExerciseType, MAX(WeightUsed) AS PR
-        FROM WorkoutLog
-        GROUP BY ExerciseType
-    '''
-    cursor.execute(query)
+    if user_id:
+        query = '''
+            SELECT ExerciseType, MaxWeight AS PR
+            FROM PersonalRecord
+            WHERE UserID = %s
+        '''
+        cursor.execute(query, (user_id,))
+    else:
+        query = '''
+            SELECT ExerciseType, MAX(MaxWeight) AS PR
+            FROM PersonalRecord
+            GROUP BY ExerciseType
+        '''
+        cursor.execute(query)
     data = cursor.fetchall()
 
     response = make_response(jsonify(data))
@@ -109,12 +156,34 @@ def add_workout():
         data["repsInSet"],       
         data["WeightUsed"]       
     ))
+    personal_records.raise_record(cursor, data["UserID"], data["ExerciseType"], data["WeightUsed"])
+    write_hooks.after_log_write('WorkoutLog', [(data["UserID"], data["Date"])])
 
     db.get_db().commit()
 
     response = make_response(jsonify({"message": "Workout added"}))
     response.status_code = 201
     return response
+
+#------------------------------------------------------------
+# Add many workout logs at once (JSON array or NDJSON body)
+@workoutlog_route.route('/batch', methods=['POST'])
+def add_workouts_batch():
+    current_app.logger.info('POST /workoutlog/batch route')
+
+    try:
+        rows = batch.read_rows()
+    except batch.BatchError as e:
+        return batch.error_response(e)
+
+    valid, errors = batch.validate_rows(rows, WORKOUT_FIELDS)
+    inserted, failed = batch.insert_rows('WorkoutLog', WORKOUT_FIELDS, valid)
+    inserted_rows = batch.as_dicts(WORKOUT_FIELDS, inserted)
+    personal_records.raise_records(db.get_db().cursor(), inserted_rows)
+    write_hooks.after_log_write('WorkoutLog', [(row['UserID'], row['Date']) for row in inserted_rows])
+    db.get_db().commit()
+
+    return batch.batch_response(len(rows), inserted, errors + failed)
 #------------------------------------------------------------
 # updates a existing log
 @workoutlog_route.route('/<logID>', methods=['PUT'])
@@ -123,10 +192,11 @@ def update_workout_log(logID):
 
     data = request.get_json()
     cursor = db.get_db().cursor()
+    old_rows = personal_records.rows_for_log(cursor, data["LogID"])
 
     query = '''
         UPDATE WorkoutLog
-        SET ExerciseType = %s, Duration = %s, CaloriesBurned = %s,
+        SET Date = %s, ExerciseType = %s, Duration = %s, CaloriesBurned = %s,
             TrainerNotes = %s, setCount = %s, repsInSet = %s, WeightUsed = %s
         WHERE LogID = %s
     '''
@@ -142,6 +212,11 @@ def update_workout_log(logID):
         data["LogID"],
     )
     cursor.execute(query, values)
+    personal_records.after_change(cursor, old_rows)
+    for row in old_rows:
+        personal_records.raise_record(cursor, row["UserID"], data["ExerciseType"], data["WeightUsed"])
+    write_hooks.after_log_write('WorkoutLog', [(row["UserID"], row["Date"]) for row in old_rows]
+                                + [(row["UserID"], data["Date"]) for row in old_rows])
     db.get_db().commit()
 
     the_response = make_response(jsonify({'message': 'Workout log updated'}))
@@ -155,8 +230,11 @@ def delete_workout_log(logID):
     current_app.logger.info(f'DELETE /workoutlog/{logID} route')
 
     cursor = db.get_db().cursor()
+    old_rows = personal_records.rows_for_log(cursor, logID)
     query = 'DELETE FROM WorkoutLog WHERE LogID = %s'
     cursor.execute(query, (logID,))
+    personal_records.after_change(cursor, old_rows)
+    write_hooks.after_log_write('WorkoutLog', [(row["UserID"], row["Date"]) for row in old_rows])
     db.get_db().commit()
 
     the_response = make_response(jsonify({'message': 'Workout log deleted'}))
@@ -164,30 +242,46 @@ def delete_workout_log(logID):
     return the_response
 
 #------------------------------------------------------------
-# gets data for progression in terms of strength
+# Strength progression of one user's ?exercise=: per training day
+# the heaviest weight, volume load and estimated 1RM (Epley and
+# Brzycki) with its best so far and rolling ?window= day maximum,
+# plus weekly bests; optionally limited to ?from= / ?to= (see
+# progression.py). ?max_points= downsamples the days for charts
+# along the ?y= series, E1RMEpley by default (see downsample.py).
 @workoutlog_route.route('/progression', methods=['GET'])
+@conditional('WorkoutLog')
+@cached('WorkoutLog')
 def get_progression_data():
     current_app.logger.info('GET /workoutlog/progression route')
 
+    user_id = request.args.get('user_id')
     exercise = request.args.get('exercise')
 
-    if not exercise:
-        the_response = make_response(jsonify({'error': 'Missing exercise parameter'}))
+    if not user_id or not exercise:
+        the_response = make_response(jsonify({'error': 'Missing user_id or exercise parameter'}))
         the_response.status_code = 400
         return the_response
 
-    cursor = db.get_db().cursor()
-    query = '''
-        SELECT Date, WeightUsed
-        FROM WorkoutLog
-        WHERE ExerciseType = %s
-        ORDER BY Date ASC
-    '''
-    cursor.execute(query, (exercise,))
-    theData = cursor.fetchall()
+    try:
+        user_id = progression.parse_user_id(request.args)
+        start, end = dates.parse_range(request.args)
+        window = progression.parse_window(request.args)
+        sampling = downsample.parse_request(request.args, progression.SERIES, default='E1RMEpley')
+    except (dates.BadDateRange, progression.ProgressionError, downsample.BadDownsample) as e:
+        the_response = make_response(jsonify({'error': str(e)}))
+        the_response.status_code = 400
+        return the_response
 
-    the_response = make_response(jsonify(theData))
+    result = progression.progression(user_id, exercise, start, end, window)
+
+    total = len(result['sessions'])
+    if sampling is not None:
+        result['sessions'] = downsample.downsample(result['sessions'], 'Date', sampling)
+
+    the_response = make_response(jsonify(result))
     the_response.status_code = 200
+    if sampling is not None:
+        the_response.headers['X-Total-Points'] = str(total)
     return the_response
 
 #------------------------------------------------------------
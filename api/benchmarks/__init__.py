@@ -0,0 +1,7 @@
+#------------------------------------------------------------
+# Load tests for the API (see README.md, "Benchmarks").
+#
+#   python -m benchmarks.generate   fill a database with synthetic users and logs
+#   python -m benchmarks.run        replay a request mix and report latencies
+#   python -m benchmarks.compare    compare two stored reports
+#------------------------------------------------------------
@@ -0,0 +1,27 @@
+#------------------------------------------------------------
+# Compares two stored reports endpoint by endpoint:
+#
+#   python -m benchmarks.compare benchmarks/results/A.json benchmarks/results/B.json
+#
+# Changes are relative to the first (baseline) report; for the
+# latencies lower is better, for req/s higher is better.
+#------------------------------------------------------------
+import argparse
+
+from benchmarks import report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compare two benchmark reports.')
+    parser.add_argument('baseline')
+    parser.add_argument('candidate')
+    args = parser.parse_args(argv)
+
+    base, new = report.load(args.baseline), report.load(args.candidate)
+    print(f"baseline  {args.baseline} (commit {base.get('commit')}, {base['settings']})")
+    print(f"candidate {args.candidate} (commit {new.get('commit')}, {new['settings']})")
+    print(report.format_comparison(base, new))
+
+
+if __name__ == '__main__':
+    main()
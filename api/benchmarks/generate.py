@@ -0,0 +1,238 @@
+#------------------------------------------------------------
+# Synthetic data generator.
+#
+# Creates --users users (UserIDs from --first-user-id up) and,
+# for each of them, --years of daily logs ending today. A user
+# logs on a given day with probability --active, so the default
+# of 0.5 gives about 180 days of logs a year per table (about
+# three food entries per active day).
+#
+#   python -m benchmarks.generate --users 10000 --years 2
+#   python -m benchmarks.generate --users 1000000 --years 1 --active 0.2
+#   python -m benchmarks.generate --users 10000 --csv /tmp/healthhub-data
+#
+# Rows go straight into the MySQL database from api/.env, or,
+# with --csv, into one CSV file per table that can be loaded
+# with LOAD DATA INFILE or read by any other stand-in. Use the
+# same --seed to get the same data again.
+#
+# The generator does not fill the derived tables. Afterwards run
+#   flask --app backend_app rollup-rebuild
+#   flask --app backend_app pr-rebuild
+#------------------------------------------------------------
+import argparse
+import csv
+import datetime
+import os
+import random
+import sys
+import time
+
+import pymysql
+from dotenv import load_dotenv
+
+CHUNK_ROWS = 2000
+
+EXERCISES = {
+    # exercise: (typical weight, minutes)
+    'Bench Press': (70, 45), 'Squats': (90, 50), 'Deadlift': (110, 45),
+    'Leg Press': (140, 40), 'Barbell Curl': (30, 30), 'Chest Press': (60, 40),
+    'Shoulder Press': (40, 35), 'Push-ups': (None, 20), 'Plank': (None, 10),
+    'Running': (None, 40), 'Cycling': (None, 60), 'Jumping Jacks': (None, 15),
+}
+NOTES = ['Form looks good', 'Increase weight next time', 'Slow down the reps',
+         'Hold longer next time', 'Great pace, keep it up', 'Focus on breathing',
+         'Keep your core tight throughout the movement', None]
+MEALS = ['Breakfast', 'Lunch', 'Dinner', 'Snack']
+MOODS = ['Happy', 'Excited', 'Motivated', 'Content', 'Energetic', 'Calm', 'Tired',
+         'Stressed', 'Anxious', 'Sad']
+GOALS = ['Lose weight', 'Build muscle', 'Improve endurance', 'Stay healthy']
+
+COLUMNS = {
+    'User': ['UserID', 'TrainerID', 'Name', 'Email', 'Age', 'Gender', 'Height', 'Weight',
+             'Goals', 'Goal_Weight', 'DOB'],
+    'WorkoutLog': ['UserID', 'LogID', 'Date', 'ExerciseType', 'Duration', 'CaloriesBurned',
+                   'TrainerNotes', 'setCount', 'repsInSet', 'WeightUsed'],
+    'FoodLog': ['UserID', 'LogID', 'Date', 'MealType', 'FoodID', 'Calories', 'Protein',
+                'Carbs', 'Fats'],
+    'SleepLog': ['UserID', 'LogID', 'Date', 'SleepDuration', 'SleepQuality'],
+    'MoodLog': ['UserID', 'LogID', 'Date', 'Mood'],
+    'HeartRateLog': ['UserID', 'LogID', 'Date', 'AvgHeartRate'],
+}
+
+
+#------------------------------------------------------------
+# row generation
+def user_row(rng, user_id, today):
+    age = rng.randint(16, 75)
+    weight = round(rng.uniform(50, 110), 2)
+    return (user_id, None, f'Bench User {user_id}', f'bench{user_id}@example.com', age,
+            rng.choice(['Male', 'Female', 'Other']), round(rng.uniform(150, 200), 2),
+            weight, rng.choice(GOALS), round(weight * rng.uniform(0.85, 1.1), 2),
+            today - datetime.timedelta(days=age * 365 + rng.randint(0, 364)))
+
+
+def log_rows(rng, user_id, days, food_ids):
+    counters = dict.fromkeys(['WorkoutLog', 'FoodLog', 'SleepLog', 'MoodLog', 'HeartRateLog'], 0)
+    rows = {table: [] for table in counters}
+
+    def next_id(table):
+        counters[table] += 1
+        return counters[table]
+
+    strength = rng.uniform(0.7, 1.4)
+    resting_hr = rng.randint(55, 80)
+    for index, day in enumerate(days):
+        # slow progress over the years
+        progress = 1 + 0.3 * index / max(len(days), 1)
+
+        exercise = rng.choice(list(EXERCISES))
+        base_weight, minutes = EXERCISES[exercise]
+        weight = None
+        if base_weight:
+            weight = round(min(base_weight * strength * progress * rng.uniform(0.9, 1.1), 999), 2)
+        duration = max(5, int(rng.gauss(minutes, 8)))
+        rows['WorkoutLog'].append((
+            user_id, next_id('WorkoutLog'), day, exercise, duration, duration * rng.randint(6, 12),
+            rng.choice(NOTES), rng.randint(3, 5) if weight else None,
+            rng.randint(6, 15) if weight else None, weight))
+
+        for meal in rng.sample(MEALS, rng.randint(2, 4)):
+            calories = rng.randint(80, 900)
+            rows['FoodLog'].append((
+                user_id, next_id('FoodLog'), day, meal,
+                rng.choice(food_ids) if food_ids else None, calories,
+                round(calories * rng.uniform(0.02, 0.08), 2),
+                round(calories * rng.uniform(0.05, 0.15), 2),
+                round(calories * rng.uniform(0.01, 0.05), 2)))
+
+        rows['SleepLog'].append((user_id, next_id('SleepLog'), day,
+                                 round(min(max(rng.gauss(7.2, 1.1), 3), 12), 2),
+                                 rng.randint(1, 10)))
+        rows['MoodLog'].append((user_id, next_id('MoodLog'), day, rng.choice(MOODS)))
+        rows['HeartRateLog'].append((user_id, next_id('HeartRateLog'), day,
+                                     resting_hr + rng.randint(-5, 25)))
+    return rows
+
+
+#------------------------------------------------------------
+# sinks
+class MySQLSink:
+
+    def __init__(self):
+        load_dotenv()
+        self.conn = pymysql.connect(
+            host=os.getenv('DB_HOST', 'localhost').strip(),
+            port=int(os.getenv('DB_PORT', '3306').strip()),
+            user=os.getenv('DB_USER', 'root').strip(),
+            password=os.getenv('MYSQL_ROOT_PASSWORD', '').strip(),
+            db=os.getenv('DB_NAME', 'HealthHub').strip(),
+            autocommit=False)
+        self.cursor = self.conn.cursor()
+        # bulk load: the generated rows are consistent by construction
+        self.cursor.execute('SET SESSION foreign_key_checks = 0')
+        self.cursor.execute('SET SESSION unique_checks = 0')
+
+    def food_ids(self):
+        self.cursor.execute('SELECT FoodID FROM Food')
+        return [row[0] for row in self.cursor.fetchall()]
+
+    def write(self, table, rows):
+        columns = COLUMNS[table]
+        query = (f'INSERT INTO {table} ({", ".join(columns)}) '
+                 f'VALUES ({", ".join(["%s"] * len(columns))})')
+        for start in range(0, len(rows), CHUNK_ROWS):
+            self.cursor.executemany(query, rows[start:start + CHUNK_ROWS])
+
+    def flush(self):
+        self.conn.commit()
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+
+class CSVSink:
+
+    def __init__(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        self._files = {}
+        self._writers = {}
+        for table, columns in COLUMNS.items():
+            handle = open(os.path.join(directory, f'{table}.csv'), 'w', newline='')
+            self._files[table] = handle
+            self._writers[table] = csv.writer(handle)
+            self._writers[table].writerow(columns)
+
+    def food_ids(self):
+        return list(range(1, 21))
+
+    def write(self, table, rows):
+        # \N is how LOAD DATA INFILE spells NULL
+        self._writers[table].writerows(
+            [['\\N' if value is None else value for value in row] for row in rows])
+
+    def flush(self):
+        pass
+
+    def close(self):
+        for handle in self._files.values():
+            handle.close()
+
+
+#------------------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Fill a database with synthetic HealthHub data.')
+    parser.add_argument('--users', type=int, default=10000)
+    parser.add_argument('--years', type=float, default=1.0)
+    parser.add_argument('--active', type=float, default=0.5,
+                        help='chance that a user logs on a given day')
+    parser.add_argument('--first-user-id', type=int, default=100000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--csv', metavar='DIR', help='write CSV files instead of MySQL rows')
+    parser.add_argument('--batch-users', type=int, default=200,
+                        help='users generated per commit')
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    sink = CSVSink(args.csv) if args.csv else MySQLSink()
+    food_ids = sink.food_ids()
+
+    today = datetime.date.today()
+    all_days = [today - datetime.timedelta(days=offset)
+                for offset in range(int(args.years * 365) - 1, -1, -1)]
+
+    estimate = int(args.users * len(all_days) * args.active * 7)
+    print(f'generating {args.users} users over {len(all_days)} days, '
+          f'about {estimate:,} log rows', file=sys.stderr)
+
+    started = time.monotonic()
+    written = 0
+    last_user = args.first_user_id + args.users
+    for batch_start in range(args.first_user_id, last_user, args.batch_users):
+        batch = {table: [] for table in COLUMNS}
+        for user_id in range(batch_start, min(batch_start + args.batch_users, last_user)):
+            batch['User'].append(user_row(rng, user_id, today))
+            days = [day for day in all_days if rng.random() < args.active]
+            for table, rows in log_rows(rng, user_id, days, food_ids).items():
+                batch[table].extend(rows)
+
+        for table, rows in batch.items():
+            sink.write(table, rows)
+            written += len(rows)
+        sink.flush()
+
+        done = min(batch_start + args.batch_users, last_user) - args.first_user_id
+        elapsed = time.monotonic() - started
+        print(f'\r{done}/{args.users} users, {written:,} rows, '
+              f'{written / max(elapsed, 1e-9):,.0f} rows/s', end='', file=sys.stderr)
+
+    sink.close()
+    print(f'\ndone in {time.monotonic() - started:.1f}s', file=sys.stderr)
+    if not args.csv:
+        print('now run `flask --app backend_app rollup-rebuild` and '
+              '`flask --app backend_app pr-rebuild`', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
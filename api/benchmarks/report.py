@@ -0,0 +1,111 @@
+#------------------------------------------------------------
+# Latency / throughput reports for benchmarks.run.
+#
+# A report is plain JSON saved under benchmarks/results/ (one
+# file per run), so runs from different commits can be kept and
+# compared with benchmarks.compare.
+#------------------------------------------------------------
+import datetime
+import json
+import os
+import subprocess
+
+import numpy as np
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+
+
+def _summary(latencies, errors, bytes_read, seconds):
+    summary = {'count': len(latencies), 'errors': errors,
+               'throughput_rps': round(len(latencies) / seconds, 2) if seconds else None}
+    if latencies:
+        ms = np.asarray(latencies) * 1000
+        p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+        summary.update({
+            'p50_ms': round(float(p50), 2),
+            'p95_ms': round(float(p95), 2),
+            'p99_ms': round(float(p99), 2),
+            'mean_ms': round(float(ms.mean()), 2),
+            'max_ms': round(float(ms.max()), 2),
+            'avg_bytes': int(bytes_read / len(latencies)),
+        })
+    return summary
+
+
+# samples: {label: {'latencies': [...], 'errors': n, 'bytes': n}}
+def build(samples, seconds, settings):
+    endpoints = {label: _summary(sample['latencies'], sample['errors'], sample['bytes'], seconds)
+                 for label, sample in sorted(samples.items())}
+    everything = [latency for sample in samples.values() for latency in sample['latencies']]
+    return {
+        'created_at': datetime.datetime.now().isoformat(timespec='seconds'),
+        'commit': _git_commit(),
+        'settings': settings,
+        'seconds': round(seconds, 2),
+        'total': _summary(everything, sum(sample['errors'] for sample in samples.values()),
+                          sum(sample['bytes'] for sample in samples.values()), seconds),
+        'endpoints': endpoints,
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def save(report, directory=RESULTS_DIR, name=None):
+    os.makedirs(directory, exist_ok=True)
+    stamp = datetime.datetime.now().strftime('%Y%m%d-%H%M%S')
+    name = name or report['settings'].get('scenario', 'run')
+    path = os.path.join(directory, f'{stamp}-{name}.json')
+    with open(path, 'w') as handle:
+        json.dump(report, handle, indent=2)
+    return path
+
+
+def load(path):
+    with open(path) as handle:
+        return json.load(handle)
+
+
+#------------------------------------------------------------
+# plain-text tables
+def _row(label, summary):
+    return (f"{label:<44} {summary['count']:>7} {summary['errors']:>6} "
+            f"{summary.get('throughput_rps') or 0:>8.1f} {summary.get('p50_ms', 0):>9.1f} "
+            f"{summary.get('p95_ms', 0):>9.1f} {summary.get('p99_ms', 0):>9.1f}")
+
+
+def format_report(report):
+    lines = [f"{'endpoint':<44} {'count':>7} {'errors':>6} {'req/s':>8} {'p50 ms':>9} "
+             f"{'p95 ms':>9} {'p99 ms':>9}"]
+    for label, summary in report['endpoints'].items():
+        lines.append(_row(label, summary))
+    lines.append(_row('total', report['total']))
+    return '\n'.join(lines)
+
+
+def _change(old, new):
+    if old is None or new is None:
+        return '     -'
+    if old == 0:
+        return '     -' if new == 0 else '  +inf'
+    return f'{(new - old) / old * 100:+6.1f}%'
+
+
+def format_comparison(base, new):
+    lines = [f"{'endpoint':<44} {'p50 ms':>17} {'p95 ms':>17} {'p99 ms':>17} {'req/s':>17}"]
+    labels = sorted(set(base['endpoints']) | set(new['endpoints'])) + ['total']
+    for label in labels:
+        old_summary = base['total'] if label == 'total' else base['endpoints'].get(label, {})
+        new_summary = new['total'] if label == 'total' else new['endpoints'].get(label, {})
+        cells = []
+        for key in ('p50_ms', 'p95_ms', 'p99_ms', 'throughput_rps'):
+            old, current = old_summary.get(key), new_summary.get(key)
+            shown = f'{current:.1f}' if current is not None else '-'
+            cells.append(f'{shown:>9} {_change(old, current)}')
+        lines.append(f'{label:<44} ' + ' '.join(cells))
+    return '\n'.join(lines)
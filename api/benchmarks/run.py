@@ -0,0 +1,138 @@
+#------------------------------------------------------------
+# Load runner.
+#
+#   python -m benchmarks.run --scenario mixed --concurrency 16 --duration 60
+#
+# Starts --concurrency virtual users. Each one is a thread with
+# its own keep-alive HTTP connection, sending requests back to
+# back (closed loop) from the scenario's mix. Requests made
+# during the first --warmup seconds are not counted. The report
+# (p50/p95/p99 latency and throughput per endpoint) is printed
+# and saved under benchmarks/results/.
+#
+# Like the Streamlit app's requests session, it sends
+# Accept-Encoding: gzip, deflate unless --no-compression is given.
+#------------------------------------------------------------
+import argparse
+import http.client
+import json
+import random
+import threading
+import time
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+from benchmarks import report
+from benchmarks import scenarios
+
+
+def _new_sample():
+    return {'latencies': [], 'errors': 0, 'bytes': 0}
+
+
+class VirtualUser(threading.Thread):
+
+    def __init__(self, base_url, steps, context, seed, started, warmup_until, stop_at,
+                 compression):
+        super().__init__(daemon=True)
+        url = urlsplit(base_url)
+        self.connection_class = (http.client.HTTPSConnection if url.scheme == 'https'
+                                 else http.client.HTTPConnection)
+        self.netloc = url.netloc
+        self.steps = steps
+        self.context = context
+        self.rng = random.Random(seed)
+        self.started = started
+        self.warmup_until = warmup_until
+        self.stop_at = stop_at
+        self.headers = {'Accept': 'application/json', 'Content-Type': 'application/json'}
+        if compression:
+            self.headers['Accept-Encoding'] = 'gzip, deflate'
+        self.samples = defaultdict(_new_sample)
+
+    def _connect(self):
+        return self.connection_class(self.netloc, timeout=60)
+
+    def run(self):
+        self.started.wait()
+        connection = self._connect()
+        while time.monotonic() < self.stop_at:
+            step = scenarios.pick(self.rng, self.steps)
+            path = step.path(self.rng, self.context)
+            body = json.dumps(step.body(self.rng, self.context)) if step.body else None
+
+            began = time.monotonic()
+            try:
+                connection.request(step.method, path, body=body, headers=self.headers)
+                response = connection.getresponse()
+                size = len(response.read())
+                # http.client does not follow redirects, so a 3xx
+                # (e.g. a list URL without its trailing slash) would
+                # time the redirect instead of the endpoint
+                failed = not 200 <= response.status < 300
+            except (OSError, http.client.HTTPException):
+                connection.close()
+                connection = self._connect()
+                size, failed = 0, True
+            finished = time.monotonic()
+
+            if began < self.warmup_until or finished > self.stop_at:
+                continue
+            sample = self.samples[step.label]
+            if failed:
+                sample['errors'] += 1
+            else:
+                sample['latencies'].append(finished - began)
+                sample['bytes'] += size
+        connection.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Replay a request mix against the API.')
+    parser.add_argument('--base-url', default='http://localhost:4000')
+    parser.add_argument('--scenario', default='mixed', choices=sorted(scenarios.SCENARIOS))
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=30, help='measured seconds')
+    parser.add_argument('--warmup', type=float, default=5, help='unmeasured seconds first')
+    parser.add_argument('--first-user-id', type=int, default=100000)
+    parser.add_argument('--users', type=int, default=10000)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--no-compression', action='store_true')
+    parser.add_argument('--out', default=report.RESULTS_DIR, help='directory for the report')
+    parser.add_argument('--name', help='report file name suffix (default: the scenario)')
+    args = parser.parse_args(argv)
+
+    context = scenarios.Context(args.first_user_id, args.users)
+    steps = scenarios.SCENARIOS[args.scenario]
+
+    started = threading.Event()
+    begin = time.monotonic()
+    warmup_until = begin + args.warmup
+    stop_at = warmup_until + args.duration
+    users = [VirtualUser(args.base_url, steps, context, args.seed + index, started,
+                         warmup_until, stop_at, not args.no_compression)
+             for index in range(args.concurrency)]
+    for user in users:
+        user.start()
+    print(f'{args.scenario}: {args.concurrency} users, {args.warmup:g}s warmup + '
+          f'{args.duration:g}s against {args.base_url}')
+    started.set()
+    for user in users:
+        user.join()
+
+    samples = defaultdict(_new_sample)
+    for user in users:
+        for label, sample in user.samples.items():
+            merged = samples[label]
+            merged['latencies'].extend(sample['latencies'])
+            merged['errors'] += sample['errors']
+            merged['bytes'] += sample['bytes']
+
+    settings = {key: value for key, value in vars(args).items() if key not in ('out', 'name')}
+    result = report.build(samples, args.duration, settings)
+    print(report.format_report(result))
+    print(f'saved {report.save(result, args.out, args.name)}')
+
+
+if __name__ == '__main__':
+    main()
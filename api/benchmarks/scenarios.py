@@ -0,0 +1,107 @@
+#------------------------------------------------------------
+# Request mixes for the load runner.
+#
+# Each scenario is a list of weighted steps, and every virtual
+# user repeatedly picks a step at random by weight. A step is
+# labelled with the route it exercises, so the report groups
+# latencies per endpoint. The mixes follow the Streamlit pages
+# (app/src/pages) that issue the requests, and the users are
+# drawn from the range made by generate.py.
+#------------------------------------------------------------
+import datetime
+import itertools
+from collections import namedtuple
+
+# path and body are functions of (rng, context)
+Step = namedtuple('Step', ['label', 'weight', 'method', 'path', 'body'])
+
+EXERCISES = ['Bench Press', 'Squats', 'Deadlift', 'Leg Press', 'Barbell Curl', 'Shoulder Press']
+
+# unique LogIDs for the rows the write steps create
+_log_ids = itertools.count(1_000_000_000)
+
+
+class Context:
+
+    def __init__(self, first_user_id, users):
+        self.first_user_id = first_user_id
+        self.users = users
+
+    def user(self, rng):
+        return rng.randrange(self.first_user_id, self.first_user_id + self.users)
+
+
+def _get(label, weight, path):
+    return Step(label, weight, 'GET', path, None)
+
+
+def _new_workout(rng, ctx):
+    weight = round(rng.uniform(20, 150), 2)
+    return {
+        'LogID': next(_log_ids), 'UserID': ctx.user(rng),
+        'Date': datetime.date.today().isoformat(), 'ExerciseType': rng.choice(EXERCISES),
+        'Duration': rng.randint(20, 70), 'CaloriesBurned': rng.randint(150, 700),
+        'TrainerNotes': 'benchmark', 'setCount': 4, 'repsInSet': 10, 'WeightUsed': weight,
+    }
+
+
+def _new_mood(rng, ctx):
+    return {'LogID': next(_log_ids), 'UserID': ctx.user(rng),
+            'Date': datetime.date.today().isoformat(), 'Mood': 'Motivated'}
+
+
+#------------------------------------------------------------
+# pages 01-03 and 15: a user's dashboards
+DASHBOARD = [
+    _get('GET /users/<id>/daily', 6, lambda rng, ctx: f'/users/{ctx.user(rng)}/daily'),
+    _get('GET /users/<id>/daily?from=', 2, lambda rng, ctx:
+         f'/users/{ctx.user(rng)}/daily?from='
+         f'{(datetime.date.today() - datetime.timedelta(days=90)).isoformat()}'),
+    _get('GET /workoutlog?user_id=', 3, lambda rng, ctx: f'/workoutlog/?user_id={ctx.user(rng)}'),
+    _get('GET /workoutlog/pr?user_id=', 1, lambda rng, ctx: f'/workoutlog/pr?user_id={ctx.user(rng)}'),
+]
+
+# pages 04-06, 08 and 19: logging and reviewing workouts
+WORKOUTS = [
+    _get('GET /workoutlog?user_id=', 5, lambda rng, ctx: f'/workoutlog/?user_id={ctx.user(rng)}'),
+    _get('GET /workoutlog/progression', 2, lambda rng, ctx:
+         f'/workoutlog/progression?user_id={ctx.user(rng)}'
+         f'&exercise={rng.choice(EXERCISES).replace(" ", "%20")}&max_points=400'),
+    _get('GET /workoutlog/prcalc', 1, lambda rng, ctx:
+         f'/workoutlog/prcalc?goal={rng.randint(60, 200)}&reps={rng.randint(1, 12)}'),
+    Step('POST /workoutlog', 1, 'POST', lambda rng, ctx: '/workoutlog/', _new_workout),
+]
+
+# pages 10-14: the admin screens
+ADMIN = [
+    _get('GET /admin/users', 2, lambda rng, ctx: '/admin/users'),
+    _get('GET /admin/food_list', 2, lambda rng, ctx: '/admin/food_list'),
+    _get('GET /admin/support_tix', 1, lambda rng, ctx: '/admin/support_tix'),
+    _get('GET /admin/employee_tix', 1, lambda rng, ctx: '/admin/employee_tix'),
+]
+
+# paging through and exporting the full tables
+LISTS = [
+    _get('GET /workoutlog', 3, lambda rng, ctx: '/workoutlog/'),
+    _get('GET /foodlog', 3, lambda rng, ctx: '/foodlog/'),
+    _get('GET /sleeplog', 1, lambda rng, ctx: '/sleeplog/'),
+    _get('GET /workoutlog?stream=ndjson&user_id=', 1, lambda rng, ctx:
+         f'/workoutlog/?stream=ndjson&user_id={ctx.user(rng)}'),
+]
+
+SCENARIOS = {
+    'dashboard': DASHBOARD,
+    'workouts': WORKOUTS,
+    'admin': ADMIN,
+    'lists': LISTS,
+    # roughly what the whole app sends: mostly users on their
+    # own pages, a few writes, the occasional admin
+    'mixed': [step._replace(weight=step.weight * 4) for step in DASHBOARD]
+             + [step._replace(weight=step.weight * 2) for step in WORKOUTS]
+             + ADMIN
+             + [Step('POST /moodlog', 1, 'POST', lambda rng, ctx: '/moodlog/', _new_mood)],
+}
+
+
+def pick(rng, steps):
+    return rng.choices(steps, weights=[step.weight for step in steps])[0]
@@ -0,0 +1,57 @@
+###
+# Production server settings (gunicorn --config gunicorn.conf.py backend_app:app)
+#
+# A master process forks one worker per CPU core, each running
+# GUNICORN_THREADS request threads. Every worker builds its own
+# app and its own database connection pool after the fork, so
+# DB_POOL_MAX_SIZE should be at least GUNICORN_THREADS.
+#
+#   kill -HUP <master>   graceful reload: new workers start, old
+#                        ones finish their requests and exit
+#   kill -TERM <master>  graceful shutdown, waiting up to
+#                        GUNICORN_GRACEFUL_TIMEOUT seconds
+###
+import os
+
+
+def _cpu_count():
+    # the cores this container may actually use, not the host's
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:4000')
+
+workers = int(os.getenv('GUNICORN_WORKERS', _cpu_count()))
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', '4'))
+
+# recycle each worker after this many requests (plus up to the
+# jitter, so they do not all restart at once) to cap memory growth
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', '1000'))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', '100'))
+
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '60'))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', '30'))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', '5'))
+
+# never preload: the connection pool must not be shared across forks
+preload_app = False
+
+accesslog = '-'
+errorlog = '-'
+loglevel = os.getenv('GUNICORN_LOG_LEVEL', 'info')
+
+
+def when_ready(server):
+    server.log.info(f'ready: {workers} workers x {threads} threads on {bind}')
+
+
+def worker_exit(server, worker):
+    # close the idle pooled connections instead of leaving them to
+    # time out on the MySQL side
+    from backend.db_connection import db
+    if db.pool is not None:
+        db.pool.close()
@@ -0,0 +1,46 @@
+import datetime
+import decimal
+
+from backend.utils import batch
+
+FIELDS = [
+    batch.Field('LogID', batch.to_int, True),
+    batch.Field('Date', batch.to_date, True),
+    batch.Field('WeightUsed', batch.to_decimal, False),
+    batch.Field('TrainerNotes', batch.to_text, False),
+]
+
+
+def test_valid_rows_are_converted_in_field_order():
+    rows = [{'TrainerNotes': 'ok', 'Date': '2024-01-02', 'LogID': '7', 'WeightUsed': 82.5}]
+    valid, errors = batch.validate_rows(rows, FIELDS)
+
+    assert errors == []
+    assert valid == [(0, (7, datetime.date(2024, 1, 2), decimal.Decimal('82.5'), 'ok'))]
+
+
+def test_optional_fields_may_be_missing_or_empty():
+    valid, errors = batch.validate_rows([{'LogID': 1, 'Date': '2024-01-01', 'WeightUsed': ''}], FIELDS)
+
+    assert errors == []
+    assert valid == [(0, (1, datetime.date(2024, 1, 1), None, None))]
+
+
+def test_bad_rows_are_reported_by_index():
+    rows = [
+        {'LogID': 1, 'Date': '2024-01-01'},
+        {'Date': '2024-01-01'},
+        {'LogID': 1.5, 'Date': 'yesterday'},
+        {'LogID': True, 'Date': '2024-01-01', 'WeightUsed': 'NaN'},
+        ['not', 'an', 'object'],
+        batch.BadRow('invalid JSON: ...'),
+    ]
+    valid, errors = batch.validate_rows(rows, FIELDS)
+
+    assert [index for index, _ in valid] == [0]
+    assert [error['index'] for error in errors] == [1, 2, 3, 4, 5]
+    assert errors[0]['error'] == 'LogID is required'
+    assert 'LogID' in errors[1]['error'] and 'Date' in errors[1]['error']
+    assert 'LogID' in errors[2]['error'] and 'WeightUsed' in errors[2]['error']
+    assert errors[3]['error'] == 'row must be a JSON object'
+    assert errors[4]['error'] == 'invalid JSON: ...'
@@ -0,0 +1,88 @@
+import datetime
+
+import numpy as np
+import pytest
+
+from backend.utils import downsample
+
+
+# the textbook LTTB loop, to check the vectorized version against
+def reference_lttb(x, y, max_points):
+    every = (len(x) - 2) / (max_points - 2)
+    kept, previous = [0], 0
+    for bucket in range(max_points - 2):
+        start = int(bucket * every) + 1
+        stop = int((bucket + 1) * every) + 1
+        next_stop = min(int((bucket + 2) * every) + 1, len(x))
+        if bucket == max_points - 3:
+            x_c, y_c = x[-1], y[-1]
+        else:
+            x_c, y_c = np.mean(x[stop:next_stop]), np.mean(y[stop:next_stop])
+        best, best_area = start, -1.0
+        for index in range(start, stop):
+            area = abs((x[previous] - x_c) * (y[index] - y[previous])
+                       - (x[previous] - x[index]) * (y_c - y[previous]))
+            if area > best_area:
+                best, best_area = index, area
+        kept.append(best)
+        previous = best
+    return kept + [len(x) - 1]
+
+
+@pytest.mark.parametrize('count, max_points', [(10, 3), (101, 10), (1000, 97), (5000, 400)])
+def test_lttb_matches_the_reference(count, max_points):
+    rng = np.random.default_rng(count)
+    x = np.cumsum(rng.uniform(0.5, 2.0, count))
+    y = np.sin(x / 20) + rng.normal(0, 0.2, count)
+
+    kept = downsample.lttb(x, y, max_points)
+
+    assert len(kept) == max_points
+    assert kept[0] == 0 and kept[-1] == count - 1
+    assert np.all(np.diff(kept) > 0)
+    assert kept.tolist() == reference_lttb(x, y, max_points)
+
+
+def test_lttb_keeps_short_series():
+    assert downsample.lttb(np.arange(5.0), np.arange(5.0), 10).tolist() == [0, 1, 2, 3, 4]
+
+
+def test_minmax_keeps_every_bucket_extreme():
+    rng = np.random.default_rng(1)
+    y = rng.normal(0, 1, 1000)
+
+    kept = downsample.minmax(y, 100)
+
+    assert len(kept) <= 100
+    assert np.all(np.diff(kept) > 0)
+    for bucket in np.array_split(np.arange(1000), 50):
+        assert bucket[np.argmin(y[bucket])] in kept
+        assert bucket[np.argmax(y[bucket])] in kept
+
+
+def test_downsample_rows():
+    start = datetime.date(2024, 1, 1)
+    rows = [{'Date': start + datetime.timedelta(days=day), 'Value': None if day % 10 == 0 else day % 7}
+            for day in range(500)][::-1]
+
+    kept = downsample.downsample(rows, 'Date', downsample.Sampling(50, 'lttb', 'Value'))
+
+    assert len(kept) == 50
+    assert all(row['Value'] is not None for row in kept)
+    assert [row['Date'] for row in kept] == sorted(row['Date'] for row in kept)
+    assert kept[0]['Date'] == start + datetime.timedelta(days=1)
+
+
+def test_parse_request():
+    assert downsample.parse_request({}, ['A']) is None
+    assert downsample.parse_request({'max_points': '10'}, ['A']) == (10, 'lttb', 'A')
+    assert downsample.parse_request({'max_points': '10', 'y': 'b', 'downsample': 'MinMax'},
+                                    ['A', 'B']) == (10, 'minmax', 'B')
+    assert downsample.parse_request({'max_points': '10'}, ['A', 'B'], default='B').column == 'B'
+
+    for args in ({'max_points': '2'}, {'max_points': 'x'}, {'max_points': '10', 'downsample': 'mean'},
+                 {'max_points': '10', 'y': 'C'}):
+        with pytest.raises(downsample.BadDownsample):
+            downsample.parse_request(args, ['A'])
+    with pytest.raises(downsample.BadDownsample):
+        downsample.parse_request({'max_points': '10'}, ['A', 'B'])
@@ -0,0 +1,34 @@
+import datetime
+
+import pytest
+
+from backend.users import mood_sleep
+
+EXTENT = {'first': datetime.date(2024, 1, 1), 'last': datetime.date(2025, 7, 9)}
+
+
+def test_window_ends_on_the_last_day_with_data():
+    assert mood_sleep.window(90, None, EXTENT) == (datetime.date(2025, 4, 11), datetime.date(2025, 7, 9))
+
+
+def test_window_ends_on_to_when_given():
+    assert mood_sleep.window(1, datetime.date(2025, 1, 31), EXTENT) == (datetime.date(2025, 1, 31),) * 2
+
+
+def test_window_without_data_is_empty():
+    assert mood_sleep.window(90, None, {'first': None, 'last': None}) == (None, None)
+
+
+@pytest.mark.parametrize('args, start', [
+    ({'days': 'x'}, None),
+    ({'days': '0'}, None),
+    ({'days': '90'}, datetime.date(2025, 1, 1)),
+])
+def test_bad_days_are_rejected(args, start):
+    with pytest.raises(mood_sleep.BadWindow):
+        mood_sleep.parse_days(args, start)
+
+
+def test_days_is_optional():
+    assert mood_sleep.parse_days({}, None) is None
+    assert mood_sleep.parse_days({'days': '90'}, None) == 90
@@ -0,0 +1,25 @@
+import pytest
+
+from backend.utils import multiget
+
+
+@pytest.mark.parametrize('value', [(1, 2), [1, 2], ['1', '2'], {'UserID': 1, 'LogID': 2}])
+def test_key_accepts_pairs_and_objects(value):
+    assert multiget._key(value) == (1, 2)
+
+
+@pytest.mark.parametrize('value', [
+    1, '1:2', (1,), (1, 2, 3), (1, 'x'), (1.0, 2), (True, 2), (None, 2), {'UserID': 1},
+])
+def test_key_rejects_anything_else(value):
+    with pytest.raises(multiget.BadLookup):
+        multiget._key(value)
+
+
+def test_keys_from_args():
+    assert multiget.keys_from_args({'keys': '1:10, 1:11,2:7,'}) == [(1, 10), (1, 11), (2, 7)]
+
+    with pytest.raises(multiget.BadLookup):
+        multiget.keys_from_args({})
+    with pytest.raises(multiget.BadLookup):
+        multiget.keys_from_args({'keys': ','.join(['1:1'] * (multiget.MAX_KEYS + 1))})
@@ -0,0 +1,42 @@
+import datetime
+
+import pytest
+
+from backend.utils import pagination
+
+
+def test_token_round_trip():
+    row = {'Date': datetime.date(2024, 2, 29), 'UserID': 12, 'LogID': 3456}
+    token = pagination.encode_token(row)
+
+    assert '=' not in token
+    assert pagination.decode_token(token) == (datetime.date(2024, 2, 29), 12, 3456)
+
+
+@pytest.mark.parametrize('token', ['', 'not a token', 'W10', 'WyJ4IiwxLDJd'])
+def test_bad_tokens_are_rejected(token):
+    # W10 is [], WyJ4IiwxLDJd is ["x",1,2]
+    with pytest.raises(pagination.BadPageRequest):
+        pagination.decode_token(token)
+
+
+def test_parse_page():
+    assert pagination.parse_page({}) is None
+    assert pagination.parse_page({}, always=True) == (pagination.DEFAULT_PAGE_SIZE, None)
+    assert pagination.parse_page({'limit': '5000'}).limit == pagination.MAX_PAGE_SIZE
+
+    token = pagination.encode_token({'Date': datetime.date(2024, 1, 1), 'UserID': 1, 'LogID': 2})
+    assert pagination.parse_page({'next': token}).after == (datetime.date(2024, 1, 1), 1, 2)
+
+    for limit in ('0', 'ten'):
+        with pytest.raises(pagination.BadPageRequest):
+            pagination.parse_page({'limit': limit})
+
+
+def test_list_query_continues_after_the_token():
+    page = pagination.Page(10, (datetime.date(2024, 1, 1), 1, 2))
+    query, params = pagination.list_query('LogID', 'WorkoutLog', ['UserID = %s'], [1], page)
+
+    assert pagination.AFTER_CLAUSE in query
+    assert query.endswith(f'{pagination.ORDER_BY} LIMIT %s')
+    assert params == [1, datetime.date(2024, 1, 1), datetime.date(2024, 1, 1), 1, 1, 2, 11]
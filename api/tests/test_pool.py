@@ -0,0 +1,157 @@
+import types
+
+import pymysql
+import pytest
+
+from backend.db_connection import pool
+
+
+class FakeConnection:
+
+    def __init__(self, number):
+        self.number = number
+        self.open = True
+        self.pings = 0
+        self.rollbacks = 0
+        self.ping_fails = False
+
+    def ping(self, reconnect=True):
+        self.pings += 1
+        if self.ping_fails:
+            raise pymysql.err.OperationalError(2006, 'MySQL server has gone away')
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def close(self):
+        self.open = False
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(pool, 'time', types.SimpleNamespace(monotonic=lambda: now[0]))
+    return now
+
+
+@pytest.fixture
+def opened():
+    return []
+
+
+def make_pool(opened, **kwargs):
+    def connect():
+        opened.append(FakeConnection(len(opened)))
+        return opened[-1]
+    return pool.ConnectionPool(connect, **kwargs)
+
+
+def test_bad_sizes_are_rejected():
+    with pytest.raises(ValueError):
+        pool.ConnectionPool(lambda: None, min_size=3, max_size=2)
+    with pytest.raises(ValueError):
+        pool.ConnectionPool(lambda: None, max_size=0)
+
+
+def test_first_acquire_warms_min_size(clock, opened):
+    connections = make_pool(opened, min_size=2, max_size=4)
+    conn = connections.acquire()
+
+    assert len(opened) == 2
+    assert conn in opened
+    assert connections.stats()['size'] == 2
+    assert connections.stats()['idle'] == 1
+    assert connections.stats()['in_use'] == 1
+
+
+def test_released_connection_is_reused_after_a_rollback(clock, opened):
+    connections = make_pool(opened, min_size=0, max_size=2)
+    conn = connections.acquire()
+    connections.release(conn)
+
+    assert conn.rollbacks == 1
+    assert connections.acquire() is conn
+    assert len(opened) == 1
+    assert connections.stats()['checkouts'] == 2
+
+
+def test_closed_connection_is_discarded_on_release(clock, opened):
+    connections = make_pool(opened, min_size=0, max_size=2)
+    conn = connections.acquire()
+    conn.open = False
+    connections.release(conn)
+
+    assert connections.stats()['size'] == 0
+    assert connections.acquire() is not conn
+
+
+def test_old_connection_is_recycled_on_checkout(clock, opened):
+    connections = make_pool(opened, min_size=0, max_size=2, recycle=60, ping_after=1000)
+    first = connections.acquire()
+    connections.release(first)
+    clock[0] += 60
+
+    second = connections.acquire()
+    assert second is not first
+    assert not first.open
+    assert connections.stats()['recycled'] == 1
+    assert connections.stats()['size'] == 1
+
+
+def test_ping_only_after_ping_after_seconds_idle(clock, opened):
+    connections = make_pool(opened, min_size=0, max_size=2, ping_after=10)
+    conn = connections.acquire()
+    connections.release(conn)
+    clock[0] += 5
+    assert connections.acquire() is conn
+    assert conn.pings == 0
+
+    connections.release(conn)
+    clock[0] += 10
+    assert connections.acquire() is conn
+    assert conn.pings == 1
+
+
+def test_failed_ping_opens_a_new_connection(clock, opened):
+    connections = make_pool(opened, min_size=0, max_size=2, ping_after=10)
+    conn = connections.acquire()
+    connections.release(conn)
+    conn.ping_fails = True
+    clock[0] += 10
+
+    assert connections.acquire() is not conn
+    assert not conn.open
+    assert connections.stats()['health_check_failures'] == 1
+
+
+def test_idle_connections_above_min_size_are_pruned(clock, opened):
+    connections = make_pool(opened, min_size=1, max_size=3, idle_timeout=300)
+    held = [connections.acquire() for _ in range(3)]
+    for conn in held:
+        connections.release(conn)
+    assert connections.stats()['idle'] == 3
+
+    clock[0] += 300
+    connections.release(connections.acquire())
+    assert connections.stats()['size'] == 1
+    assert sum(conn.open for conn in opened) == 1
+
+
+def test_exhausted_pool_times_out(clock, opened):
+    connections = make_pool(opened, min_size=0, max_size=1, timeout=0)
+    connections.acquire()
+
+    with pytest.raises(pool.PoolTimeout):
+        connections.acquire()
+    assert connections.stats()['timeouts'] == 1
+    assert connections.stats()['waits'] == 1
+
+
+def test_failed_connect_frees_its_slot(clock):
+    def connect():
+        raise pymysql.err.OperationalError(2003, "Can't connect")
+    connections = pool.ConnectionPool(connect, min_size=0, max_size=1)
+
+    with pytest.raises(pymysql.Error):
+        connections.acquire()
+    assert connections.stats()['size'] == 0
@@ -0,0 +1,90 @@
+import datetime
+import decimal
+
+import numpy as np
+import pytest
+
+from backend.workoutlog import progression
+
+MONDAY = datetime.date(2024, 1, 1)
+
+
+def entry(day, weight, reps, sets=3):
+    return {'Date': MONDAY + datetime.timedelta(days=day), 'setCount': sets,
+            'repsInSet': reps, 'WeightUsed': None if weight is None else decimal.Decimal(weight)}
+
+
+def test_rolling_max_uses_calendar_days():
+    days = np.array([1, 2, 10, 11, 30])
+    values = np.array([5.0, np.nan, 3.0, 1.0, 2.0])
+
+    rolling = progression.rolling_max(days, values, 3)
+
+    # day 2 still sees day 1; day 11 sees day 10; day 30 sees only itself
+    assert rolling.tolist() == [5.0, 5.0, 3.0, 3.0, 2.0]
+    assert np.isnan(progression.rolling_max(days, values, 1)[1])
+
+
+def test_estimates():
+    weight, reps = np.array([100.0, 100.0, 100.0]), np.array([1.0, 10.0, 40.0])
+
+    assert np.allclose(progression.epley(weight, reps), [100 * (1 + 1 / 30), 100 * (1 + 10 / 30), 100 * (1 + 40 / 30)])
+    brzycki = progression.brzycki(weight, reps)
+    assert np.allclose(brzycki[:2], [100.0, 100 * 36 / 27])
+    assert np.isnan(brzycki[2])
+
+
+def test_summarize_sessions_and_weeks():
+    rows = [
+        entry(0, 100, 5), entry(0, 120, 1, sets=None),
+        entry(2, 105, 5),
+        entry(7, 110, 5),
+        entry(8, None, None),
+    ]
+
+    result = progression.summarize(rows, None, 28)
+    sessions = result['sessions']
+
+    assert [session['Date'] for session in sessions] == [MONDAY + datetime.timedelta(days=day)
+                                                         for day in (0, 2, 7, 8)]
+    # two entries on the first day: the heaviest weight and best
+    # estimate win, and the volume only counts the complete entry
+    assert sessions[0] == {
+        'Date': MONDAY, 'TopWeight': 120.0, 'Volume': 1500.0, 'E1RMEpley': 124.0,
+        'E1RMBrzycki': 120.0, 'BestE1RM': 124.0, 'RollingMaxE1RM': 124.0,
+    }
+    assert sessions[3]['TopWeight'] is None and sessions[3]['E1RMEpley'] is None
+    assert sessions[3]['BestE1RM'] == 128.3
+    assert [session['BestE1RM'] for session in sessions] == [124.0, 124.0, 128.3, 128.3]
+
+    assert [week['WeekStart'] for week in result['weeks']] == [MONDAY, MONDAY + datetime.timedelta(days=7)]
+    assert [week['Sessions'] for week in result['weeks']] == [2, 2]
+    assert result['weeks'][0]['Volume'] == 1500.0 + 1575.0
+
+    assert result['summary'] == {
+        'Sessions': 4, 'BestE1RM': 128.3, 'BestE1RMDate': MONDAY + datetime.timedelta(days=7),
+        'TopWeight': 120.0, 'TotalVolume': 1500.0 + 1575.0 + 1650.0,
+    }
+
+
+def test_summarize_reads_history_before_from():
+    rows = [entry(0, 150, 1), entry(20, 100, 1)]
+
+    result = progression.summarize(rows, MONDAY + datetime.timedelta(days=10), 28)
+
+    assert len(result['sessions']) == 1
+    # the earlier, heavier day is outside the range but still counts
+    assert result['sessions'][0]['BestE1RM'] == 155.0
+    assert result['sessions'][0]['RollingMaxE1RM'] == 155.0
+    assert result['summary']['BestE1RM'] == 103.3
+
+
+def test_summarize_without_rows():
+    assert progression.summarize([], None, 28)['sessions'] == []
+    assert progression.summarize([entry(0, 100, 5)], MONDAY + datetime.timedelta(days=1), 28)['summary']['Sessions'] == 0
+
+
+def test_user_id_must_be_an_integer():
+    assert progression.parse_user_id({'user_id': '12'}) == 12
+    with pytest.raises(progression.ProgressionError):
+        progression.parse_user_id({'user_id': 'abc'})
@@ -0,0 +1,77 @@
+# ---------------------------------------------
+# Client for the HealthHub API
+# ---------------------------------------------
+# All pages talk to the API through this module instead of calling
+# requests directly:
+#
+#   from modules import api_client as api
+#   res = api.get("/workoutlog/", params={"user_id": 1})
+#   res = api.post("/foodlog/", json=data)
+#
+# - One requests.Session per Streamlit server process, shared by
+#   every page and user session, so HTTP keep-alive connections to
+#   the API are pooled and reused instead of opened per call.
+# - Every call has a timeout. Connection failures are retried for
+#   any method, and 502/503/504 answers only for GETs, with backoff.
+# - The base URL comes from the API_URL environment variable.
+#
+# Settings (environment variables):
+#   API_URL            default http://localhost:4000
+#   API_TIMEOUT        read timeout in seconds, default 10
+#   API_RETRIES        default 2
+#   API_POOL_SIZE      keep-alive connections, default 10
+import os
+
+import requests
+import streamlit as st
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+BASE_URL = os.getenv("API_URL", "http://localhost:4000").rstrip("/")
+CONNECT_TIMEOUT = 3.05
+READ_TIMEOUT = float(os.getenv("API_TIMEOUT", "10"))
+RETRIES = int(os.getenv("API_RETRIES", "2"))
+POOL_SIZE = int(os.getenv("API_POOL_SIZE", "10"))
+
+
+@st.cache_resource
+def session():
+    retry = Retry(
+        total=RETRIES,
+        backoff_factor=0.3,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset(["GET", "HEAD"]),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE, max_retries=retry)
+
+    s = requests.Session()
+    s.mount("http://", adapter)
+    s.mount("https://", adapter)
+    s.headers.update({"Accept": "application/json"})
+    return s
+
+
+def url(path):
+    return f"{BASE_URL}/{path.lstrip('/')}"
+
+
+def request(method, path, **kwargs):
+    kwargs.setdefault("timeout", (CONNECT_TIMEOUT, READ_TIMEOUT))
+    return session().request(method, url(path), **kwargs)
+
+
+def get(path, params=None, **kwargs):
+    return request("GET", path, params=params, **kwargs)
+
+
+def post(path, json=None, **kwargs):
+    return request("POST", path, json=json, **kwargs)
+
+
+def put(path, json=None, **kwargs):
+    return request("PUT", path, json=json, **kwargs)
+
+
+def delete(path, json=None, **kwargs):
+    return request("DELETE", path, json=json, **kwargs)
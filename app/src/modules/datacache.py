@@ -0,0 +1,199 @@
+# ---------------------------------------------
+# Cached data access for the pages
+# ---------------------------------------------
+# Streamlit reruns the whole page script on every widget change, so
+# a page that reads the API at the top would fetch and decode the
+# same data again for every keystroke. Pages read through this
+# module instead:
+#
+#   from modules import datacache
+#   df = datacache.frame("/users/1/daily", {"fields": "Date,CaloriesBurned"})
+#   result = datacache.json(f"/users/{user_id}/mood_sleep", {...})
+#   res = datacache.post("/foodlog/", json=row)      # write + invalidate
+#
+# Decoded results are kept per (path, params) in one cache per
+# Streamlit server process:
+# - Each entry lives for DATA_CACHE_TTL seconds. After that it is
+#   revalidated with its ETag: a 304 from the API renews the entry
+#   without downloading or decoding it again.
+# - The cache is bounded by DATA_CACHE_MAX_MB. The least recently
+#   used entries are dropped first.
+# - Writes made through post/put/delete drop every entry that the
+#   write can change, so users always see their own writes. See
+#   AFFECTS below.
+# - Failed requests are not cached. frame() and json() return None
+#   for them.
+#
+# Callers get their own copy of a DataFrame and may modify it.
+import copy
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+import streamlit as st
+
+from modules import api_client as api
+
+DEFAULT_TTL = float(os.getenv("DATA_CACHE_TTL", "60"))
+MAX_BYTES = int(float(os.getenv("DATA_CACHE_MAX_MB", "64")) * 1024 * 1024)
+
+# first path segment written -> path prefixes whose cached reads it
+# can change. Every log write also changes the per user summaries
+# under /users; admin writes (deleting a user, say) can touch
+# anything.
+AFFECTS = {
+    "workoutlog": ("/workoutlog", "/users"),
+    "foodlog": ("/foodlog", "/users"),
+    "sleeplog": ("/sleeplog", "/users"),
+    "moodlog": ("/moodlog", "/users"),
+    "heartratelog": ("/heartratelog", "/users"),
+    "admin": ("/",),
+}
+
+
+class FrameCache:
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.size = 0
+        # bumped by every invalidation, so that a read that was in
+        # flight during a write does not store what it read
+        self.generation = 0
+        self._lock = threading.Lock()
+        # key -> {'value', 'etag', 'expires', 'size'}
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, value, etag, ttl, size, generation):
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._drop(key)
+            if size > self.max_bytes:
+                return
+            self._entries[key] = {"value": value, "etag": etag,
+                                  "expires": time.monotonic() + ttl, "size": size}
+            self.size += size
+            while self.size > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+
+    def renew(self, key, ttl):
+        with self._lock:
+            if key in self._entries:
+                self._entries[key]["expires"] = time.monotonic() + ttl
+
+    def invalidate(self, prefixes):
+        with self._lock:
+            self.generation += 1
+            for key in [key for key in self._entries if key[0].startswith(prefixes)]:
+                self._drop(key)
+
+    def clear(self):
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+            self.size = 0
+
+    def _drop(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= entry["size"]
+
+
+@st.cache_resource
+def cache():
+    return FrameCache(MAX_BYTES)
+
+
+# both spellings of a list URL share one entry; the request
+# itself keeps the caller's path, since the API redirects
+# /workoutlog to /workoutlog/
+def _key(path, params):
+    path = "/" + path.strip("/")
+    return path, tuple(sorted((str(name), str(value)) for name, value in (params or {}).items()))
+
+
+def _frame_size(df):
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+# the cached value for (path, params), fetched and decoded with
+# `decode` on a miss; None when the request fails
+def _load(path, params, ttl, decode, sizeof):
+    store = cache()
+    key = _key(path, params)
+    entry = store.get(key)
+    if entry is not None and entry["expires"] > time.monotonic():
+        return entry["value"]
+
+    generation = store.generation
+    headers = {}
+    if entry is not None and entry["etag"]:
+        headers["If-None-Match"] = entry["etag"]
+    res = api.get(path, params=params, headers=headers)
+
+    if res.status_code == 304 and entry is not None:
+        store.renew(key, ttl)
+        return entry["value"]
+    if not res.ok:
+        return None
+
+    value = decode(res.json())
+    store.put(key, value, res.headers.get("ETag"), ttl, sizeof(value, res), generation)
+    return value
+
+
+# a list endpoint (or the `records` list inside an object) as a
+# DataFrame
+def frame(path, params=None, ttl=DEFAULT_TTL, records=None):
+    def decode(body):
+        return pd.DataFrame(body[records] if records else body)
+
+    df = _load(path, params, ttl, decode, lambda df, res: _frame_size(df))
+    return None if df is None else df.copy()
+
+
+def _json_size(body, res):
+    # decoded JSON takes a few times the bytes it was sent as
+    return len(res.content) * 4
+
+
+# any endpoint's decoded JSON
+def json(path, params=None, ttl=DEFAULT_TTL):
+    return copy.deepcopy(_load(path, params, ttl, lambda body: body, _json_size))
+
+
+# ---------------------------------------------
+# writes
+def invalidate(path):
+    segment = path.strip("/").split("/")[0]
+    cache().invalidate(AFFECTS.get(segment, ("/" + segment,)))
+
+
+def post(path, json=None, **kwargs):
+    try:
+        return api.post(path, json=json, **kwargs)
+    finally:
+        invalidate(path)
+
+
+def put(path, json=None, **kwargs):
+    try:
+        return api.put(path, json=json, **kwargs)
+    finally:
+        invalidate(path)
+
+
+def delete(path, json=None, **kwargs):
+    try:
+        return api.delete(path, json=json, **kwargs)
+    finally:
+        invalidate(path)
@@ -4,7 +4,7 @@ logger = logging.getLogger(__name__)
 import pandas as pd
 import streamlit as st
 import matplotlib.pyplot as plt
-import requests
+from modules import datacache
 from modules.nav import SideBarLinks
 
 st.set_page_config(layout='wide')
@@ -14,21 +14,20 @@ st.title(f"Calories Burned Viewer - {st.session_state['first_name']}")
 
 st.write('Use this page to view a client\'s calories burned over time.')
 
-API_URL = "http://localhost:4000"
-
 # Enter user ID
 user_id = st.text_input("Enter Client User ID for Line Chart:")
 
 if user_id:
-    response = requests.get(f"{API_URL}/workoutlog", params={"user_id": user_id})
+    # daily totals, one row per day with a workout
+    df = datacache.frame(f"/users/{user_id}/daily", {"fields": "Date,CaloriesBurned", "max_points": 400})
 
-    if response.status_code == 200:
-        workouts = response.json()
-        df = pd.DataFrame(workouts)
+    if df is not None:
+        if not df.empty:
+            df = df.dropna(subset=['CaloriesBurned'])
 
         if not df.empty:
             # Convert the 'Date' column to datetime with the correct format
-            df['Date'] = pd.to_datetime(df['Date'], format='%a, %d %b %Y %H:%M:%S GMT')
+            df['Date'] = pd.to_datetime(df['Date'])
 
             # Sort the data by date
             df = df.sort_values('Date')
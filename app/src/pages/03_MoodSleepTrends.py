@@ -1,6 +1,7 @@
+import datetime
 import pandas as pd
 import streamlit as st
-import requests
+from modules import datacache
 import plotly.express as px
 from modules.nav import SideBarLinks
 
@@ -10,82 +11,77 @@ SideBarLinks()
 
 st.title(f"Mood and Sleep Trends Viewer - {st.session_state['first_name']}")
 
-API_URL = "http://localhost:4000"
-
 # User input
 user_id = st.text_input("Enter Client User ID for Mood/Sleep Trends:")
 
 if user_id:
-    # Fetch data
-    mood_response = requests.get(f"{API_URL}/moodlog", params={"user_id": user_id})
-    sleep_response = requests.get(f"{API_URL}/sleeplog", params={"user_id": user_id})
-
-    if mood_response.ok and sleep_response.ok:
-        moods = pd.DataFrame(mood_response.json())
-        sleeps = pd.DataFrame(sleep_response.json())
-
-        if not moods.empty and not sleeps.empty:
+    # Only the selected window is fetched; the API lines mood and
+    # sleep up by day and works out the statistics. The page opens
+    # on the last 90 days that have data.
+    path = f"/users/{user_id}/mood_sleep"
+    result = datacache.json(path, {'days': 90})
+
+    if result is not None and result['extent']['last'] is not None:
+        first = datetime.date.fromisoformat(result['extent']['first'])
+        last = datetime.date.fromisoformat(result['extent']['last'])
+        default = [max(datetime.date.fromisoformat(result['from']), first), last]
+        start_date, end_date = st.date_input(
+            "Select Date Range:",
+            default,
+            min_value=first,
+            max_value=last
+        )
+
+        if [start_date, end_date] != default:
+            result = datacache.json(path, {'from': start_date.isoformat(), 'to': end_date.isoformat()})
+
+    if result is not None:
+        merged = pd.DataFrame(result['days'])
+
+        if not merged.empty:
             # Parse dates
-            moods['Date'] = pd.to_datetime(moods['Date'])
-            sleeps['Date'] = pd.to_datetime(sleeps['Date'])
-
-            # Merge
-            merged = pd.merge(moods, sleeps, on=['UserID', 'Date'], how='outer').sort_values('Date')
-            merged.columns = merged.columns.str.strip()
-
-            # Only convert SleepDuration to numeric (Mood stays text)
-            merged['SleepDuration'] = pd.to_numeric(merged['SleepDuration'], errors='coerce')
-
-            # Drop rows where both Mood and SleepDuration are missing
-            merged.dropna(subset=['Mood', 'SleepDuration'], how='all', inplace=True)
-
-            if not merged.empty:
-                min_date = merged['Date'].min().date()
-                max_date = merged['Date'].max().date()
-
-                # Date picker
-                start_date, end_date = st.date_input(
-                    "Select Date Range:",
-                    [min_date, max_date],
-                    min_value=min_date,
-                    max_value=max_date
+            merged['Date'] = pd.to_datetime(merged['Date'])
+            merged = merged.rename(columns={'SleepHours': 'SleepDuration'})
+
+            # Show the window
+            st.dataframe(merged[['Date', 'Mood', 'SleepDuration']])
+
+            correlation = result['correlation']
+            col1, col2, col3 = st.columns(3)
+            col1.metric("Days with mood and sleep", correlation['PairedDays'])
+            col2.metric("Sleep hours vs mood (eta)", correlation['HoursByMoodEta'] if correlation['HoursByMoodEta'] is not None else "n/a")
+            col3.metric("Sleep hours vs quality (r)", correlation['HoursQualityPearson'] if correlation['HoursQualityPearson'] is not None else "n/a")
+
+            # Tabs
+            tab1, tab2, tab3 = st.tabs(["Mood Log", "Sleep Trend", "Sleep by Mood"])
+
+            with tab1:
+                st.subheader("Mood Log")
+                st.dataframe(merged[['Date', 'Mood']].dropna())
+
+            with tab2:
+                st.subheader("Sleep Hours Colored by Mood")
+
+                # Scatter Plot: Sleep Duration vs Date, colored by Mood
+                fig = px.scatter(
+                    merged,
+                    x='Date',
+                    y='SleepDuration',
+                    color='Mood',
+                    labels={'SleepDuration': 'Hours Slept'},
+                    title='Sleep Hours vs Mood',
+                    color_discrete_sequence=px.colors.qualitative.Set2
                 )
 
-                # Filter by date
-                merged = merged[(merged['Date'] >= pd.to_datetime(start_date)) & (merged['Date'] <= pd.to_datetime(end_date))]
-
-                # Show filtered table
-                st.dataframe(merged[['Date', 'Mood', 'SleepDuration']])
-
-                # Tabs
-                tab1, tab2 = st.tabs(["Mood Log", "Sleep Trend"])
-
-                with tab1:
-                    st.subheader("Mood Log")
-                    st.dataframe(merged[['Date', 'Mood']])
+                fig.update_traces(marker=dict(size=12))
+                fig.update_layout(xaxis_title="Date", yaxis_title="Hours Slept")
 
-                with tab2:
-                    st.subheader("Sleep Hours Colored by Mood")
+                st.plotly_chart(fig)
 
-                    # Scatter Plot: Sleep Duration vs Date, colored by Mood
-                    fig = px.scatter(
-                        merged,
-                        x='Date',
-                        y='SleepDuration',
-                        color='Mood',
-                        labels={'SleepDuration': 'Hours Slept'},
-                        title='Sleep Hours vs Mood',
-                        color_discrete_sequence=px.colors.qualitative.Set2
-                    )
-
-                    fig.update_traces(marker=dict(size=12))
-                    fig.update_layout(xaxis_title="Date", yaxis_title="Hours Slept")
-
-                    st.plotly_chart(fig)
-            else:
-                st.warning("No valid mood or sleep data after cleaning.")
+            with tab3:
+                st.subheader("Sleep Statistics per Mood")
+                st.dataframe(pd.DataFrame(result['moods']))
         else:
-            st.warning("No mood or sleep data available.")
+            st.warning("No mood or sleep data in the selected range.")
     else:
         st.error("Failed to fetch mood or sleep data.")
-
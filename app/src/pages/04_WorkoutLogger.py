@@ -3,7 +3,7 @@ logger = logging.getLogger(__name__)
 
 import pandas as pd
 import streamlit as st
-import requests
+from modules import datacache
 from streamlit_extras.app_logo import add_logo
 from modules.nav import SideBarLinks
 
@@ -12,9 +12,6 @@ SideBarLinks()
 st.header("Roberts Workout Logger")
 
 
-API_URL = "http://localhost:4000"
-
-
 # add a new workout
 st.subheader("Add a New Workout")
 
@@ -45,7 +42,7 @@ with st.form("add_workout_form"):
             "WeightUsed": weight
         }
 
-        res = requests.post(f"{API_URL}/workoutlog", json=workout_data)
+        res = datacache.post("/workoutlog/", json=workout_data)
 
         if res.status_code == 201:
             st.success("workout log sucessfully added")
@@ -54,10 +51,8 @@ with st.form("add_workout_form"):
 
 # look at existing logs
 st.subheader("Previous Workouts")
-res = requests.get(f"{API_URL}/workoutlog", params={"user_id": 1})
-if res.status_code == 200:
-    logs = res.json()
-    df = pd.DataFrame(logs)
+df = datacache.frame("/workoutlog/", {"user_id": 1})
+if df is not None:
     if not df.empty:
         df['Date'] = pd.to_datetime(df['Date'])
         df = df.sort_values("Date", ascending=False)
@@ -4,14 +4,12 @@ logger = logging.getLogger(__name__)
 import pandas as pd
 import streamlit as st
 import matplotlib.pyplot as plt
-import requests
 from streamlit_extras.app_logo import add_logo
+from modules import datacache
 from modules.nav import SideBarLinks
 
 SideBarLinks()
 st.header("robert's strength progression")
-
-API_URL = "http://localhost:4000"
 USER_ID = 2
 
 # Dropdowns for split and exercise
@@ -20,21 +18,34 @@ split = st.selectbox("Workout Split", ["Push", "Pull", "Legs"])  # Can be hardco
 
 exercise = st.selectbox("Exercise", ["Bench Press", "Shoulder Press", "Tricep Extension", "Deadlift"])
 
-# Fetch progression data
-res = requests.get(f"{API_URL}/workoutlog/progression", params={"exercise": exercise})
-if res.status_code == 200:
-    data = res.json()
-    df = pd.DataFrame(data)
-    if not df.empty:
+# Fetch progression data: per day top weight and estimated 1RM,
+# downsampled by the API for the chart, plus weekly bests
+result = datacache.json("/workoutlog/progression",
+                        {"user_id": USER_ID, "exercise": exercise, "max_points": 400})
+if result is not None:
+    if result["sessions"]:
+        summary = result["summary"]
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Best estimated 1RM", summary["BestE1RM"], help=f"on {summary['BestE1RMDate']}")
+        col2.metric("Heaviest weight", summary["TopWeight"])
+        col3.metric("Sessions", summary["Sessions"])
+
+        df = pd.DataFrame(result["sessions"])
         df["Date"] = pd.to_datetime(df["Date"])
-        df = df.sort_values("Date")
         fig, ax = plt.subplots(figsize=(10, 5))
-        ax.plot(df["Date"], df["WeightUsed"], marker="o", linestyle="-", linewidth=2)
+        ax.plot(df["Date"], df["TopWeight"], marker="o", linestyle="-", linewidth=2, label="Top weight")
+        ax.plot(df["Date"], df["E1RMEpley"], linestyle="--", label="Estimated 1RM (Epley)")
+        ax.plot(df["Date"], df["RollingMaxE1RM"], linewidth=1, label=f"{result['window']} day best 1RM")
         ax.set_title(f"{exercise} Progression")
         ax.set_xlabel("Date")
         ax.set_ylabel("Weight")
         ax.grid(True)
+        ax.legend()
         st.pyplot(fig)
+
+        st.subheader("Weekly bests")
+        weeks = pd.DataFrame(result["weeks"])
+        st.dataframe(weeks.iloc[::-1], use_container_width=True, hide_index=True)
     else:
         st.warning("this exercise has no data")
 else:
@@ -3,7 +3,7 @@ logger = logging.getLogger(__name__)
 
 import pandas as pd
 import streamlit as st
-import requests
+from modules import datacache
 from streamlit_extras.app_logo import add_logo
 from modules.nav import SideBarLinks
 
@@ -11,8 +11,6 @@ from modules.nav import SideBarLinks
 SideBarLinks()
 st.header("Delete a Workout Log")
 
-API_URL = "http://localhost:4000"
-
 # Delete a workout log
 st.subheader("Delete a Workout Log")
 
@@ -24,7 +22,7 @@ with st.form("delete_workout_form"):
     
     if submitted_delete:
         # Make API request to delete workout log
-        res = requests.delete(f"{API_URL}/workoutlog/{log_id_to_delete}")
+        res = datacache.delete(f"/workoutlog/{log_id_to_delete}")
         
         if res.status_code == 200:
             st.success(f"Workout log {log_id_to_delete} successfully deleted.")
@@ -6,14 +6,14 @@ import streamlit as st
 from streamlit_extras.app_logo import add_logo
 import matplotlib.pyplot as plt
 import seaborn as sns
-import requests
+from modules import datacache
 from modules.nav import SideBarLinks
 
 # Setup sidebar and page
 SideBarLinks()
 st.header('User Data')
 
-users = requests.get('http://localhost:4000/admin/users').json()
+users = datacache.frame('/admin/users')
 
 try:
     st.dataframe(users)
@@ -35,7 +35,7 @@ with st.form("Update a user's email"):
 
         st.write("Please refresh page to see updated table.")
 
-        requests.put('http://localhost:4000/admin/users', json=data)
+        datacache.put('/admin/users', json=data)
 
 with st.form("Update a user's name"):
     name = st.text_input("Input name to be changed:")
@@ -52,7 +52,7 @@ with st.form("Update a user's name"):
 
         st.write("Please refresh page to see updated table.")
 
-        requests.put('http://localhost:4000/admin/users', json=data)
+        datacache.put('/admin/users', json=data)
 
 with st.form("Delete a user:"):
     st.write("***WARNING CANNOT BE UNDONE")
@@ -66,4 +66,4 @@ with st.form("Delete a user:"):
 
         st.write("Please refresh page to see updated table.")
 
-        requests.delete('http://localhost:4000/admin/users', json=data)
\ No newline at end of file
+        datacache.delete('/admin/users', json=data)
\ No newline at end of file
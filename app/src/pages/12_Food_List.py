@@ -6,14 +6,14 @@ import streamlit as st
 from streamlit_extras.app_logo import add_logo
 import matplotlib.pyplot as plt
 import seaborn as sns
-import requests
+from modules import datacache
 from modules.nav import SideBarLinks
 
 # Setup sidebar and page
 SideBarLinks()
 st.header('Food List')
 
-food = requests.get('http://localhost:4000/admin/food_list').json()
+food = datacache.frame('/admin/food_list')
 
 try:
     st.dataframe(food)
@@ -36,4 +36,4 @@ with st.form("Add a food"):
 
         st.write("Please refresh page to see updated table.")
 
-        requests.post('http://localhost:4000/admin/food_list', json=data)
\ No newline at end of file
+        datacache.post('/admin/food_list', json=data)
\ No newline at end of file
@@ -6,14 +6,14 @@ import streamlit as st
 from streamlit_extras.app_logo import add_logo
 import matplotlib.pyplot as plt
 import seaborn as sns
-import requests
+from modules import datacache
 from modules.nav import SideBarLinks
 
 # Setup sidebar and page
 SideBarLinks()
 st.header('Support Tickets')
 
-support_tickets = requests.get('http://localhost:4000/admin/support_tix').json()
+support_tickets = datacache.frame('/admin/support_tix')
 
 try:
     st.dataframe(support_tickets)
@@ -33,4 +33,4 @@ with st.form('Update a ticket\'s status'):
 
         st.write("Please refresh page to see updated table.")
 
-        requests.put('http://localhost:4000/admin/support_tix', json=data)
\ No newline at end of file
+        datacache.put('/admin/support_tix', json=data)
\ No newline at end of file
@@ -1,6 +1,7 @@
 import streamlit as st
 import logging
 import requests
+from modules import datacache
 import datetime
 
 # Set up logging
@@ -49,7 +50,7 @@ with st.form("Add a new Food Log"):
 
         # Make a POST request to the backend API to save the food log
         try:
-            response = requests.post('http://localhost:4000/foodlog/', json=data)
+            response = datacache.post('/foodlog/', json=data)
             if response.status_code == 201:
                 st.success("Food log added successfully!")
             else:
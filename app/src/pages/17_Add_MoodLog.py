@@ -1,6 +1,7 @@
 import streamlit as st
 import logging
 import requests
+from modules import datacache
 from streamlit_extras.app_logo import add_logo
 from modules.nav import SideBarLinks
 import datetime
@@ -33,7 +34,7 @@ with st.form("Add a new Mood Log"):
 
         # Make a POST request to the backend API to save the mood log
         try:
-            response = requests.post('http://localhost:4000/moodlog/', json=data)
+            response = datacache.post('/moodlog/', json=data)
             if response.status_code == 201:
                 st.success("Mood log added successfully!")
             else:
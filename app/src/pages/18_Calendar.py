@@ -3,14 +3,11 @@ import pandas as pd
 import calendar
 from datetime import datetime
 from modules.nav import SideBarLinks
-import requests
+from modules import datacache
 # Setup sidebar and page
 SideBarLinks()
 st.header('Calendar Heatmap')
 
-
-API_URL = "http://localhost:4000"
-
 # Get current date
 date = datetime.now()
 
@@ -32,19 +29,36 @@ log = st.selectbox("Select Log", ["Mood Log", "Sleep Log"])
 
 # user id
 user_id = st.number_input("User ID:", min_value=0, step=1)
+# DailyRollup column shown for each log
+LOG_METRICS = {"Mood Log": "DominantMood", "Sleep Log": "SleepHours"}
+
 # Generates calendar after selecting a month and year
 if st.button("Update Calendar"):
     day_names = list(calendar.day_abbr)
     month_num = list(calendar.month_name).index(selected_month)
-    
+
     # Create title with current month/year
     st.title(f"{selected_month} {selected_year}")
 
-    cal = calendar.monthcalendar(selected_year, month_num)
-    df = pd.DataFrame(cal, columns=day_names) #replace(0, "")
-    
-    st.dataframe(
-        df,
-        use_container_width=True,
-        hide_index=True
-    )
\ No newline at end of file
+    # the month's weeks with the day's mood / sleep, laid out by the API
+    result = datacache.json(f"/users/{user_id}/calendar",
+                            {"year": selected_year, "month": month_num, "metric": LOG_METRICS[log]})
+
+    if result is not None:
+        def cell(day):
+            if day is None:
+                return ""
+            if day['Value'] is None:
+                return str(day['Day'])
+            return f"{day['Day']}: {day['Value']}"
+
+        df = pd.DataFrame([[cell(day) for day in week] for week in result['weeks']], columns=day_names)
+
+        st.dataframe(
+            df,
+            use_container_width=True,
+            hide_index=True
+        )
+        st.caption(f"{result['summary']['Days']} day(s) logged this month.")
+    else:
+        st.error("Failed to fetch calendar data.")
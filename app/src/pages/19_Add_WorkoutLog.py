@@ -2,6 +2,7 @@ import streamlit as st
 import logging
 logger = logging.getLogger(__name__)
 import requests
+from modules import datacache
 from modules.nav import SideBarLinks
 import datetime
 
@@ -40,7 +41,7 @@ with st.form("Add a new Workout Log"):
 
         # Make a POST request to the backend API to save the workout log
         try:
-            response = requests.post('http://localhost:4000/workoutlog/', json=data)
+            response = datacache.post('/workoutlog/', json=data)
             if response.status_code == 201:
                 st.success("Workout log added successfully!")
             else:
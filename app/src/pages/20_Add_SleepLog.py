@@ -2,6 +2,7 @@ import streamlit as st
 import logging
 logger = logging.getLogger(__name__)
 import requests
+from modules import datacache
 from modules.nav import SideBarLinks
 import datetime
 
@@ -32,7 +33,7 @@ with st.form("Add a new Sleep Log"):
 
         # Make a POST request to the backend API to save the sleep log
         try:
-            response = requests.post('http://localhost:4000/sleeplog/', json=data)
+            response = datacache.post('/sleeplog/', json=data)
             if response.status_code == 201:
                 st.success("Sleep log added successfully!")
             else: